@@ -24,6 +24,10 @@ from models.base import Base
 from models.user import User
 from models.product import Product
 from models.order import Order
+from models.catalog import CatalogVersion
+from models.analytics import DailyProductSales
+from models.idempotency import IdempotencyKey
+from models.inventory import ProductStockShard
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
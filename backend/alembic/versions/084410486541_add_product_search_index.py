@@ -0,0 +1,36 @@
+"""Add product full-text search index
+
+Revision ID: 084410486541
+Revises: e9e917357c7a
+Create Date: 2026-10-17 11:26:51.730914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '084410486541'
+down_revision: Union[str, Sequence[str], None] = 'e9e917357c7a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Must match models.product.product_search_vector() exactly for the planner to use it.
+    # Built concurrently so large catalogs stay writable during the migration.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_search_vector ON products USING gin ("
+            "(setweight(to_tsvector(CAST('english' AS REGCONFIG), coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector(CAST('english' AS REGCONFIG), coalesce(description, '')), 'B')))"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_products_search_vector")
@@ -0,0 +1,32 @@
+"""Add keyset pagination indexes
+
+Revision ID: 0cca4041d9be
+Revises: a2bed87fd63a
+Create Date: 2026-10-17 09:12:40.118392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0cca4041d9be'
+down_revision: Union[str, Sequence[str], None] = 'a2bed87fd63a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_products_name_id', 'products', ['name', 'id'], unique=False)
+    op.create_index('ix_users_email_id', 'users', ['email', 'id'], unique=False)
+    op.create_index('ix_orders_created_at_id', 'orders', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_created_at_id', table_name='orders')
+    op.drop_index('ix_users_email_id', table_name='users')
+    op.drop_index('ix_products_name_id', table_name='products')
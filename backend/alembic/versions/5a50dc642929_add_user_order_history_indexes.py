@@ -0,0 +1,30 @@
+"""Add user order history indexes
+
+Revision ID: 5a50dc642929
+Revises: 9c7abfc68c62
+Create Date: 2026-10-17 14:52:37.604921
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a50dc642929'
+down_revision: Union[str, Sequence[str], None] = '9c7abfc68c62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_orders_user_id_created_at', 'orders', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_order_items_order_id'), 'order_items', ['order_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_order_items_order_id'), table_name='order_items')
+    op.drop_index('ix_orders_user_id_created_at', table_name='orders')
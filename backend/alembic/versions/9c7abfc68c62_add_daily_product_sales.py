@@ -0,0 +1,38 @@
+"""Add daily product sales rollup
+
+Revision ID: 9c7abfc68c62
+Revises: 084410486541
+Create Date: 2026-10-17 13:40:05.284117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c7abfc68c62'
+down_revision: Union[str, Sequence[str], None] = '084410486541'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_product_sales',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('units', sa.BigInteger(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('day', 'product_id')
+    )
+    # Populate with: python backfill_analytics.py
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_product_sales')
@@ -0,0 +1,30 @@
+"""Add idempotency key order id
+
+Revision ID: a81c3e5f9d24
+Revises: f6b2d8c41a07
+Create Date: 2026-10-17 19:48:12.507316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a81c3e5f9d24'
+down_revision: Union[str, Sequence[str], None] = 'f6b2d8c41a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keys claimed before this revision have no order ID and are completed or released as before
+    op.add_column('idempotency_keys', sa.Column('order_id', postgresql.UUID(as_uuid=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('idempotency_keys', 'order_id')
@@ -0,0 +1,34 @@
+"""Make keyset columns not null
+
+Revision ID: b5e2c7d94f16
+Revises: a81c3e5f9d24
+Create Date: 2026-10-17 21:12:37.804215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e2c7d94f16'
+down_revision: Union[str, Sequence[str], None] = 'a81c3e5f9d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A NULL key ends keyset pagination (row comparisons with NULL are never true), so backfill first:
+    # nameless products get an empty name, users without an email (who cannot log in) get their ID
+    op.execute("UPDATE products SET name = '' WHERE name IS NULL")
+    op.execute("UPDATE users SET email = id::text WHERE email IS NULL")
+    op.alter_column('products', 'name', existing_type=sa.String(), nullable=False)
+    op.alter_column('users', 'email', existing_type=sa.String(), nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('users', 'email', existing_type=sa.String(), nullable=True)
+    op.alter_column('products', 'name', existing_type=sa.String(), nullable=True)
@@ -0,0 +1,48 @@
+"""Add order totals
+
+Revision ID: c3e8a5f07d21
+Revises: b7d41c9e2f18
+Create Date: 2026-10-17 16:48:03.572194
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8a5f07d21'
+down_revision: Union[str, Sequence[str], None] = 'b7d41c9e2f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('total_amount', sa.Float(), server_default='0', nullable=False))
+    op.add_column('orders', sa.Column('item_count', sa.Integer(), server_default='0', nullable=False))
+    # Backfill existing orders in one set-based pass over order_items
+    op.execute(
+        """
+        UPDATE orders
+        SET total_amount = totals.total_amount,
+            item_count = totals.item_count
+        FROM (
+            SELECT order_id,
+                   ROUND(CAST(SUM(quantity * price_at_purchase) AS numeric), 2) AS total_amount,
+                   SUM(quantity) AS item_count
+            FROM order_items
+            GROUP BY order_id
+        ) AS totals
+        WHERE orders.id = totals.order_id
+        """
+    )
+    op.create_index('ix_orders_total_amount_id', 'orders', ['total_amount', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_total_amount_id', table_name='orders')
+    op.drop_column('orders', 'item_count')
+    op.drop_column('orders', 'total_amount')
@@ -0,0 +1,43 @@
+"""Add product stock
+
+Revision ID: d4f1b6a93e58
+Revises: c3e8a5f07d21
+Create Date: 2026-10-17 17:32:19.604713
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f1b6a93e58'
+down_revision: Union[str, Sequence[str], None] = 'c3e8a5f07d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing products start untracked (NULL) so they stay orderable until stock is set
+    op.add_column('products', sa.Column('stock', sa.Integer(), nullable=True))
+    op.add_column('products', sa.Column('stock_sharded', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.create_check_constraint('ck_products_stock', 'products', 'stock >= 0')
+    op.create_table('product_stock_shards',
+    sa.Column('product_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('shard', sa.Integer(), nullable=False),
+    sa.Column('stock', sa.Integer(), nullable=False),
+    sa.CheckConstraint('stock >= 0', name='ck_product_stock_shards_stock'),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id', 'shard')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('product_stock_shards')
+    op.drop_constraint('ck_products_stock', 'products', type_='check')
+    op.drop_column('products', 'stock_sharded')
+    op.drop_column('products', 'stock')
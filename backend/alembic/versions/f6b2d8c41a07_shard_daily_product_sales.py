@@ -0,0 +1,48 @@
+"""Shard daily product sales rollup
+
+Revision ID: f6b2d8c41a07
+Revises: d4f1b6a93e58
+Create Date: 2026-10-17 19:05:41.318220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b2d8c41a07'
+down_revision: Union[str, Sequence[str], None] = 'd4f1b6a93e58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows become shard 0
+    op.add_column('daily_product_sales', sa.Column('shard', sa.SmallInteger(), server_default='0', nullable=False))
+    op.drop_constraint('daily_product_sales_pkey', 'daily_product_sales', type_='primary')
+    op.create_primary_key('daily_product_sales_pkey', 'daily_product_sales', ['day', 'product_id', 'shard'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Fold the shards of each product and day into shard 0 before dropping the column
+    op.execute(
+        """
+        INSERT INTO daily_product_sales (day, product_id, shard, units, revenue, order_count)
+        SELECT day, product_id, 0, SUM(units), SUM(revenue), SUM(order_count)
+        FROM daily_product_sales
+        WHERE shard <> 0
+        GROUP BY day, product_id
+        ON CONFLICT (day, product_id, shard) DO UPDATE
+        SET units = daily_product_sales.units + EXCLUDED.units,
+            revenue = daily_product_sales.revenue + EXCLUDED.revenue,
+            order_count = daily_product_sales.order_count + EXCLUDED.order_count
+        """
+    )
+    op.execute("DELETE FROM daily_product_sales WHERE shard <> 0")
+    op.drop_constraint('daily_product_sales_pkey', 'daily_product_sales', type_='primary')
+    op.create_primary_key('daily_product_sales_pkey', 'daily_product_sales', ['day', 'product_id'])
+    op.drop_column('daily_product_sales', 'shard')
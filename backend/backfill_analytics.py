@@ -0,0 +1,29 @@
+"""
+Rebuilds the daily_product_sales rollup from the order history.
+
+By default every day up to (but excluding) today is rebuilt; today's rows keep being
+maintained live by the order service. Rebuilding a range that is still receiving
+orders can lose increments, so prefer closed days.
+
+Usage:
+    python backfill_analytics.py [--start 2025-01-01] [--end 2025-02-01]
+"""
+
+import argparse
+import asyncio
+from datetime import date, datetime, timezone
+from core.database import AsyncSessionLocal, engine
+from services import analytics as analytics_service
+
+async def run(start: date, end: date):
+    async with AsyncSessionLocal() as session:
+        rows = await analytics_service.backfill(session, start, end)
+    print(f"Rebuilt daily_product_sales for {start} to {end} (exclusive): {rows} rows")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the daily product sales rollup.")
+    parser.add_argument("--start", type=date.fromisoformat, default=date(1970, 1, 1), help="First day (inclusive).")
+    parser.add_argument("--end", type=date.fromisoformat, default=datetime.now(timezone.utc).date(), help="Last day (exclusive).")
+    args = parser.parse_args()
+    asyncio.run(run(args.start, args.end))
@@ -0,0 +1,86 @@
+"""
+Checkout Benchmark
+
+Measures services/order.create_order latency and SQL statement count as the
+cart grows from 1 to 500 lines. With set-based pricing and a bulk item insert
+both numbers should stay flat.
+
+Runs against the database configured in DATABASE_URL and removes the rows it
+creates when it finishes.
+
+Usage:
+    python -m bench.checkout [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import delete, event, select
+
+from core.database import AsyncSessionLocal, engine
+from models.order import Order, OrderItem
+from models.product import Product
+from models.user import User
+from schemas.order import OrderCreate, OrderItemCreate
+from services import order as order_service
+
+CART_SIZES = [1, 10, 50, 100, 250, 500]
+
+async def run(repeat: int):
+    # SQL echo would dominate the timings
+    engine.echo = False
+
+    statements = 0
+
+    def count_statement(*args):
+        nonlocal statements
+        statements += 1
+
+    async with AsyncSessionLocal() as db:
+        user = User(email=f"bench-{uuid.uuid4()}@example.com", hashed_password="x")
+        products = [
+            Product(name=f"bench-product-{i}", description="", price=1.0 + i)
+            for i in range(max(CART_SIZES))
+        ]
+        db.add(user)
+        db.add_all(products)
+        await db.commit()
+        product_ids = [p.id for p in products]
+        user_id = user.id
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+    print(f"{'lines':>6} {'p50 ms':>9} {'p95 ms':>9} {'statements':>11}")
+    try:
+        for size in CART_SIZES:
+            payload = OrderCreate(
+                items=[OrderItemCreate(product_id=pid, quantity=1) for pid in product_ids[:size]]
+            )
+            timings = []
+            for _ in range(repeat):
+                statements = 0
+                async with AsyncSessionLocal() as db:
+                    start = time.perf_counter()
+                    await order_service.create_order(db, payload, user_id)
+                    timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"{size:>6} {statistics.median(timings):>9.2f} {p95:>9.2f} {statements:>11}")
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_statement)
+        async with AsyncSessionLocal() as db:
+            order_ids = select(Order.id).where(Order.user_id == user_id)
+            await db.execute(delete(OrderItem).where(OrderItem.order_id.in_(order_ids)))
+            await db.execute(delete(Order).where(Order.user_id == user_id))
+            await db.execute(delete(Product).where(Product.id.in_(product_ids)))
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.commit()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark checkout latency by cart size.")
+    parser.add_argument("--repeat", type=int, default=20, help="Checkouts per cart size.")
+    args = parser.parse_args()
+    asyncio.run(run(args.repeat))
@@ -0,0 +1,129 @@
+"""
+Inventory Contention Benchmark
+
+Fires hundreds of concurrent checkouts at a single product, once with its stock on
+the product row and once in sharded stock mode, and reports throughput, latency and
+the outcome of every checkout. It then checks that no unit was oversold: the units
+sold plus the stock left must equal the starting stock.
+
+Start with less stock than checkouts (the default) to exercise the sell-out path.
+Concurrency is ultimately bounded by the connection pool (DB_POOL_SIZE +
+DB_MAX_OVERFLOW); raise both to put more transactions on the hot row at once.
+
+Runs against the database configured in DATABASE_URL and removes the rows it
+creates when it finishes. Exits with status 1 if stock was oversold or any
+checkout failed with an error (e.g. a deadlock or a pool timeout); running out
+of stock is an expected outcome, not an error.
+
+Usage:
+    python -m bench.inventory [--checkouts 500] [--stock 400] [--quantity 1] [--shards 0 8]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+
+from sqlalchemy import delete, func, select
+
+from core.database import AsyncSessionLocal, engine
+from models.analytics import DailyProductSales
+from models.order import Order, OrderItem
+from models.product import Product
+from models.user import User
+from schemas.order import OrderCreate, OrderItemCreate
+from services import inventory as inventory_service
+from services import order as order_service
+
+async def checkout(payload, user_id):
+    start = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as db:
+            await order_service.create_order(db, payload, user_id)
+        outcome = "sold"
+    except inventory_service.OutOfStockError:
+        outcome = "out of stock"
+    except Exception as exc:
+        outcome = f"error: {exc.__class__.__name__}"
+    return outcome, (time.perf_counter() - start) * 1000
+
+async def run_mode(product_id, user_id, args, shards):
+    async with AsyncSessionLocal() as db:
+        await inventory_service.set_stock(db, product_id, args.stock, shards)
+
+    payload = OrderCreate(items=[OrderItemCreate(product_id=product_id, quantity=args.quantity)])
+    start = time.perf_counter()
+    results = await asyncio.gather(*(checkout(payload, user_id) for _ in range(args.checkouts)))
+    elapsed = time.perf_counter() - start
+
+    async with AsyncSessionLocal() as db:
+        left, _ = await inventory_service.get_stock(db, product_id)
+        sold = (await db.execute(
+            select(func.coalesce(func.sum(OrderItem.quantity), 0))
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(Order.user_id == user_id, OrderItem.product_id == product_id)
+        )).scalar_one()
+        # Orders from earlier modes of this run are removed so each mode is checked on its own
+        order_ids = select(Order.id).where(Order.user_id == user_id)
+        await db.execute(delete(OrderItem).where(OrderItem.order_id.in_(order_ids)))
+        await db.execute(delete(Order).where(Order.user_id == user_id))
+        await db.commit()
+
+    outcomes = {}
+    for outcome, _ in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    timings = sorted(ms for _, ms in results)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    consistent = sold + left == args.stock
+    errors = sum(n for outcome, n in outcomes.items() if outcome.startswith("error"))
+    print(
+        f"{'row' if not shards else f'{shards} shards':>10} {args.checkouts / elapsed:>10.1f} "
+        f"{statistics.median(timings):>9.1f} {p95:>9.1f} {outcomes.get('sold', 0):>6} "
+        f"{outcomes.get('out of stock', 0):>6} {errors:>6} "
+        f"{left:>6}  {'OVERSOLD' if not consistent else 'ERRORS' if errors else 'ok'}"
+    )
+    for outcome, n in sorted(outcomes.items()):
+        if outcome.startswith("error"):
+            print(f"{'':>10} {n} x {outcome}")
+    return consistent and not errors
+
+async def run(args):
+    # SQL echo would dominate the timings
+    engine.echo = False
+
+    async with AsyncSessionLocal() as db:
+        user = User(email=f"bench-{uuid.uuid4()}@example.com", hashed_password="x")
+        product = Product(name=f"bench-hot-product-{uuid.uuid4()}", description="", price=10.0)
+        db.add_all([user, product])
+        await db.commit()
+        user_id, product_id = user.id, product.id
+
+    print(f"{args.checkouts} concurrent checkouts of {args.quantity} unit(s), {args.stock} units in stock")
+    print(f"{'mode':>10} {'rps':>10} {'p50 ms':>9} {'p95 ms':>9} {'sold':>6} {'oos':>6} {'errors':>6} {'left':>6}  stock")
+    passed = True
+    try:
+        for shards in args.shards:
+            passed &= await run_mode(product_id, user_id, args, shards)
+    finally:
+        async with AsyncSessionLocal() as db:
+            order_ids = select(Order.id).where(Order.user_id == user_id)
+            await db.execute(delete(OrderItem).where(OrderItem.order_id.in_(order_ids)))
+            await db.execute(delete(Order).where(Order.user_id == user_id))
+            await db.execute(delete(DailyProductSales).where(DailyProductSales.product_id == product_id))
+            await db.execute(delete(Product).where(Product.id == product_id))
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.commit()
+    await engine.dispose()
+    return passed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent checkouts of one product.")
+    parser.add_argument("--checkouts", type=int, default=500, help="Concurrent checkouts per mode.")
+    parser.add_argument("--stock", type=int, default=400, help="Starting stock of the product.")
+    parser.add_argument("--quantity", type=int, default=1, help="Units per checkout.")
+    parser.add_argument("--shards", type=int, nargs="+", default=[0, 8],
+                        help="Stock modes to compare: 0 = product row, N = N shards.")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args)) else 1)
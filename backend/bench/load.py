@@ -0,0 +1,232 @@
+"""
+API Load Test
+
+Drives the FastAPI app from main.py in-process with a weighted mix of realistic
+sessions and reports per-route latency percentiles and throughput as JSON, so runs
+can be diffed across commits.
+
+Scenarios (weights set with --mix):
+    browse:  GET /products/ then GET /products/{id}
+    login:   POST /token
+    order:   POST /orders/ with 1-5 random catalog lines
+    history: GET /users/{id}/orders
+
+Runs against the database configured in DATABASE_URL, which can be a local
+Postgres or an embedded stand-in such as sqlite+aiosqlite (pass --create-schema to
+create the tables there). The rows it seeds are removed when it finishes.
+
+Usage:
+    python -m bench.load [--products 1000] [--users 50] [--concurrency 32]
+                         [--duration 30] [--mix browse=60,login=5,order=20,history=15]
+                         [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+import uuid
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, insert, select
+
+from core.database import AsyncSessionLocal, engine
+from main import app
+from models.analytics import DailyProductSales
+from models.base import Base
+from models.order import Order, OrderItem
+from models.product import Product
+from models.user import User
+from utils.security import get_password_hash
+
+PASSWORD = "bench-password"
+DEFAULT_MIX = "browse=60,login=5,order=20,history=15"
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}', expected one of {sorted(SCENARIOS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+class Recorder:
+    """Collects latencies and status codes keyed by route template."""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    async def call(self, client, method, route, url, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies.setdefault(route, []).append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            self.errors[route] = self.errors.get(route, 0) + 1
+        return response
+
+    def report(self, elapsed):
+        routes = {}
+        for route, samples in sorted(self.latencies.items()):
+            routes[route] = {
+                "requests": len(samples),
+                "errors": self.errors.get(route, 0),
+                "rps": round(len(samples) / elapsed, 2),
+                "p50_ms": round(percentile(samples, 0.50), 2),
+                "p95_ms": round(percentile(samples, 0.95), 2),
+                "p99_ms": round(percentile(samples, 0.99), 2),
+            }
+        total = sum(r["requests"] for r in routes.values())
+        return {
+            "routes": routes,
+            "total": {
+                "requests": total,
+                "errors": sum(r["errors"] for r in routes.values()),
+                "rps": round(total / elapsed, 2),
+            },
+        }
+
+async def browse(client, recorder, session):
+    response = await recorder.call(client, "GET", "GET /products/", "/products/", params={"limit": 20})
+    if response.status_code == 200 and response.json():
+        product = random.choice(response.json())
+        await recorder.call(client, "GET", "GET /products/{product_id}", f"/products/{product['id']}")
+
+async def login(client, recorder, session):
+    await recorder.call(client, "POST", "POST /token", "/token", data={"username": session["email"], "password": PASSWORD})
+
+async def order(client, recorder, session):
+    lines = random.sample(session["product_ids"], random.randint(1, min(5, len(session["product_ids"]))))
+    await recorder.call(
+        client, "POST", "POST /orders/", "/orders/",
+        json={"items": [{"product_id": str(pid), "quantity": random.randint(1, 3)} for pid in lines]},
+        headers=session["headers"],
+    )
+
+async def history(client, recorder, session):
+    await recorder.call(
+        client, "GET", "GET /users/{user_id}/orders", f"/users/{session['user_id']}/orders",
+        params={"limit": 20}, headers=session["headers"],
+    )
+
+SCENARIOS = {"browse": browse, "login": login, "order": order, "history": history}
+
+async def seed(products, users):
+    """Insert bench products and users directly, sharing one precomputed password hash."""
+    tag = uuid.uuid4().hex[:8]
+    hashed = get_password_hash(PASSWORD)
+    product_rows = [
+        {"id": uuid.uuid4(), "name": f"bench-{tag}-product-{i}", "description": f"Load test product {i}",
+         "price": round(random.uniform(1, 500), 2), "image_url": None}
+        for i in range(products)
+    ]
+    user_rows = [
+        {"id": uuid.uuid4(), "email": f"bench-{tag}-{i}@example.com", "hashed_password": hashed,
+         "is_active": True, "is_admin": False}
+        for i in range(users)
+    ]
+    async with AsyncSessionLocal() as db:
+        if product_rows:
+            await db.execute(insert(Product), product_rows)
+        await db.execute(insert(User), user_rows)
+        await db.commit()
+    return [row["id"] for row in product_rows], user_rows
+
+async def cleanup(product_ids, user_ids):
+    async with AsyncSessionLocal() as db:
+        order_ids = select(Order.id).where(Order.user_id.in_(user_ids))
+        await db.execute(delete(OrderItem).where(OrderItem.order_id.in_(order_ids)))
+        await db.execute(delete(Order).where(Order.user_id.in_(user_ids)))
+        await db.execute(delete(DailyProductSales).where(DailyProductSales.product_id.in_(product_ids)))
+        await db.execute(delete(Product).where(Product.id.in_(product_ids)))
+        await db.execute(delete(User).where(User.id.in_(user_ids)))
+        await db.commit()
+
+async def worker(client, recorder, sessions, weights, deadline):
+    names = list(weights)
+    scenario_weights = list(weights.values())
+    while time.perf_counter() < deadline:
+        scenario = random.choices(names, scenario_weights)[0]
+        await SCENARIOS[scenario](client, recorder, random.choice(sessions))
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+async def run(args):
+    engine.echo = False
+    random.seed(args.seed)
+    weights = parse_mix(args.mix)
+    if args.create_schema:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    product_ids, users = await seed(args.products, args.users)
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            sessions = []
+            for user in users:
+                response = await client.post("/token", data={"username": user["email"], "password": PASSWORD})
+                response.raise_for_status()
+                sessions.append({
+                    "email": user["email"],
+                    "user_id": user["id"],
+                    "headers": {"Authorization": f"Bearer {response.json()['access_token']}"},
+                    "product_ids": product_ids,
+                })
+            if not product_ids:
+                # Fall back to whatever the catalog already holds
+                response = await client.get("/products/", params={"limit": 100})
+                for session in sessions:
+                    session["product_ids"] = [p["id"] for p in response.json()]
+
+            recorder = Recorder()
+            start = time.perf_counter()
+            deadline = start + args.duration
+            await asyncio.gather(*(worker(client, recorder, sessions, weights, deadline) for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - start
+    finally:
+        await cleanup(product_ids, [user["id"] for user in users])
+        await engine.dispose()
+
+    result = {
+        "revision": git_revision(),
+        "database": engine.url.get_backend_name(),
+        "config": {
+            "products": args.products,
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "mix": weights,
+            "seed": args.seed,
+        },
+        "elapsed_s": round(elapsed, 2),
+        **recorder.report(elapsed),
+    }
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the API with a weighted scenario mix.")
+    parser.add_argument("--products", type=int, default=1000, help="Products to seed.")
+    parser.add_argument("--users", type=int, default=50, help="Users to seed; each is one logged-in session.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent virtual clients.")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run the mix.")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Scenario weights, e.g. browse=60,order=20.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for scenario selection.")
+    parser.add_argument("--output", help="Also write the JSON report to this file.")
+    parser.add_argument("--create-schema", action="store_true", help="Create missing tables first (embedded databases).")
+    args = parser.parse_args()
+    asyncio.run(run(args))
@@ -0,0 +1,76 @@
+"""
+Login Spike Benchmark
+
+Measures GET /products/ latency while POST /token is hammered by concurrent
+clients. The app runs in-process on this event loop, so any bcrypt work done on
+the loop shows up directly as /products/ tail latency.
+
+Runs against the database configured in DATABASE_URL. The worker pool is taken
+from PASSWORD_HASH_EXECUTOR / PASSWORD_HASH_WORKERS / PASSWORD_HASH_MAX_PENDING.
+
+Usage:
+    python -m bench.login_spike [--duration 10] [--logins 32]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from httpx import ASGITransport, AsyncClient
+
+from core.database import engine
+from main import app
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+async def poll_products(client, stop, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/products/", params={"limit": 20})
+        latencies.append((time.perf_counter() - start) * 1000)
+
+async def hammer_login(client, stop, email, counts):
+    while not stop.is_set():
+        response = await client.post("/token", data={"username": email, "password": "bench-password"})
+        counts[response.status_code] = counts.get(response.status_code, 0) + 1
+
+async def phase(client, duration, logins, email):
+    stop = asyncio.Event()
+    latencies = []
+    counts = {}
+    tasks = [asyncio.create_task(poll_products(client, stop, latencies))]
+    tasks += [asyncio.create_task(hammer_login(client, stop, email, counts)) for _ in range(logins)]
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return {
+        "products_requests": len(latencies),
+        "products_p50_ms": round(percentile(latencies, 0.50), 2),
+        "products_p99_ms": round(percentile(latencies, 0.99), 2),
+        "token_responses": counts,
+    }
+
+async def run(duration, logins):
+    engine.echo = False
+    email = f"bench-{uuid.uuid4()}@example.com"
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        await client.post("/users/", json={"email": email, "password": "bench-password"})
+        idle = await phase(client, duration, 0, email)
+        spike = await phase(client, duration, logins, email)
+    print(f"{'':>12} {'requests':>9} {'p50 ms':>8} {'p99 ms':>8}  /token responses")
+    for name, result in (("idle", idle), ("login spike", spike)):
+        print(
+            f"{name:>12} {result['products_requests']:>9} {result['products_p50_ms']:>8} "
+            f"{result['products_p99_ms']:>8}  {result['token_responses']}"
+        )
+    await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark /products/ latency during a login spike.")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per phase.")
+    parser.add_argument("--logins", type=int, default=32, help="Concurrent /token clients during the spike.")
+    args = parser.parse_args()
+    asyncio.run(run(args.duration, args.logins))
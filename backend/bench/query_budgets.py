@@ -0,0 +1,115 @@
+"""
+Query Budget Check
+
+Calls the list and checkout endpoints in-process and fails if any of them issues
+more SQL statements than its budget, or repeats one statement with different
+parameters (an N+1 pattern such as a lazy-loaded relationship per row).
+
+Seeds enough orders, items and products that a per-row query would show up.
+Each endpoint is called once to warm the caches, then measured.
+
+Runs against the database configured in DATABASE_URL and removes the rows it
+creates when it finishes. Exits with status 1 if a budget is exceeded.
+
+Usage:
+    python -m bench.query_budgets [--orders 20] [--verbose]
+"""
+
+import argparse
+import asyncio
+import sys
+import uuid
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, select
+
+from core.database import AsyncSessionLocal, engine
+from main import app
+from models.analytics import DailyProductSales
+from models.order import Order, OrderItem
+from models.product import Product
+from models.user import User
+from utils.query_budget import QueryBudgetExceeded, QueryCounter
+from utils.security import get_password_hash
+
+PASSWORD = "bench-password"
+
+# (label, method, url template, max statements)
+BUDGETS = [
+    ("GET /products/", "GET", "/products/?limit=50", 2),
+    ("GET /products/{product_id}", "GET", "/products/{product_id}", 2),
+    ("GET /products/batch", "GET", "/products/batch?ids={product_ids}", 2),
+    ("GET /users/", "GET", "/users/?limit=50", 1),
+    ("GET /orders/", "GET", "/orders/?limit=50", 2),
+    ("GET /users/{user_id}/orders", "GET", "/users/{user_id}/orders", 2),
+    ("GET /users/{user_id}/orders?include_items=false", "GET", "/users/{user_id}/orders?include_items=false", 1),
+    ("GET /orders/{order_id}/items", "GET", "/orders/{order_id}/items", 1),
+    ("POST /orders/", "POST", "/orders/", 7),
+]
+
+async def run(orders, verbose):
+    engine.echo = False
+    async with AsyncSessionLocal() as db:
+        user = User(email=f"bench-{uuid.uuid4()}@example.com", hashed_password=get_password_hash(PASSWORD))
+        # Stock-tracked, so the checkout budget includes the reservation
+        products = [Product(name=f"bench-product-{i}", description="", price=1.0 + i, stock=10**6) for i in range(10)]
+        db.add(user)
+        db.add_all(products)
+        await db.commit()
+        user_id = user.id
+        product_ids = [p.id for p in products]
+
+    failures = 0
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            token = (await client.post("/token", data={"username": user.email, "password": PASSWORD})).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            cart = {"items": [{"product_id": str(pid), "quantity": 1} for pid in product_ids[:5]]}
+            for _ in range(orders):
+                (await client.post("/orders/", json=cart, headers=headers)).raise_for_status()
+            async with AsyncSessionLocal() as db:
+                order_id = (await db.execute(select(Order.id).where(Order.user_id == user_id).limit(1))).scalar_one()
+
+            print(f"{'endpoint':<50} {'budget':>6} {'used':>5}  result")
+            for label, method, url, budget in BUDGETS:
+                url = url.format(
+                    product_id=product_ids[0],
+                    product_ids=",".join(str(pid) for pid in product_ids),
+                    user_id=user_id,
+                    order_id=order_id,
+                )
+                kwargs = {"headers": headers}
+                if method == "POST":
+                    kwargs["json"] = cart
+                # Warm caches (principal, catalog version, statement cache) so the budget reflects steady state
+                await client.request(method, url, **kwargs)
+                counter = QueryCounter(engine, max_statements=budget, max_repeats=1)
+                try:
+                    with counter:
+                        response = await client.request(method, url, **kwargs)
+                        response.raise_for_status()
+                    result = "ok"
+                except QueryBudgetExceeded:
+                    failures += 1
+                    result = "OVER BUDGET"
+                print(f"{label:<50} {budget:>6} {counter.count:>5}  {result}")
+                if verbose or result != "ok":
+                    print(counter.report())
+    finally:
+        async with AsyncSessionLocal() as db:
+            order_ids = select(Order.id).where(Order.user_id == user_id)
+            await db.execute(delete(OrderItem).where(OrderItem.order_id.in_(order_ids)))
+            await db.execute(delete(Order).where(Order.user_id == user_id))
+            await db.execute(delete(DailyProductSales).where(DailyProductSales.product_id.in_(product_ids)))
+            await db.execute(delete(Product).where(Product.id.in_(product_ids)))
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.commit()
+        await engine.dispose()
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enforce SQL statement budgets on list and checkout endpoints.")
+    parser.add_argument("--orders", type=int, default=20, help="Orders to seed for the list endpoints.")
+    parser.add_argument("--verbose", action="store_true", help="Print the statement summary for every endpoint.")
+    args = parser.parse_args()
+    sys.exit(1 if asyncio.run(run(args.orders, args.verbose)) else 0)
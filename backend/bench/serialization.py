@@ -0,0 +1,91 @@
+"""
+List Serialization Micro-Benchmark
+
+Compares, per row, the CPU time and peak memory of the two ways a /products/ page
+can be produced:
+
+* orm:  ORM entities -> Pydantic validation (from_attributes) -> JSON
+* fast: projected columns -> plain dicts -> orjson
+
+Runs against the database configured in DATABASE_URL. Temporary products are
+created when the catalog is smaller than the requested page and removed afterwards.
+
+Usage:
+    python -m bench.serialization [--rows 1000] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import delete, func, select
+
+from core.database import AsyncSessionLocal, engine
+from models.product import Product
+from schemas.product import Product as ProductSchema
+from services import product as product_service
+from utils.serialization import dumps
+
+product_list_adapter = TypeAdapter(List[ProductSchema])
+
+async def orm_path(rows):
+    async with AsyncSessionLocal() as db:
+        products = await product_service.get_products(db, 0, rows)
+        return product_list_adapter.dump_json(product_list_adapter.validate_python(products, from_attributes=True))
+
+async def fast_path(rows):
+    async with AsyncSessionLocal() as db:
+        return dumps(await product_service.get_product_rows(db, 0, rows))
+
+async def measure(path, rows, repeat):
+    cpu = []
+    peaks = []
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.process_time()
+        body = await path(rows)
+        cpu.append(time.process_time() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    # tracemalloc inflates absolute CPU time equally for both paths; compare the ratio
+    return min(cpu) / rows * 1e6, min(peaks) / rows, len(body)
+
+async def run(rows, repeat):
+    engine.echo = False
+    created = []
+    async with AsyncSessionLocal() as db:
+        existing = (await db.execute(select(func.count()).select_from(Product))).scalar_one()
+        if existing < rows:
+            products = [
+                Product(name=f"bench-product-{i}", description="Benchmark product " * 10, price=9.99,
+                        image_url="https://images.unsplash.com/photo-1523275335684-37898b6baf30")
+                for i in range(rows - existing)
+            ]
+            db.add_all(products)
+            await db.commit()
+            created = [p.id for p in products]
+
+    try:
+        # Warm up connections and statement caches
+        await orm_path(rows)
+        await fast_path(rows)
+        print(f"{'path':>5} {'cpu us/row':>11} {'peak B/row':>11} {'body bytes':>11}")
+        for name, path in (("orm", orm_path), ("fast", fast_path)):
+            cpu, peak, size = await measure(path, rows, repeat)
+            print(f"{name:>5} {cpu:>11.2f} {peak:>11.0f} {size:>11}")
+    finally:
+        if created:
+            async with AsyncSessionLocal() as db:
+                await db.execute(delete(Product).where(Product.id.in_(created)))
+                await db.commit()
+        await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare ORM and projected serialization of product pages.")
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per page.")
+    parser.add_argument("--repeat", type=int, default=20, help="Measurements per path (best is reported).")
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.repeat))
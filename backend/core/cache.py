@@ -0,0 +1,102 @@
+"""
+In-Process Cache Module
+
+This module provides a small bounded LRU cache with per-entry expiry and hit/miss
+counters, plus the shared cache instances used across the application.
+Caches are per worker process; the TTL bounds how long another worker can serve
+a stale entry after an invalidation.
+"""
+
+import time
+from collections import OrderedDict
+from core.config import settings
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after a fixed time-to-live.
+
+    Attributes:
+        maxsize (int): The maximum number of entries kept; the least recently used is evicted first.
+        ttl (float): The number of seconds an entry stays valid.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that found no valid entry.
+        evictions (int): Number of entries dropped because the cache was full.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value for `key`, or `default` if it is missing or expired.
+        """
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value):
+        """
+        Stores `value` under `key`, evicting the least recently used entry if full.
+        """
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key):
+        """
+        Removes `key` from the cache if present.
+        """
+        self._data.pop(key, None)
+
+    def clear(self):
+        """
+        Removes every entry. Counters are kept.
+        """
+        self._data.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns the current size and counters of the cache.
+        """
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+# Authenticated principals keyed by token subject (email); every worker drops a changed user's entry
+# (see services.user.update_user_flags), the TTL covers workers that missed the notification
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+# Rendered catalog responses (body, headers and compressed copies) keyed by (catalog version, path, query);
+# old versions age out through LRU
+catalog_response_cache = TTLCache(
+    maxsize=settings.CATALOG_RESPONSE_CACHE_SIZE,
+    ttl=3600,
+)
+
+# IDs of users and orders written recently by this worker; reads about them skip the replica
+recent_writes_cache = TTLCache(
+    maxsize=100_000,
+    ttl=settings.READ_YOUR_WRITES_SECONDS,
+)
@@ -14,20 +14,115 @@ import re
 # Load environment variables from .env file
 load_dotenv()
 
+def _asyncpg_url(url: str) -> str:
+    """
+    Adjusts a PostgreSQL connection string for SQLAlchemy's asyncpg driver.
+    """
+    # Ensure we are using the asyncpg driver for PostgreSQL
+    # SQLAlchemy's async engine requires 'postgresql+asyncpg://' scheme
+    if url.startswith("postgresql://"):
+        url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+    # Fix for asyncpg: replace 'sslmode' with 'ssl' in query parameters
+    # asyncpg uses 'ssl' parameter instead of 'sslmode'
+    if "sslmode=" in url:
+        url = url.replace("sslmode=", "ssl=")
+
+    # Fix for asyncpg: remove 'channel_binding' if present
+    # asyncpg does not support 'channel_binding' parameter
+    if "channel_binding=" in url:
+        url = re.sub(r"[?&]channel_binding=[^&]+", "", url)
+    return url
+
 class Settings:
     """
     Application Settings
 
     Attributes:
         DATABASE_URL (str): The database connection string.
+        READ_DATABASE_URL (str, optional): Connection string of a read replica used by read-only endpoints.
         SECRET_KEY (str): The secret key used for JWT encoding/decoding.
         ALGORITHM (str): The algorithm used for JWT token generation.
         ACCESS_TOKEN_EXPIRE_MINUTES (int): The expiration time for access tokens in minutes.
+        BULK_ORDER_MAX_BATCH (int): The maximum number of orders accepted by POST /orders/bulk.
+        BULK_ORDER_CHUNK_SIZE (int): The number of orders written per transaction during bulk ingestion.
+        PRINCIPAL_CACHE_MAX_SIZE (int): The maximum number of authenticated users cached per worker (0 disables the cache).
+        PRINCIPAL_CACHE_TTL_SECONDS (float): How long a cached authenticated user stays valid.
+        PASSWORD_HASH_EXECUTOR (str): Worker pool used for bcrypt, either "thread" or "process".
+        PASSWORD_HASH_WORKERS (int): The number of bcrypt workers.
+        PASSWORD_HASH_MAX_PENDING (int): Hashing jobs allowed in flight before new ones are rejected.
+        CATALOG_VERSION_TTL_SECONDS (float): How long a worker trusts its copy of the catalog version before re-reading it.
+        CATALOG_RESPONSE_CACHE_SIZE (int): The maximum number of rendered catalog responses cached per worker.
+        DB_ECHO (bool): Log every SQL statement. Off by default; enable for debugging only.
+        DB_POOL_SIZE (int): Connections kept open per worker.
+        DB_MAX_OVERFLOW (int): Extra connections a worker may open above DB_POOL_SIZE under load.
+        DB_POOL_TIMEOUT (float): Seconds a request waits for a free connection before failing.
+        DB_POOL_RECYCLE (int): Seconds after which a connection is replaced (keeps it below server/pooler idle limits).
+        DB_POOL_PRE_PING (bool): Test connections on checkout so dropped ones are replaced transparently.
+        DB_STATEMENT_CACHE_SIZE (int): asyncpg prepared statement cache size per connection.
+            Set to 0 behind a PgBouncer-style pooler in transaction mode that does not support prepared statements.
+        DB_POOL_PREWARM (int): Connections each worker opens at startup, before taking traffic (capped at DB_POOL_SIZE).
+        SCHEMA_CHECK (str): What a worker does at startup if the database is not at the Alembic head: "error", "warn" or "off".
+        STARTUP_BUDGET_SECONDS (float): Startup time (imports plus database warm-up) above which a warning is logged.
+        REPLICA_MAX_LAG_SECONDS (float): Replication lag above which reads fall back to the primary.
+        REPLICA_CHECK_INTERVAL_SECONDS (float): How long a worker trusts its last replica lag measurement.
+        REPLICA_RETRY_SECONDS (float): How long reads stay on the primary after the replica failed to connect.
+        READ_YOUR_WRITES_SECONDS (float): How long a client's reads are pinned to the primary after its own write.
+        IDEMPOTENCY_KEY_TTL_SECONDS (int): How long a stored Idempotency-Key response is replayed before the key expires.
+        IDEMPOTENCY_WAIT_SECONDS (float): How long a duplicate request waits for the in-flight original before getting a 409.
+        IDEMPOTENCY_LOCK_TIMEOUT_SECONDS (float): Age after which an unfinished claim is presumed dead and can be taken over.
+        IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS (float): How often each worker deletes expired idempotency keys (0 disables).
+        CHECKOUT_MODE (str): "sync" commits each order in its request; "async" queues it, answers 202 and group-commits.
+        ORDER_BATCH_MAX_SIZE (int): The maximum number of queued orders committed in one transaction (async checkout).
+        ORDER_BATCH_MAX_DELAY_SECONDS (float): How long the order writer waits for a batch to fill before committing it.
+        ORDER_QUEUE_MAX_SIZE (int): Orders a worker may hold uncommitted; beyond this async checkout answers 503.
+        COMPRESSION_MIN_SIZE (int): Responses smaller than this many bytes are sent uncompressed.
+        PRODUCT_BATCH_MAX_SIZE (int): The maximum number of IDs accepted by GET /products/batch.
+        CATALOG_EVENTS_QUEUE_SIZE (int): Catalog events buffered per SSE client; a client further behind is told to resync.
+        CATALOG_EVENTS_MAX_SUBSCRIBERS (int): Concurrent GET /products/events streams per worker; beyond this it answers 503.
+        CATALOG_EVENTS_HEARTBEAT_SECONDS (float): Idle time after which an SSE keep-alive comment is sent.
     """
     DATABASE_URL = os.getenv("DATABASE_URL")
+    READ_DATABASE_URL = os.getenv("READ_DATABASE_URL") or None
     SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-keep-it-secret")
     ALGORITHM = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES = 30
+    BULK_ORDER_MAX_BATCH = int(os.getenv("BULK_ORDER_MAX_BATCH", "10000"))
+    BULK_ORDER_CHUNK_SIZE = int(os.getenv("BULK_ORDER_CHUNK_SIZE", "500"))
+    PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+    PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+    PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+    CATALOG_VERSION_TTL_SECONDS = float(os.getenv("CATALOG_VERSION_TTL_SECONDS", "1"))
+    CATALOG_RESPONSE_CACHE_SIZE = int(os.getenv("CATALOG_RESPONSE_CACHE_SIZE", "1024"))
+    DB_ECHO = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+    DB_POOL_PREWARM = int(os.getenv("DB_POOL_PREWARM", "2"))
+    SCHEMA_CHECK = os.getenv("SCHEMA_CHECK", "warn").lower()
+    STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "2"))
+    REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+    REPLICA_CHECK_INTERVAL_SECONDS = float(os.getenv("REPLICA_CHECK_INTERVAL_SECONDS", "1"))
+    REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+    READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "30"))
+    IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", "86400"))
+    IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT_SECONDS", "60"))
+    IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS = float(os.getenv("IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS", "600"))
+    CHECKOUT_MODE = os.getenv("CHECKOUT_MODE", "sync").lower()
+    ORDER_BATCH_MAX_SIZE = int(os.getenv("ORDER_BATCH_MAX_SIZE", "200"))
+    ORDER_BATCH_MAX_DELAY_SECONDS = float(os.getenv("ORDER_BATCH_MAX_DELAY_SECONDS", "0.01"))
+    ORDER_QUEUE_MAX_SIZE = int(os.getenv("ORDER_QUEUE_MAX_SIZE", "10000"))
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    PRODUCT_BATCH_MAX_SIZE = int(os.getenv("PRODUCT_BATCH_MAX_SIZE", "100"))
+    CATALOG_EVENTS_QUEUE_SIZE = int(os.getenv("CATALOG_EVENTS_QUEUE_SIZE", "64"))
+    CATALOG_EVENTS_MAX_SUBSCRIBERS = int(os.getenv("CATALOG_EVENTS_MAX_SUBSCRIBERS", "10000"))
+    CATALOG_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("CATALOG_EVENTS_HEARTBEAT_SECONDS", "15"))
 
     def __init__(self):
         """
@@ -38,20 +133,15 @@ class Settings:
         if not self.DATABASE_URL:
             raise ValueError("DATABASE_URL is not set in .env file")
 
-        # Ensure we are using the asyncpg driver for PostgreSQL
-        # SQLAlchemy's async engine requires 'postgresql+asyncpg://' scheme
-        if self.DATABASE_URL.startswith("postgresql://"):
-            self.DATABASE_URL = self.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+        if self.PASSWORD_HASH_EXECUTOR not in ("thread", "process"):
+            raise ValueError("PASSWORD_HASH_EXECUTOR must be 'thread' or 'process'")
 
-        # Fix for asyncpg: replace 'sslmode' with 'ssl' in query parameters
-        # asyncpg uses 'ssl' parameter instead of 'sslmode'
-        if "sslmode=" in self.DATABASE_URL:
-            self.DATABASE_URL = self.DATABASE_URL.replace("sslmode=", "ssl=")
+        if self.SCHEMA_CHECK not in ("error", "warn", "off"):
+            raise ValueError("SCHEMA_CHECK must be 'error', 'warn' or 'off'")
 
-        # Fix for asyncpg: remove 'channel_binding' if present
-        # asyncpg does not support 'channel_binding' parameter
-        if "channel_binding=" in self.DATABASE_URL:
-            self.DATABASE_URL = re.sub(r"[?&]channel_binding=[^&]+", "", self.DATABASE_URL)
+        self.DATABASE_URL = _asyncpg_url(self.DATABASE_URL)
+        if self.READ_DATABASE_URL:
+            self.READ_DATABASE_URL = _asyncpg_url(self.READ_DATABASE_URL)
 
 # Instantiate the settings object to be used across the app
 settings = Settings()
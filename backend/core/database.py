@@ -2,19 +2,130 @@
 Database Configuration
 
 This module sets up the database connection using SQLAlchemy's async engine.
-It provides the session factory and the base class for ORM models.
+It provides the session factories and the base class for ORM models.
+
+When READ_DATABASE_URL is set, read-only endpoints can depend on get_read_db
+instead of get_db to be served by the replica. A read falls back to the primary
+when the replica lags by more than REPLICA_MAX_LAG_SECONDS or cannot be reached.
+It also falls back for READ_YOUR_WRITES_SECONDS after the client's own write: the
+response to a write carries an X-Read-Primary-Until header that the client sends
+back on its next requests, so whichever worker serves them reads from the primary.
+Clients that do not send it back are still pinned on the worker that served the
+write, for requests about the users or orders it wrote.
 """
 
 # Import SQLAlchemy's async engine and session components
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 # Import sessionmaker to create a session factory
 from sqlalchemy.orm import sessionmaker, declarative_base
+# Import the asyncio-compatible queue pool to extend it with wait time statistics
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+# Import SQLAlchemy's exceptions to count checkout timeouts and detect an unreachable replica
+from sqlalchemy import exc, text
+# Import Request so get_read_db can see the path parameters
+from fastapi import Request
+# Import time for measuring pool wait times
+import time
+# Import asyncio for connection timeout errors
+import asyncio
+# Import ContextVar to hold the read-your-writes pin of the current request
+from contextvars import ContextVar
+from typing import Optional
 # Import application settings (including database URL)
 from core.config import settings
+# Import the per-request metrics hooks
+from core.metrics import instrument_engine, record_pool_wait
+# Import the cache of recently written users and orders (read-your-writes)
+from core.cache import recent_writes_cache
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long checkouts wait for a connection.
+
+    The wait includes time spent opening a new connection when the pool grows.
+
+    Attributes:
+        checkouts (int): Number of connections handed out.
+        timeouts (int): Number of checkouts that gave up after pool_timeout.
+        wait_total (float): Total seconds spent waiting across all checkouts.
+        wait_max (float): Longest single wait in seconds.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            record_pool_wait(waited)
+        self.checkouts += 1
+        return connection
+
+def _create_engine(url: str):
+    # Driver-specific connection arguments
+    connect_args = {}
+    if url.startswith("postgresql+asyncpg://"):
+        # asyncpg caches prepared statements per connection; 0 disables it (needed by some poolers)
+        connect_args["prepared_statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+
+    # Pool sizing and SQL echo come from settings (see core.config.Settings)
+    new_engine = create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+    # Count SQL statements and DB time per request (see core.metrics)
+    instrument_engine(new_engine)
+    return new_engine
+
+# Create the async database engine for the primary
+engine = _create_engine(settings.DATABASE_URL)
+
+# Create the optional read replica engine (None when READ_DATABASE_URL is not set)
+read_engine = _create_engine(settings.READ_DATABASE_URL) if settings.READ_DATABASE_URL else None
 
-# Create the async database engine
-# echo=True enables logging of all generated SQL statements (useful for debugging)
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+def pool_status(target=None) -> dict:
+    """
+    Reports the current state and wait statistics of the engine's connection pool.
+
+    Args:
+        target (AsyncEngine, optional): The engine to report on. Defaults to the primary.
+
+    Returns:
+        dict: Configured sizes, checked-out/idle/overflow counts and checkout wait times.
+    """
+    pool = (target or engine).sync_engine.pool
+    checkouts = getattr(pool, "checkouts", 0)
+    wait_total = getattr(pool, "wait_total", 0.0)
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": checkouts,
+        "timeouts": getattr(pool, "timeouts", 0),
+        "wait_avg_ms": round(wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+        "wait_max_ms": round(getattr(pool, "wait_max", 0.0) * 1000, 3),
+    }
 
 # Create a configured "Session" class
 # This factory will generate new AsyncSession instances for each request
@@ -45,3 +156,201 @@ async def get_db():
         finally:
             # Ensure the session is closed even if an error occurs
             await session.close()
+
+# Create the session factory for read-only work
+# Bound to the replica when one is configured, otherwise identical to AsyncSessionLocal
+ReadSessionLocal = sessionmaker(
+    bind=read_engine or engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+# Replication lag in seconds; 0 when caught up or when the server is not a standby
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT COALESCE(
+        CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+             ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END, 0)
+    """
+)
+
+class ReplicaState:
+    """
+    This worker's view of the read replica.
+
+    Attributes:
+        lag (float, optional): Replication lag in seconds at the last check.
+        checked_at (float): Monotonic time of the last lag check.
+        down_until (float): Monotonic time until which the replica is skipped after a connection failure.
+        reads (int): Sessions served by the replica.
+        fallbacks (int): Read sessions served by the primary instead.
+        errors (int): Failed attempts to reach the replica.
+    """
+
+    def __init__(self):
+        self.lag = None
+        self.checked_at = float("-inf")
+        self.down_until = float("-inf")
+        self.reads = 0
+        self.fallbacks = 0
+        self.errors = 0
+
+replica_state = ReplicaState()
+
+# Response header carrying the read-your-writes pin; clients send it back on later requests
+READ_PIN_HEADER = "X-Read-Primary-Until"
+
+class ReadPin:
+    """
+    The read-your-writes pin set while serving one request.
+
+    Attributes:
+        until (float, optional): Unix time until which the client's reads should use the primary.
+    """
+    __slots__ = ("until",)
+
+    def __init__(self):
+        self.until = None
+
+# Pin of the request being served by the current task, if any
+current_read_pin: ContextVar[Optional[ReadPin]] = ContextVar("current_read_pin", default=None)
+
+def mark_written(*ids):
+    """
+    Pins the client's reads to the primary for READ_YOUR_WRITES_SECONDS.
+
+    Call it after committing a write whose result the client is likely to read back.
+    The response then carries READ_PIN_HEADER (see ReadPinMiddleware) for the client to
+    send back to any worker; reads about the given user or order IDs are also pinned on
+    this worker for clients that do not.
+    """
+    for value in ids:
+        recent_writes_cache.set(str(value), True)
+    pin = current_read_pin.get()
+    if pin is not None:
+        pin.until = time.time() + settings.READ_YOUR_WRITES_SECONDS
+
+def _client_pinned(request: Request) -> bool:
+    # Honours a pin sent back by the client, bounded so it cannot outlast a fresh write's pin
+    try:
+        until = float(request.headers.get(READ_PIN_HEADER, ""))
+    except ValueError:
+        return False
+    now = time.time()
+    return now < until <= now + settings.READ_YOUR_WRITES_SECONDS
+
+class ReadPinMiddleware:
+    """
+    ASGI middleware that adds READ_PIN_HEADER to the responses of requests that called mark_written().
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        pin = ReadPin()
+        token = current_read_pin.set(pin)
+
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start" and pin.until is not None:
+                headers = list(message.get("headers", []))
+                headers.append((READ_PIN_HEADER.lower().encode(), f"{pin.until:.3f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_pin)
+        finally:
+            current_read_pin.reset(token)
+
+async def _open_replica_session():
+    now = time.monotonic()
+    if read_engine is None or now < replica_state.down_until:
+        return None
+    session = ReadSessionLocal()
+    try:
+        if now - replica_state.checked_at >= settings.REPLICA_CHECK_INTERVAL_SECONDS:
+            if read_engine.dialect.name == "postgresql":
+                replica_state.lag = float((await session.execute(REPLICA_LAG_QUERY)).scalar_one())
+            else:
+                await session.connection()
+                replica_state.lag = 0.0
+            replica_state.checked_at = now
+        else:
+            # Connect now so an unreachable replica falls back here rather than mid-request
+            await session.connection()
+    except (exc.DBAPIError, exc.TimeoutError, OSError, asyncio.TimeoutError):
+        await session.close()
+        replica_state.errors += 1
+        replica_state.down_until = now + settings.REPLICA_RETRY_SECONDS
+        return None
+    if replica_state.lag > settings.REPLICA_MAX_LAG_SECONDS:
+        await session.close()
+        return None
+    return session
+
+async def open_read_session(pin_to_primary: bool = False) -> AsyncSession:
+    """
+    Opens a session for read-only work on the replica, or on the primary as a fallback.
+
+    The caller must close the session (e.g. `async with await open_read_session() as db`).
+
+    Args:
+        pin_to_primary (bool): Skip the replica, e.g. to read the caller's own recent write.
+
+    Returns:
+        AsyncSession: A session; `session.info["replica"]` tells which database serves it.
+    """
+    session = None if pin_to_primary else await _open_replica_session()
+    if session is not None:
+        replica_state.reads += 1
+    else:
+        if read_engine is not None:
+            replica_state.fallbacks += 1
+        session = AsyncSessionLocal()
+    session.info["replica"] = session.bind is read_engine and read_engine is not None
+    return session
+
+# Dependency to get a read-only database session
+async def get_read_db(request: Request):
+    """
+    Dependency generator that yields a session for read-only route handlers.
+
+    Served by the replica when it is configured, reachable and within
+    REPLICA_MAX_LAG_SECONDS; otherwise by the primary. Requests that send back a
+    current READ_PIN_HEADER, or whose path parameters name a user or order written
+    recently by this worker, always use the primary. Never write through this session.
+
+    Yields:
+        AsyncSession: An active database session.
+    """
+    pinned = _client_pinned(request) or any(
+        recent_writes_cache.get(str(value)) for value in request.path_params.values()
+    )
+    session = await open_read_session(pin_to_primary=pinned)
+    async with session:
+        yield session
+
+def replica_status() -> dict:
+    """
+    Reports whether a replica is configured, its last measured lag and routing counters.
+
+    Returns:
+        dict: Replica configuration, health and per-worker read routing counts.
+    """
+    now = time.monotonic()
+    return {
+        "configured": read_engine is not None,
+        "available": read_engine is not None and now >= replica_state.down_until,
+        "lag_seconds": replica_state.lag,
+        "max_lag_seconds": settings.REPLICA_MAX_LAG_SECONDS,
+        "reads": replica_state.reads,
+        "fallbacks": replica_state.fallbacks,
+        "errors": replica_state.errors,
+        "pool": pool_status(read_engine) if read_engine is not None else None,
+    }
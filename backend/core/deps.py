@@ -4,22 +4,47 @@ Dependencies Module
 This module defines FastAPI dependencies used across the application.
 It primarily handles authentication and authorization by providing a dependency
 to retrieve the current authenticated user from the JWT token.
+Authenticated users are cached as detached snapshots so most requests skip the
+user lookup entirely.
 """
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.database import get_db
 from core.config import settings
 from services import user as user_service
 from schemas.token import TokenData
+from core.cache import principal_cache
+from dataclasses import dataclass
+from uuid import UUID
 
 # Define the OAuth2 scheme for token retrieval
 # This tells FastAPI that the token is retrieved from the "Authorization" header
 # and the token URL is "/token"
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+@dataclass(frozen=True)
+class Principal:
+    """
+    Lightweight, immutable snapshot of an authenticated user.
+
+    It is detached from any database session, so it can be shared between requests
+    through the principal cache. It exposes the same fields as the `schemas.user.User`
+    response model. Code that changes these fields must drop the cached principal on
+    every worker, as services.user.update_user_flags does.
+
+    Attributes:
+        id (UUID): The unique identifier of the user.
+        email (str): The user's email address (token subject).
+        is_active (bool): Whether the user account is active.
+        is_admin (bool): Whether the user has admin privileges.
+    """
+    id: UUID
+    email: str
+    is_active: bool
+    is_admin: bool
+
 async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     """
     Dependency to get the current authenticated user.
@@ -31,21 +56,25 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     4. Fetches the user from the database using the email.
     5. Returns the user object if valid, otherwise raises an HTTP 401 Unauthorized exception.
 
+    Step 4 is skipped when a snapshot of the user is in the principal cache.
+
     Args:
         token (str): The JWT access token.
         db (AsyncSession): The database session.
 
     Returns:
-        User: The authenticated user object.
+        Principal: A snapshot of the authenticated user.
 
     Raises:
-        HTTPException: If the token is invalid, expired, or the user does not exist.
+        HTTPException: If the token is invalid, expired, the user does not exist or is inactive.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    # Imported here rather than at module level to keep it off the application import (see utils.security)
+    from jose import JWTError, jwt
     try:
         # Decode the JWT token
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
@@ -59,10 +88,40 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
         # Raise exception if token decoding fails
         raise credentials_exception
     
-    # Fetch the user from the database
-    user = await user_service.get_user_by_email(db, email=token_data.email)
-    if user is None:
-        # Raise exception if user is not found
-        raise credentials_exception
-    
-    return user
+    # Serve the user from the principal cache when possible
+    principal = principal_cache.get(token_data.email)
+    if principal is None:
+        # Fetch the user from the database
+        user = await user_service.get_user_by_email(db, email=token_data.email)
+        if user is None:
+            # Raise exception if user is not found
+            raise credentials_exception
+        principal = Principal(
+            id=user.id,
+            email=user.email,
+            is_active=user.is_active,
+            is_admin=user.is_admin,
+        )
+        principal_cache.set(token_data.email, principal)
+
+    if not principal.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+
+    return principal
+
+async def get_current_admin(current_user: Principal = Depends(get_current_user)):
+    """
+    Dependency to get the current authenticated user, who must be an administrator.
+
+    Args:
+        current_user (Principal): The authenticated user.
+
+    Returns:
+        Principal: A snapshot of the authenticated administrator.
+
+    Raises:
+        HTTPException: 403 error if the user is not an administrator.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Administrator privileges required")
+    return current_user
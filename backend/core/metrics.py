@@ -0,0 +1,242 @@
+"""
+Request Metrics Module
+
+This module records per-route performance metrics and renders them in the
+Prometheus text exposition format:
+
+* request latency histogram
+* SQL statements executed and time spent in the database
+* time spent waiting for a pooled connection
+* time spent encoding JSON on the fast serialization path
+
+Each request gets a RequestTimings object in a context variable. The SQLAlchemy
+cursor hooks and the connection pool add to it, and MetricsMiddleware folds it
+into the per-route totals once the response has been sent. It also reports the
+same timings to the browser in a Server-Timing header.
+Metrics are per worker process, like the in-process caches.
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Label used for requests that did not match any route, to keep label cardinality bounded
+UNMATCHED_ROUTE = "unmatched"
+
+class RequestTimings:
+    """
+    Timings accumulated while serving a single request.
+
+    Attributes:
+        statements (int): Number of SQL statements executed.
+        db (float): Seconds spent executing SQL statements.
+        pool_wait (float): Seconds spent waiting for a pooled connection.
+        serialize (float): Seconds spent encoding JSON via utils.serialization.
+    """
+    __slots__ = ("statements", "db", "pool_wait", "serialize")
+
+    def __init__(self):
+        self.statements = 0
+        self.db = 0.0
+        self.pool_wait = 0.0
+        self.serialize = 0.0
+
+# Timings of the request being served by the current task, if any
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+class RouteMetrics:
+    """
+    Aggregated metrics for one (method, route template, status) combination.
+    """
+    __slots__ = ("buckets", "count", "latency", "statements", "db", "pool_wait", "serialize")
+
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.latency = 0.0
+        self.statements = 0
+        self.db = 0.0
+        self.pool_wait = 0.0
+        self.serialize = 0.0
+
+    def observe(self, latency: float, timings: RequestTimings):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.buckets[i] += 1
+                break
+        self.count += 1
+        self.latency += latency
+        self.statements += timings.statements
+        self.db += timings.db
+        self.pool_wait += timings.pool_wait
+        self.serialize += timings.serialize
+
+class MetricsRegistry:
+    """
+    Per-route request metrics of this worker process.
+    """
+
+    def __init__(self):
+        self.routes = {}
+
+    def observe(self, method: str, route: str, status: int, latency: float, timings: RequestTimings):
+        key = (method, route, str(status))
+        metrics = self.routes.get(key)
+        if metrics is None:
+            metrics = self.routes[key] = RouteMetrics()
+        metrics.observe(latency, timings)
+
+    def clear(self):
+        self.routes.clear()
+
+    def render(self, gauges: Optional[dict] = None) -> str:
+        """
+        Renders all metrics in the Prometheus text exposition format (version 0.0.4).
+
+        Args:
+            gauges (dict, optional): Extra unlabeled gauges to append, keyed by metric name.
+
+        Returns:
+            str: The exposition text.
+        """
+        routes = sorted(self.routes.items())
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route template.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route, status), metrics in routes:
+            labels = f'method="{method}",route="{_escape(route)}",status="{status}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, metrics.buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {metrics.count}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {metrics.latency:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {metrics.count}")
+
+        counters = (
+            ("http_request_sql_statements_total", "SQL statements executed while serving requests.", "statements"),
+            ("http_request_db_seconds_total", "Time spent executing SQL while serving requests.", "db"),
+            ("http_request_pool_wait_seconds_total", "Time spent waiting for a pooled connection.", "pool_wait"),
+            ("http_request_serialize_seconds_total", "Time spent encoding JSON on the fast path.", "serialize"),
+        )
+        for name, help_text, attr in counters:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for (method, route, status), metrics in routes:
+                value = getattr(metrics, attr)
+                value = value if isinstance(value, int) else f"{value:.6f}"
+                lines.append(f'{name}{{method="{method}",route="{_escape(route)}",status="{status}"}} {value}')
+
+        for name, value in (gauges or {}).items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+# The registry shared by the middleware and the /metrics endpoint
+registry = MetricsRegistry()
+
+def record_pool_wait(seconds: float):
+    """
+    Adds connection pool wait time to the current request, if any.
+    """
+    timings = current_timings.get()
+    if timings is not None:
+        timings.pool_wait += seconds
+
+def record_serialize(seconds: float):
+    """
+    Adds JSON encoding time to the current request, if any.
+    """
+    timings = current_timings.get()
+    if timings is not None:
+        timings.serialize += seconds
+
+def instrument_engine(engine):
+    """
+    Installs cursor execution hooks that count statements and DB time per request.
+
+    Args:
+        engine: The AsyncEngine (or Engine) to instrument.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        timings = current_timings.get()
+        if timings is not None:
+            timings.statements += 1
+            timings.db += time.perf_counter() - start
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        # Failed statements never reach after_cursor_execute
+        if context.connection is not None and context.connection.info.get("query_start"):
+            context.connection.info["query_start"].pop()
+
+def _server_timing(total: float, timings: RequestTimings) -> str:
+    app = max(total - timings.db - timings.pool_wait - timings.serialize, 0.0)
+    return (
+        f'db;dur={timings.db * 1000:.2f};desc="{timings.statements} queries", '
+        f"pool;dur={timings.pool_wait * 1000:.2f}, "
+        f"serialize;dur={timings.serialize * 1000:.2f}, "
+        f"app;dur={app * 1000:.2f}, "
+        f"total;dur={total * 1000:.2f}"
+    )
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that times each HTTP request and records it under its route template.
+
+    The Server-Timing header reflects the work done before the response headers are
+    sent; for streaming responses the recorded latency also covers the body.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(time.perf_counter() - start, timings).encode()))
+                # Lets the cross-origin frontend read Server-Timing via the Resource Timing API
+                headers.append((b"timing-allow-origin", b"*"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            route = scope.get("route")
+            registry.observe(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status,
+                time.perf_counter() - start,
+                timings,
+            )
+            current_timings.reset(token)
@@ -0,0 +1,125 @@
+"""
+Database Notifications
+
+Relays PostgreSQL NOTIFY messages between workers. Writers send a notification
+inside their transaction with notify(), so it is delivered only if the write
+commits. Every worker LISTENs on one dedicated connection for all registered
+channels and hands each payload to the channel's handler.
+
+The connection is re-established with backoff when it is lost. Notifications
+sent while it was down are gone, so each channel's on_reconnect handler is
+called to let the feature recover (e.g. drop caches or tell clients to resync).
+Elsewhere than on PostgreSQL (e.g. SQLite in development) nothing is sent and
+nothing is heard, and every worker only sees its own writes.
+"""
+
+import asyncio
+import logging
+from typing import Callable, Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.database import engine
+
+logger = logging.getLogger("uvicorn.error")
+
+# How often an idle LISTEN connection is checked for having been closed
+CHECK_INTERVAL_SECONDS = 15
+
+class NotificationListener:
+    """
+    Holds this worker's LISTEN connection and dispatches notifications per channel.
+
+    Attributes:
+        channels (dict): Channel name -> (on_notify, on_reconnect) handlers.
+    """
+
+    def __init__(self):
+        self.channels = {}
+        self.task = None
+
+    def register(self, channel: str, on_notify: Callable[[str], None], on_reconnect: Optional[Callable[[], None]] = None):
+        """
+        Subscribes a handler to a channel. Register before start().
+
+        Args:
+            channel (str): The NOTIFY channel.
+            on_notify (Callable[[str], None]): Called with each payload; must not block.
+            on_reconnect (Callable[[], None], optional): Called after notifications may have been lost.
+        """
+        self.channels[channel] = (on_notify, on_reconnect)
+
+    def start(self):
+        """
+        Starts listening when the database is PostgreSQL.
+        """
+        if engine.dialect.name == "postgresql" and self.channels:
+            self.task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def _dispatch(self, connection, pid, channel, payload):
+        on_notify, _ = self.channels[channel]
+        try:
+            on_notify(payload)
+        except Exception:
+            logger.exception(f"Handling a notification on {channel} failed")
+
+    def _reconnected(self):
+        for _, on_reconnect in self.channels.values():
+            if on_reconnect is not None:
+                on_reconnect()
+
+    async def _listen(self):
+        # Holds one pooled connection for LISTEN; reconnects with backoff
+        delay = 1.0
+        connected_before = False
+        while True:
+            lost = asyncio.Event()
+            try:
+                async with engine.connect() as conn:
+                    raw = (await conn.get_raw_connection()).driver_connection
+                    raw.add_termination_listener(lambda connection: lost.set())
+                    for channel in self.channels:
+                        await raw.add_listener(channel, self._dispatch)
+                    if connected_before:
+                        # Other workers' notifications sent while disconnected are gone
+                        self._reconnected()
+                    connected_before = True
+                    delay = 1.0
+                    while not lost.is_set() and not raw.is_closed():
+                        try:
+                            await asyncio.wait_for(lost.wait(), CHECK_INTERVAL_SECONDS)
+                        except asyncio.TimeoutError:
+                            pass
+                    await conn.invalidate()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(f"Notification listener failed ({exc.__class__.__name__}), retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+async def notify(db: AsyncSession, channel: str, payload: str):
+    """
+    Sends a notification to every worker when the caller's transaction commits.
+
+    A no-op outside PostgreSQL. Payloads must stay below 8000 bytes.
+
+    Args:
+        db (AsyncSession): The session of the write; the notification is transactional.
+        channel (str): The NOTIFY channel.
+        payload (str): The message.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return
+    await db.execute(select(func.pg_notify(channel, payload)))
+
+# The listener shared by the features that register channels and the application lifespan
+notification_listener = NotificationListener()
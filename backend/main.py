@@ -1,26 +1,91 @@
 """
 Main Application Entry Point
 
-This module initializes the FastAPI application, configures middleware (CORS),
-sets up database tables on startup, and includes the various API routers.
+This module initializes the FastAPI application, configures middleware (CORS, metrics),
+verifies the database schema and warms the connection pool on startup, and includes
+the various API routers.
 """
 
+# Record when the import started so startup can be measured against its budget
+import time
+_import_started = time.perf_counter()
+
+# Import asyncio to run background maintenance tasks
+import asyncio
+# Import asynccontextmanager to define the application lifespan
+from contextlib import asynccontextmanager
 # Import FastAPI framework
 from fastapi import FastAPI
 # Import CORSMiddleware to handle Cross-Origin Resource Sharing
 from fastapi.middleware.cors import CORSMiddleware
-# Import the database engine from the core configuration
-from core.database import engine
-# Import the base model to access metadata for table creation
-from models import base
+# Import application settings (background task intervals)
+from core.config import settings
+# Import the database engine and the read-your-writes pin middleware from the core configuration
+from core.database import engine, read_engine, ReadPinMiddleware, READ_PIN_HEADER
+# Import the pre-traffic startup work (schema check, pool warm-up)
+from core import startup as app_startup
+# Import the request metrics middleware
+from core.metrics import MetricsMiddleware
+# Import the response compression middleware
+from utils.compression import CompressionMiddleware
 # Import the API route modules
-from routes import product, user, order, auth
+from routes import product, user, order, auth, internal, analytics, metrics
+# Import the pagination cursor and idempotent replay header names so they can be exposed to browsers
+from utils.pagination import NEXT_CURSOR_HEADER
+from routes.order import IDEMPOTENT_REPLAYED_HEADER
+# Import the asynchronous checkout writer (started and drained with the application)
+from services.order_writer import order_writer
+# Import the listener relaying other workers' notifications (catalog events, principal invalidations)
+from core.notifications import notification_listener
+# Import the password hashing pool shutdown hook
+from utils.security import shutdown_password_hasher
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan handler.
+
+    On startup it checks that the database is at the Alembic head revision and opens
+    DB_POOL_PREWARM connections, reusing one connection for both, so a worker boot
+    costs a handful of round trips instead of a create_all catalog scan. Tables are
+    created and changed by Alembic migrations (`alembic upgrade head`), not here.
+
+    While running, expired idempotency keys are deleted in the background, other
+    workers' product changes and user flag changes are relayed to this worker (SSE
+    subscribers, principal cache) on PostgreSQL and, with CHECKOUT_MODE=async, queued
+    orders are group-committed by the order writer. On shutdown it first writes every
+    order still queued, then stops the notification listener and the password hashing
+    worker pool and closes pooled connections.
+    """
+    await app_startup.startup(time.perf_counter() - _import_started)
+    cleanup = None
+    if settings.IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS > 0:
+        cleanup = asyncio.create_task(app_startup.idempotency_cleanup_loop())
+    notification_listener.start()
+    if settings.CHECKOUT_MODE == "async":
+        order_writer.start()
+    yield
+    # Accepted (202) orders must be committed before the connections are closed
+    await order_writer.stop()
+    await notification_listener.stop()
+    if cleanup is not None:
+        # Wait for an in-progress sweep to roll back before its connection is disposed
+        cleanup.cancel()
+        try:
+            await cleanup
+        except asyncio.CancelledError:
+            pass
+    shutdown_password_hasher()
+    await engine.dispose()
+    if read_engine is not None:
+        await read_engine.dispose()
 
 # Initialize the FastAPI application instance
 app = FastAPI(
     title="E-Commerce API",
     description="A comprehensive API for an e-commerce platform handling users, products, and orders.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS (Cross-Origin Resource Sharing)
@@ -31,23 +96,19 @@ app.add_middleware(
     allow_credentials=True, # Allows cookies and authentication headers
     allow_methods=["*"],  # Allows all HTTP methods (GET, POST, PUT, DELETE, etc.)
     allow_headers=["*"],  # Allows all headers
+    expose_headers=[NEXT_CURSOR_HEADER, IDEMPOTENT_REPLAYED_HEADER, READ_PIN_HEADER],  # Lets the browser read the pagination cursor, replay marker and read pin
 )
 
-# Event handler for application startup
-@app.on_event("startup")
-async def startup():
-    """
-    Startup event handler.
-    
-    This function runs when the application starts.
-    It connects to the database and creates all tables defined in the SQLAlchemy models
-    if they do not already exist.
-    """
-    # Begin a connection to the database
-    async with engine.begin() as conn:
-        # Run the synchronous create_all method in an async context
-        # This inspects the metadata of all imported models and generates CREATE TABLE statements
-        await conn.run_sync(base.Base.metadata.create_all)
+# Tell clients that just wrote to keep their next reads on the primary (see core.database)
+app.add_middleware(ReadPinMiddleware)
+
+# Compress JSON and text responses for clients that accept gzip, br or zstd
+# Catalog responses arrive precompressed from their cache and are passed through
+app.add_middleware(CompressionMiddleware)
+
+# Record per-route latency, SQL and pool wait metrics and add a Server-Timing header
+# Added last so it is the outermost middleware and times the whole request
+app.add_middleware(MetricsMiddleware)
 
 # Root endpoint
 @app.get("/")
@@ -66,4 +127,7 @@ app.include_router(auth.router)    # Authentication endpoints (login, token)
 app.include_router(product.router) # Product management endpoints
 app.include_router(user.router)    # User management endpoints
 app.include_router(order.router)   # Order processing endpoints
+app.include_router(analytics.router) # Sales analytics endpoints (rollup-backed)
+app.include_router(internal.router) # Operational endpoints (pool status)
+app.include_router(metrics.router)  # Prometheus metrics endpoint
 
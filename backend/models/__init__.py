@@ -2,3 +2,7 @@ from models.base import Base
 from models.product import Product
 from models.user import User
 from models.order import Order, OrderItem
+from models.catalog import CatalogVersion
+from models.analytics import DailyProductSales
+from models.idempotency import IdempotencyKey
+from models.inventory import ProductStockShard
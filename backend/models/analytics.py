@@ -0,0 +1,41 @@
+"""
+Analytics Database Models
+
+This module defines the SQLAlchemy model for the 'daily_product_sales' rollup table.
+Rows are maintained incrementally by the order service in the same transaction as
+each order, so dashboards never have to scan the order history. A product in
+sharded stock mode spreads its rollup over several shard rows, so its checkouts
+do not queue on one rollup row either; readers sum over shards.
+"""
+
+# Import SQLAlchemy Column types
+from sqlalchemy import Column, Date, ForeignKey, BigInteger, Integer, Float, SmallInteger
+# Import PostgreSQL UUID type
+from sqlalchemy.dialects.postgresql import UUID
+# Import the shared Base class
+from models.base import Base
+
+class DailyProductSales(Base):
+    """
+    DailyProductSales Model
+
+    Sales totals of one product on one (UTC) day, or a share of them.
+
+    Attributes:
+        day (date): The UTC calendar day of the orders.
+        product_id (UUID): The product sold.
+        shard (int): 0, or one of SALES_ROLLUP_SHARDS rows of a product in sharded stock mode.
+        units (int): Total quantity sold.
+        revenue (float): Total of quantity * price_at_purchase.
+        order_count (int): Number of orders containing the product.
+    """
+    __tablename__ = "daily_product_sales"
+
+    # Composite primary key: one row per product per day (per shard), range-scannable by day
+    day = Column(Date, primary_key=True)
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(SmallInteger, primary_key=True, default=0, server_default="0")
+
+    units = Column(BigInteger, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+    order_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,31 @@
+"""
+Catalog Version Database Model
+
+This module defines the SQLAlchemy model for the 'catalog_version' table.
+It holds a single row whose version is bumped in the same transaction as every
+product change, so HTTP caches and workers can tell when the catalog changed.
+"""
+
+# Import SQLAlchemy Column types
+from sqlalchemy import Column, Integer, BigInteger, DateTime
+# Import SQL functions (like now())
+from sqlalchemy.sql import func
+# Import the shared Base class
+from models.base import Base
+
+class CatalogVersion(Base):
+    """
+    CatalogVersion Model
+
+    Single-row table tracking the current version of the product catalog.
+
+    Attributes:
+        id (int): Always 1; the table holds exactly one row.
+        version (int): Incremented by every product create, update and delete.
+        updated_at (datetime): Timestamp of the last catalog change.
+    """
+    __tablename__ = "catalog_version"
+
+    id = Column(Integer, primary_key=True, default=1)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,43 @@
+"""
+Idempotency Key Database Model
+
+This module defines the SQLAlchemy model for the 'idempotency_keys' table.
+Each row records one client-supplied Idempotency-Key and, once the request has
+finished, the response it produced, so retries can be answered without redoing
+the work.
+"""
+
+# Import SQLAlchemy Column types
+from sqlalchemy import Column, String, Integer, LargeBinary, DateTime, ForeignKey
+# Import PostgreSQL specific UUID type
+from sqlalchemy.dialects.postgresql import UUID
+# Import the shared Base class
+from models.base import Base
+
+class IdempotencyKey(Base):
+    """
+    IdempotencyKey Model
+
+    Attributes:
+        user_id (UUID): The user who sent the key; keys are scoped per user.
+        key (str): The Idempotency-Key header value.
+        request_hash (str): SHA-256 of the request body, to reject a key reused for a different request.
+        status_code (int, optional): Status of the stored response; NULL while the first request is in flight.
+        response_body (bytes, optional): The stored response body.
+        order_id (UUID): The ID the order of this request is written under; once an order
+            with this ID exists, the request must not be repeated.
+        locked_at (datetime): When the in-flight request claimed the key; stale claims can be taken over.
+        expires_at (datetime): When the key may be deleted and reused.
+    """
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    # Not a foreign key: it is chosen before the order exists
+    order_id = Column(UUID(as_uuid=True), nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=False)
+    # Indexed for the periodic cleanup of expired keys
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
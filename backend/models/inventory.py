@@ -0,0 +1,33 @@
+"""
+Inventory Database Model
+
+This module defines the SQLAlchemy model for the 'product_stock_shards' table.
+A product in sharded stock mode keeps its stock split across several rows here,
+so concurrent checkouts of the same product lock different rows instead of all
+waiting on one.
+"""
+
+# Import SQLAlchemy Column types
+from sqlalchemy import Column, Integer, ForeignKey, CheckConstraint
+# Import PostgreSQL specific UUID type
+from sqlalchemy.dialects.postgresql import UUID
+# Import the shared Base class
+from models.base import Base
+
+class ProductStockShard(Base):
+    """
+    ProductStockShard Model
+
+    Attributes:
+        product_id (UUID): The product this counter belongs to.
+        shard (int): The shard number, 0 to (shard count - 1).
+        stock (int): Units available in this shard.
+    """
+    __tablename__ = "product_stock_shards"
+
+    # Reservations only ever decrement a shard that holds enough units
+    __table_args__ = (CheckConstraint("stock >= 0", name="ck_product_stock_shards_stock"),)
+
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    stock = Column(Integer, nullable=False)
@@ -6,7 +6,7 @@ It handles the structure of order data, including the relationship between order
 """
 
 # Import SQLAlchemy types
-from sqlalchemy import Column, String, ForeignKey, DateTime, Float, Integer
+from sqlalchemy import Column, String, ForeignKey, DateTime, Float, Integer, Index
 # Import PostgreSQL UUID type
 from sqlalchemy.dialects.postgresql import UUID
 # Import relationship for ORM
@@ -30,11 +30,22 @@ class Order(Base):
         user_id (UUID): Foreign key referencing the User who placed the order.
         status (str): The current state of the order (e.g., 'pending', 'completed').
         created_at (datetime): Timestamp of when the order was created.
+        total_amount (float): Sum of quantity * price_at_purchase over the order's items, stored at creation.
+        item_count (int): Total units in the order (sum of item quantities), stored at creation.
         user (User): Relationship to the User model.
         items (list[OrderItem]): Relationship to the OrderItem model.
     """
     __tablename__ = "orders"
 
+    # Composite indexes backing keyset pagination on (created_at, id),
+    # per-user history, newest first, on (user_id, created_at, id)
+    # and sorting/filtering orders by value on (total_amount, id)
+    __table_args__ = (
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_user_id_created_at", "user_id", "created_at", "id"),
+        Index("ix_orders_total_amount_id", "total_amount", "id"),
+    )
+
     # Primary Key: UUID
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     
@@ -49,6 +60,12 @@ class Order(Base):
     # Timestamp for when the order was placed
     # server_default=func.now() ensures the database sets this timestamp on insertion.
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Denormalized order value and size
+    # Computed once when the order is placed (items are never modified afterwards),
+    # so list views and reports do not have to load and sum the items.
+    total_amount = Column(Float, nullable=False, default=0, server_default="0")
+    item_count = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
     # back_populates ensures bidirectional navigation between User and Order.
@@ -80,7 +97,8 @@ class OrderItem(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     
     # Foreign Keys (UUIDs)
-    order_id = Column(UUID(as_uuid=True), ForeignKey("orders.id"))
+    # order_id is indexed so an order's items can be fetched without a table scan
+    order_id = Column(UUID(as_uuid=True), ForeignKey("orders.id"), index=True)
     product_id = Column(UUID(as_uuid=True), ForeignKey("products.id"))
     
     # Quantity of the product ordered
@@ -6,9 +6,9 @@ It represents the inventory items available for purchase in the e-commerce appli
 """
 
 # Import SQLAlchemy Column types
-from sqlalchemy import Column, String, Float, Text
+from sqlalchemy import Column, String, Float, Text, Integer, Boolean, Index, CheckConstraint, func, literal, cast, false
 # Import PostgreSQL UUID type
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, REGCONFIG
 # Import relationship for ORM associations
 from sqlalchemy.orm import relationship
 # Import uuid for generating unique IDs
@@ -28,18 +28,27 @@ class Product(Base):
         description (str): A detailed text description of the product.
         price (float): The price of the product.
         image_url (str): An optional URL pointing to an image of the product.
+        stock (int, optional): Units available for sale; NULL if stock is not tracked or is sharded.
+        stock_sharded (bool): Whether stock is held in product_stock_shards instead of `stock`.
         order_items (list[OrderItem]): A relationship to the OrderItem model, representing all the times this product has been ordered.
     """
     # Table name in the database
     __tablename__ = "products"
 
+    # Composite index backing keyset pagination on (name, id); stock can never be oversold
+    __table_args__ = (
+        Index("ix_products_name_id", "name", "id"),
+        CheckConstraint("stock >= 0", name="ck_products_stock"),
+    )
+
     # Primary Key: UUID
     # Generates a random UUIDv4 if not provided.
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     
     # Basic product details
     # name is indexed to allow for faster searching/filtering by product name.
-    name = Column(String, index=True)
+    # It is NOT NULL because list pages seek on (name, id), and a NULL key would end the pagination.
+    name = Column(String, index=True, nullable=False)
     
     # Description uses the Text type to allow for longer content than String (VARCHAR).
     description = Column(Text)
@@ -52,7 +61,40 @@ class Product(Base):
     # This allows products to be created without an image initially.
     image_url = Column(String, nullable=True)
 
+    # Stock is decremented by checkout with a conditional UPDATE, so it can never go negative.
+    # NULL means the product is not stock-tracked and can always be ordered.
+    stock = Column(Integer, nullable=True)
+
+    # Hot products can spread their stock over several counter rows (see services/inventory.py)
+    # so concurrent checkouts do not all queue on this row's lock.
+    stock_sharded = Column(Boolean, nullable=False, default=False, server_default=false())
+
     # Relationship to OrderItem
     # A product can appear in many order items (across different orders).
     # back_populates="product" refers to the 'product' attribute in the OrderItem class.
     order_items = relationship("OrderItem", back_populates="product")
+
+def product_search_vector():
+    """
+    Builds the weighted full-text search vector of a product.
+
+    Name matches (weight A) rank above description matches (weight B).
+    Queries must use this exact expression so PostgreSQL can use ix_products_search_vector.
+    """
+    # Constants are rendered inline (not as bind parameters) so the expression matches the index
+    def const(value):
+        return literal(value, literal_execute=True)
+
+    config = cast(const("english"), REGCONFIG)
+    return func.setweight(
+        func.to_tsvector(config, func.coalesce(Product.name, const(""))), const("A")
+    ).op("||")(
+        func.setweight(func.to_tsvector(config, func.coalesce(Product.description, const(""))), const("B"))
+    )
+
+# GIN index over the search vector (PostgreSQL only; created by migration 084410486541)
+Index(
+    "ix_products_search_vector",
+    product_search_vector(),
+    postgresql_using="gin",
+).ddl_if(dialect="postgresql")
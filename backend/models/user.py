@@ -6,7 +6,7 @@ It represents the structure of user data stored in the PostgreSQL database.
 """
 
 # Import SQLAlchemy Column types for defining table schema
-from sqlalchemy import Column, String, Boolean
+from sqlalchemy import Column, String, Boolean, Index
 # Import PostgreSQL specific UUID type for efficient UUID storage
 from sqlalchemy.dialects.postgresql import UUID
 # Import relationship to define associations between tables
@@ -34,6 +34,9 @@ class User(Base):
     # The name of the table in the database
     __tablename__ = "users"
 
+    # Composite index backing keyset pagination on (email, id)
+    __table_args__ = (Index("ix_users_email_id", "email", "id"),)
+
     # Primary Key: UUID
     # as_uuid=True ensures that SQLAlchemy converts the database value to a Python UUID object.
     # default=uuid.uuid4 sets the default value to a new random UUID if not provided.
@@ -42,7 +45,8 @@ class User(Base):
     
     # User's email address
     # unique=True enforces a database-level constraint that no two users can have the same email.
-    email = Column(String, unique=True, index=True)
+    # It is NOT NULL because it is the login name and list pages seek on (email, id).
+    email = Column(String, unique=True, index=True, nullable=False)
     
     # Hashed password
     # We store the hash (e.g., bcrypt) rather than the actual password for security.
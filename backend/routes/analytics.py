@@ -0,0 +1,110 @@
+"""
+Analytics API Routes
+
+This module defines read-only sales analytics endpoints.
+All of them read the daily_product_sales rollup, never the raw order history.
+"""
+
+# Import FastAPI components
+from fastapi import APIRouter, Depends, HTTPException, Query
+# Import AsyncSession for database interaction
+from sqlalchemy.ext.asyncio import AsyncSession
+# Import List and Optional for type hinting
+from typing import List, Optional
+# Import date helpers for default ranges
+from datetime import date, datetime, timedelta, timezone
+# Import UUID for ID handling
+from uuid import UUID
+# Import the read-only database dependency (rollups tolerate replica lag)
+from core.database import get_read_db
+# Import Pydantic schemas
+from schemas.analytics import DailyRevenue, ProductSales, UnitsSold
+# Import service logic
+from services import analytics as analytics_service
+
+# Initialize the API router for analytics
+router = APIRouter(
+    prefix="/analytics", # All endpoints start with /analytics
+    tags=["analytics"]   # Grouping tag for documentation
+)
+
+def resolve_range(start: Optional[date], end: Optional[date]):
+    """
+    Applies the default range (last 30 days, including today) and validates it.
+
+    Returns:
+        tuple[date, date]: Inclusive start and exclusive end.
+
+    Raises:
+        HTTPException: 400 error if start is not before end.
+    """
+    if end is None:
+        end = datetime.now(timezone.utc).date() + timedelta(days=1)
+    if start is None:
+        start = end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return start, end
+
+@router.get("/revenue/daily", response_model=List[DailyRevenue])
+async def read_daily_revenue(start: Optional[date] = None, end: Optional[date] = None, db: AsyncSession = Depends(get_read_db)):
+    """
+    Revenue and units sold per UTC day.
+
+    Args:
+        start (Optional[date]): Inclusive first day. Defaults to 30 days before `end`.
+        end (Optional[date]): Exclusive last day. Defaults to tomorrow (so today is included).
+        db (AsyncSession): The database session dependency.
+
+    Returns:
+        List[DailyRevenue]: One entry per day that had sales, oldest first.
+    """
+    start, end = resolve_range(start, end)
+    return await analytics_service.get_daily_revenue(db, start, end)
+
+@router.get("/products/top", response_model=List[ProductSales])
+async def read_top_products(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = Query(10, ge=1, le=100),
+    by: str = Query("revenue", pattern="^(revenue|units)$"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Best selling products over a date range.
+
+    Args:
+        start (Optional[date]): Inclusive first day. Defaults to 30 days before `end`.
+        end (Optional[date]): Exclusive last day. Defaults to tomorrow (so today is included).
+        limit (int): The number of products to return (1-100). Defaults to 10.
+        by (str): Rank by 'revenue' (default) or 'units'.
+        db (AsyncSession): The database session dependency.
+
+    Returns:
+        List[ProductSales]: The top products, best first.
+    """
+    start, end = resolve_range(start, end)
+    return await analytics_service.get_top_products(db, start, end, limit, by)
+
+@router.get("/units", response_model=UnitsSold)
+async def read_units_sold(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    product_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Total units sold over a date range, for one product or all of them.
+
+    Args:
+        start (Optional[date]): Inclusive first day. Defaults to 30 days before `end`.
+        end (Optional[date]): Exclusive last day. Defaults to tomorrow (so today is included).
+        product_id (Optional[UUID]): Restrict to a single product.
+        db (AsyncSession): The database session dependency.
+
+    Returns:
+        UnitsSold: The range, product and number of units.
+    """
+    start, end = resolve_range(start, end)
+    units = await analytics_service.get_units_sold(db, start, end, product_id)
+    return UnitsSold(start=start, end=end, product_id=product_id, units=units)
@@ -4,7 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from core.database import get_db
 from core.config import settings
-from utils.security import create_access_token, verify_password
+from utils.security import create_access_token, verify_password_async, PasswordHasherBusy
 from services import user as user_service
 from schemas.token import Token
 
@@ -13,7 +13,17 @@ router = APIRouter(tags=["auth"])
 @router.post("/token", response_model=Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     user = await user_service.get_user_by_email(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Return the connection to the pool before the slow hash check so logins don't starve other requests
+    await db.close()
+    try:
+        password_ok = user is not None and await verify_password_async(form_data.password, user.hashed_password)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
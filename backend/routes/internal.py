@@ -0,0 +1,42 @@
+"""
+Internal API Routes
+
+This module defines operational endpoints used to monitor and tune the service.
+They are not part of the public API.
+"""
+
+# Import FastAPI components
+from fastapi import APIRouter
+# Import the connection pool and read replica status helpers
+from core.database import pool_status, replica_status
+
+# Initialize the API router for internal endpoints
+router = APIRouter(
+    prefix="/internal", # All endpoints start with /internal
+    tags=["internal"]   # Grouping tag for documentation
+)
+
+@router.get("/pool")
+async def read_pool_status():
+    """
+    Report the state of this worker's database connection pool.
+
+    Note: In a production environment, this endpoint should not be exposed publicly.
+
+    Returns:
+        dict: Configured sizes, checked-out/idle/overflow counts and checkout wait times.
+    """
+    return pool_status()
+
+@router.get("/replica")
+async def read_replica_status():
+    """
+    Report this worker's view of the read replica and how reads were routed.
+
+    Note: In a production environment, this endpoint should not be exposed publicly.
+
+    Returns:
+        dict: Whether a replica is configured and reachable, its last measured lag,
+        replica/primary read counts and the replica pool status.
+    """
+    return replica_status()
@@ -0,0 +1,53 @@
+"""
+Metrics API Routes
+
+This module exposes this worker's request metrics in the Prometheus text format.
+"""
+
+# Import FastAPI components
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+# Import the metrics registry and the connection pool status helper
+from core.metrics import registry
+from core.database import pool_status
+# Import the measured durations of this worker's startup
+from core.startup import startup_timings
+# Import the catalog event broker to report its subscribers
+from services.catalog_events import catalog_events
+# Import the principal cache to report its hit rate
+from core.cache import principal_cache
+
+# Initialize the API router for the metrics endpoint
+router = APIRouter(
+    tags=["internal"]   # Grouped with the other operational endpoints
+)
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics():
+    """
+    Report per-route latency, SQL, pool wait, event stream and principal cache metrics for Prometheus to scrape.
+
+    Note: In a production environment, this endpoint should not be exposed publicly.
+
+    Returns:
+        PlainTextResponse: The metrics in the Prometheus text exposition format (version 0.0.4).
+    """
+    pool = pool_status()
+    gauges = {
+        "db_pool_size": pool["pool_size"],
+        "db_pool_checked_out": pool["checked_out"],
+        "db_pool_idle": pool["idle"],
+        "db_pool_overflow": pool["overflow"],
+    }
+    events = catalog_events.stats()
+    gauges["catalog_events_subscribers"] = events["subscribers"]
+    gauges["catalog_events_queued"] = events["queued"]
+    gauges["catalog_events_resyncs"] = events["resyncs"]
+    principals = principal_cache.stats()
+    gauges["principal_cache_size"] = principals["size"]
+    gauges["principal_cache_hits"] = principals["hits"]
+    gauges["principal_cache_misses"] = principals["misses"]
+    gauges["principal_cache_evictions"] = principals["evictions"]
+    for phase, seconds in startup_timings.items():
+        gauges[f"app_startup_{phase}_seconds"] = f"{seconds:.6f}"
+    return PlainTextResponse(registry.render(gauges), media_type="text/plain; version=0.0.4")
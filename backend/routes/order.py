@@ -6,71 +6,395 @@ It handles the creation and retrieval of orders, ensuring users can only access
 """
 
 # Import FastAPI components
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+# Import TypeAdapter to render stored idempotent responses
+from pydantic import TypeAdapter
+# Import StreamingResponse for order exports
+from fastapi.responses import StreamingResponse
 # Import AsyncSession for database interaction
 from sqlalchemy.ext.asyncio import AsyncSession
 # Import List for type hinting
-from typing import List
-# Import database dependency
-from core.database import get_db
+from typing import List, Optional
+# Import datetime for decoding order cursors
+from datetime import datetime
+# Import database dependencies, the read session opener (for streaming exports) and the read-your-writes pin
+from core.database import get_db, get_read_db, open_read_session, mark_written
+# Import application settings (bulk ingestion limits, checkout mode)
+from core.config import settings
 # Import authentication dependency to get the current user
 from core.deps import get_current_user
 # Import Pydantic schemas
-from schemas.order import Order, OrderCreate
+from schemas.order import Order, OrderCreate, OrderItem, OrderBulkCreate, OrderBulkResponse, OrderStatus
 from schemas.user import User
 # Import service logic
 from services import order as order_service
 from services import user as user_service
+from services import idempotency as idempotency_service
+from services import inventory as inventory_service
+from services.order_writer import order_writer, CheckoutUnavailable, OUTCOME_DETAILS
 # Import UUID for ID handling
 from uuid import UUID
+# Import cursor helpers for keyset pagination
+from utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, next_page_cursor
+# Import the fast JSON response for projected list rows and the JSON encoder for stored error bodies
+from utils.serialization import FastJSONResponse, dumps
+# Import encoders for streamed exports
+import csv
+import io
+import json
 
 # Initialize the API router for orders
 router = APIRouter(
     tags=["orders"] # Tags for grouping in API documentation
 )
 
-@router.post("/orders/", response_model=Order)
-async def create_order(order: OrderCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+# Response header marking a reply served from a stored Idempotency-Key response
+IDEMPOTENT_REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Serializers for checkout responses (also stored under an Idempotency-Key)
+order_adapter = TypeAdapter(Order)
+order_status_adapter = TypeAdapter(OrderStatus)
+
+async def _place_order(db: AsyncSession, order: OrderCreate, current_user: User, order_id: UUID = None):
+    # Returns (status code, JSON body): 200 with the order, or 202 when it was queued
+    try:
+        if settings.CHECKOUT_MODE == "async":
+            order_id = await order_writer.submit(db, order, current_user.id, order_id)
+        else:
+            db_order = await order_service.create_order(db, order, current_user.id, order_id)
+            order_id = db_order.id
+    except order_service.ProductNotFoundError as exc:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "message": "Products not found",
+                "missing_product_ids": [str(product_id) for product_id in exc.missing_ids],
+            },
+        )
+    except inventory_service.OutOfStockError as exc:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "message": "Insufficient stock",
+                "out_of_stock_product_ids": [str(product_id) for product_id in exc.product_ids],
+            },
+        )
+    except CheckoutUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"})
+    # The client usually reads its order history next; keep those reads on the primary
+    mark_written(current_user.id, order_id)
+    if settings.CHECKOUT_MODE == "async":
+        return 202, order_status_adapter.dump_json(OrderStatus(id=order_id, status="pending"))
+    return 200, order_adapter.dump_json(order_adapter.validate_python(db_order, from_attributes=True))
+
+async def _placed_order(db: AsyncSession, order_id: UUID, current_user: User):
+    # The response of an order committed under an Idempotency-Key whose response was not stored
+    if settings.CHECKOUT_MODE == "async":
+        return 202, order_status_adapter.dump_json(OrderStatus(id=order_id, status="pending"))
+    db_order = await order_service.get_user_order(db, order_id, current_user.id)
+    return 200, order_adapter.dump_json(order_adapter.validate_python(db_order, from_attributes=True))
+
+@router.post("/orders/", response_model=Order, responses={202: {"model": OrderStatus}})
+async def create_order(
+    order: OrderCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, min_length=1, max_length=255),
+):
     """
     Create a new order for the currently authenticated user.
 
+    With CHECKOUT_MODE=async the order is validated and queued, and the response is
+    202 Accepted with the order ID and status 'pending'; poll
+    `/orders/{order_id}/status` until it is 'completed' (or 'rejected' if stock ran out).
+
+    Clients that may retry (e.g. on a timeout) should send an `Idempotency-Key` header
+    that is unique per checkout. A retry with the same key and body returns the
+    original response, marked with `Idempotent-Replayed: true`, without placing a
+    second order. A duplicate sent while the original is still running waits for it.
+    The key is bound to the order ID before checkout, so even if the original request
+    died after committing the order, a retry replays that order.
+
     Args:
         order (OrderCreate): The order payload containing the list of items.
         current_user (User): The authenticated user (injected by dependency).
         db (AsyncSession): The database session dependency.
+        idempotency_key (Optional[str]): The Idempotency-Key header.
+
+    Returns:
+        Order: The newly created order object, or OrderStatus if the order was queued.
+
+    Raises:
+        HTTPException: 404 error listing every product ID that does not exist.
+        HTTPException: 409 error listing every product that does not have enough stock.
+        HTTPException: 409 error if the original request with this key is still running.
+        HTTPException: 422 error if the key was already used with a different body.
+        HTTPException: 503 error if the asynchronous checkout queue is full.
+    """
+    if idempotency_key is None:
+        status_code, body = await _place_order(db, order, current_user)
+        return Response(content=body, status_code=status_code, media_type="application/json")
+
+    digest = idempotency_service.request_hash(order.model_dump_json().encode())
+    try:
+        claim = await idempotency_service.begin(db, current_user.id, idempotency_key, digest)
+    except idempotency_service.IdempotencyKeyMismatch:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+    except idempotency_service.IdempotencyKeyInProgress:
+        raise HTTPException(
+            status_code=409,
+            detail="A request with this Idempotency-Key is still in progress",
+            headers={"Retry-After": "1"},
+        )
+    if isinstance(claim, idempotency_service.StoredResponse):
+        return Response(
+            content=claim.body,
+            status_code=claim.status_code,
+            media_type="application/json",
+            headers={IDEMPOTENT_REPLAYED_HEADER: "true"},
+        )
+    if claim.placed:
+        # An earlier request committed the order but did not get to store its response
+        status_code, body = await _placed_order(db, claim.order_id, current_user)
+        await idempotency_service.complete(db, current_user.id, idempotency_key, status_code, body)
+        return Response(
+            content=body,
+            status_code=status_code,
+            media_type="application/json",
+            headers={IDEMPOTENT_REPLAYED_HEADER: "true"},
+        )
+
+    try:
+        status_code, body = await _place_order(db, order, current_user, claim.order_id)
+    except HTTPException as exc:
+        if exc.status_code in (409, 503):
+            # Stock may be replenished and the queue may drain, so a retry should try again
+            await idempotency_service.release(db, current_user.id, idempotency_key)
+        else:
+            # Other client errors are deterministic, so they are replayed like successes
+            await idempotency_service.complete(
+                db, current_user.id, idempotency_key, exc.status_code, dumps({"detail": exc.detail})
+            )
+        raise
+    except BaseException:
+        # Server errors and cancellations free the key so a retry can place the order
+        await idempotency_service.release(db, current_user.id, idempotency_key)
+        raise
+    await idempotency_service.complete(db, current_user.id, idempotency_key, status_code, body)
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+@router.get("/orders/{order_id}/status", response_model=OrderStatus)
+async def read_order_status(order_id: UUID, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    """
+    Retrieve the status of one of the current user's orders.
+
+    Used to poll an order accepted by asynchronous checkout. Written orders, including
+    rejected and failed ones, are read from the database; queued ones are known to the
+    worker that accepted them, so with several workers a poll may return 404 until the
+    order is written.
+
+    Args:
+        order_id (UUID): The ID returned by POST /orders/.
+        current_user (User): The authenticated user (injected by dependency).
+        db (AsyncSession): The database session dependency.
 
     Returns:
-        Order: The newly created order object.
+        OrderStatus: 'pending', 'completed', 'rejected' or 'failed', with the reason if any.
+
+    Raises:
+        HTTPException: 404 error if the user has no such order.
+    """
+    known = order_writer.status(order_id, current_user.id)
+    if known is not None:
+        status, detail = known
+        return OrderStatus(id=order_id, status=status, detail=detail)
+    status = await order_service.get_order_status(db, order_id, current_user.id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return OrderStatus(id=order_id, status=status, detail=OUTCOME_DETAILS.get(status))
+
+@router.post("/orders/bulk", response_model=OrderBulkResponse)
+async def create_orders_bulk(payload: OrderBulkCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """
-    return await order_service.create_order(db, order, current_user.id)
+    Ingest a batch of orders for the currently authenticated user.
+
+    The user is resolved once for the whole batch, all products are priced together and
+    orders are written in chunked transactions. Orders referencing unknown products, or
+    asking for more stock than is left, are rejected individually; the rest of the batch
+    is still written.
+
+    Args:
+        payload (OrderBulkCreate): The orders to create.
+        current_user (User): The authenticated user (injected by dependency).
+        db (AsyncSession): The database session dependency.
+
+    Returns:
+        OrderBulkResponse: Created/rejected counts and one result per submitted order.
+
+    Raises:
+        HTTPException: 413 error if the batch exceeds BULK_ORDER_MAX_BATCH orders.
+    """
+    if len(payload.orders) > settings.BULK_ORDER_MAX_BATCH:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large, at most {settings.BULK_ORDER_MAX_BATCH} orders per request",
+        )
+    results = await order_service.create_orders_bulk(
+        db, payload.orders, current_user.id, chunk_size=settings.BULK_ORDER_CHUNK_SIZE
+    )
+    created = sum(1 for result in results if result.status == "created")
+    mark_written(current_user.id)
+    return OrderBulkResponse(created=created, rejected=len(results) - created, results=results)
 
 @router.get("/orders/", response_model=List[Order])
-async def read_orders(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+async def read_orders(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: AsyncSession = Depends(get_read_db)):
     """
-    Retrieve a list of all orders in the system.
+    Retrieve a list of all placed (completed) orders in the system, oldest first.
     
     Note: In a production environment, this endpoint should be restricted to administrators.
 
+    Pass the `X-Next-Cursor` response header back as `cursor` to fetch the next page
+    with an index seek; `skip` is ignored when a cursor is given.
+
     Args:
         skip (int): The number of records to skip. Defaults to 0.
         limit (int): The maximum number of records to return. Defaults to 100.
+        cursor (Optional[str]): Opaque cursor returned by a previous page.
         db (AsyncSession): The database session dependency.
 
     Returns:
         List[Order]: A list of all order objects.
+
+    Raises:
+        HTTPException: 400 error if the cursor is invalid.
     """
-    return await order_service.get_orders(db, skip, limit)
+    try:
+        after = decode_cursor(cursor, (datetime, UUID)) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Fast path: projected rows serialized directly (same shape as List[Order])
+    orders = await order_service.get_order_rows(db, skip, limit, after=after)
+    next_cursor = next_page_cursor(orders, limit, lambda o: (o["created_at"], o["id"]))
+    return FastJSONResponse(orders, headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
+
+# Column order of CSV exports (one row per order item)
+EXPORT_CSV_COLUMNS = [
+    "order_id", "user_id", "status", "created_at",
+    "item_id", "product_id", "quantity", "price_at_purchase",
+]
+
+def _json_default(value):
+    # UUIDs and datetimes are the only non-JSON types in exported orders
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def _encode_ndjson(order: dict) -> str:
+    return json.dumps(order, default=_json_default, separators=(",", ":")) + "\n"
+
+def _encode_csv(order: dict) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    header = [order["id"], order["user_id"], order["status"], order["created_at"].isoformat()]
+    for item in order["items"] or [None]:
+        if item is None:
+            writer.writerow(header + ["", "", "", ""])
+        else:
+            writer.writerow(header + [item["id"], item["product_id"], item["quantity"], item["price_at_purchase"]])
+    return buffer.getvalue()
+
+@router.get("/orders/export")
+async def export_orders(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """
+    Stream every placed (completed) order with its items as NDJSON (one order per line) or CSV (one item per row).
+
+    Rows are read through a server-side cursor and written as they arrive, so memory use
+    stays constant no matter how many orders are exported.
+
+    Note: In a production environment, this endpoint should be restricted to administrators.
+
+    Args:
+        export_format (str): 'ndjson' (default) or 'csv', passed as the `format` query parameter.
+        start (Optional[datetime]): Only export orders created at or after this time.
+        end (Optional[datetime]): Only export orders created before this time.
+
+    Returns:
+        StreamingResponse: The exported orders.
+    """
+    encode = _encode_csv if export_format == "csv" else _encode_ndjson
+
+    async def body():
+        # The export owns its session: it must outlive the request handler while streaming
+        async with await open_read_session() as db:
+            if export_format == "csv":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerow(EXPORT_CSV_COLUMNS)
+                yield buffer.getvalue()
+            async for order in order_service.stream_orders_for_export(db, start, end):
+                yield encode(order)
+
+    if export_format == "csv":
+        return StreamingResponse(
+            body(),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="orders.csv"'},
+        )
+    return StreamingResponse(body(), media_type="application/x-ndjson")
 
 @router.get("/users/{user_id}/orders", response_model=List[Order])
-async def read_user_orders(user_id: UUID, db: AsyncSession = Depends(get_db)):
+async def read_user_orders(
+    response: Response,
+    user_id: UUID,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    include_items: bool = True,
+    db: AsyncSession = Depends(get_read_db),
+):
     """
-    Retrieve all orders belonging to a specific user.
+    Retrieve a page of placed (completed) orders belonging to a specific user, newest first.
+
+    Pass the `X-Next-Cursor` response header back as `cursor` to fetch older orders.
+    With `include_items=false` only order headers are returned (`items` is empty) and
+    items can be fetched per order from `/orders/{order_id}/items`.
 
     Args:
+        response (Response): The outgoing response, used to set the next cursor header.
         user_id (UUID): The unique identifier of the user.
+        limit (int): The maximum number of orders to return (1-200). Defaults to 50.
+        cursor (Optional[str]): Opaque cursor returned by a previous page.
+        include_items (bool): Whether to load the items of each order. Defaults to True.
         db (AsyncSession): The database session dependency.
 
     Returns:
         List[Order]: A list of orders for the specified user.
+
+    Raises:
+        HTTPException: 400 error if the cursor is invalid.
+    """
+    try:
+        after = decode_cursor(cursor, (datetime, UUID)) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    orders = await order_service.get_user_orders(db, user_id, limit, after=after, include_items=include_items)
+    next_cursor = next_page_cursor(orders, limit, lambda o: (o.created_at, o.id))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return orders
+
+@router.get("/orders/{order_id}/items", response_model=List[OrderItem])
+async def read_order_items(order_id: UUID, db: AsyncSession = Depends(get_read_db)):
+    """
+    Retrieve the items of a single order.
+
+    Args:
+        order_id (UUID): The unique identifier of the order.
+        db (AsyncSession): The database session dependency.
+
+    Returns:
+        List[OrderItem]: The items of the order.
     """
-    return await order_service.get_user_orders(db, user_id)
+    return await order_service.get_order_items(db, order_id)
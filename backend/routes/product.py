@@ -5,20 +5,44 @@ This module defines the API endpoints for managing products.
 It handles HTTP requests for creating, retrieving, and updating products.
 """
 
+# Import asyncio for the event stream's keep-alive timeout
+import asyncio
 # Import FastAPI components
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+# Import StreamingResponse for the Server-Sent Events stream
+from fastapi.responses import StreamingResponse
+# Import TypeAdapter to render cached response bodies
+from pydantic import TypeAdapter
 # Import AsyncSession for database interaction
 from sqlalchemy.ext.asyncio import AsyncSession
 # Import List for type hinting
-from typing import List
-# Import database dependency
-from core.database import get_db
+from typing import List, Optional
+# Import database dependencies (read-only endpoints may be served by the replica)
+from core.database import get_db, get_read_db, AsyncSessionLocal
 # Import Pydantic schemas
-from schemas.product import Product, ProductCreate
+from schemas.product import Product, ProductBatch, ProductCreate, StockUpdate, StockLevel
 # Import product service logic
 from services import product as product_service
+# Import the catalog version used for HTTP caching
+from services import catalog as catalog_service
+# Import the inventory service for stock levels
+from services import inventory as inventory_service
+# Import the catalog event broker for the change stream
+from services import catalog_events as events_service
+# Import the in-process cache of rendered catalog responses
+from core.cache import catalog_response_cache
+# Import the fast JSON encoder for projected list rows
+from utils.serialization import dumps
+# Import content negotiation and compression for cached catalog bodies
+from utils.compression import CACHED_LEVELS, choose_encoding, compress
+# Import application settings (compression threshold, batch size limit, event stream heartbeat)
+from core.config import settings
+# Import HTTP validator helpers
+from utils.http_cache import make_etag, format_http_date, is_not_modified
 # Import UUID for ID handling
 from uuid import UUID
+# Import cursor helpers for keyset pagination
+from utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, next_page_cursor
 
 # Initialize the API router for products
 router = APIRouter(
@@ -26,20 +50,110 @@ router = APIRouter(
     tags=["products"]   # Tags for grouping in API documentation (Swagger UI)
 )
 
+# Serializers for rendering catalog responses ahead of caching them
+product_adapter = TypeAdapter(Product)
+product_list_adapter = TypeAdapter(List[Product])
+
+async def cached_catalog_response(request: Request, db: AsyncSession, render, cache_body: bool = True):
+    """
+    Serves a catalog GET with ETag/Last-Modified validators and an in-process body cache.
+
+    The ETag is derived from the catalog version and the request path and query, so a
+    matching If-None-Match is answered with 304 before any product query runs. Otherwise
+    the rendered body is served from the cache, or produced by `render` and cached.
+    `If-None-Match: *` is only answered with 304 once the body exists, so a missing
+    product still gets the 404 raised by `render`.
+    A body is never rendered from a replica that has not replayed the version yet;
+    such requests are rendered from the primary. Bodies are compressed for the client's
+    Accept-Encoding once per version and encoding, and the compressed bytes are cached
+    alongside the body.
+
+    Args:
+        request (Request): The incoming request.
+        db (AsyncSession): The database session dependency (possibly a replica session).
+        render (Callable): Coroutine function taking a session and returning (body bytes, extra headers).
+        cache_body (bool): Cache the body; pass False for responses that are rarely
+            requested twice (e.g. arbitrary ID sets), which are then rendered on every
+            request and compressed by CompressionMiddleware.
+
+    Returns:
+        Response: A 304 or a 200 JSON response carrying the validators.
+    """
+    version, updated_at = await catalog_service.get_catalog_version(db)
+    key = (version, request.url.path, tuple(sorted(request.query_params.multi_items())))
+    etag = make_etag(version, key)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if updated_at is not None:
+        headers["Last-Modified"] = format_http_date(updated_at)
+    if is_not_modified(request, etag, updated_at, exists=False):
+        return Response(status_code=304, headers=headers)
+
+    cached = catalog_response_cache.get(key) if cache_body else None
+    if cached is None:
+        if db.info.get("replica") and await catalog_service.read_catalog_version(db) < version:
+            async with AsyncSessionLocal() as primary:
+                body, extra_headers = await render(primary)
+        else:
+            body, extra_headers = await render(db)
+        if not cache_body:
+            if is_not_modified(request, etag, updated_at):
+                return Response(status_code=304, headers=headers)
+            return Response(content=body, media_type="application/json", headers={**headers, **extra_headers})
+        # The third slot holds compressed copies of the body, filled per encoding on first use
+        cached = (body, extra_headers, {})
+        catalog_response_cache.set(key, cached)
+    body, extra_headers, compressed = cached
+    # The resource exists now, so "*" can match
+    if is_not_modified(request, etag, updated_at):
+        return Response(status_code=304, headers=headers)
+
+    headers["Vary"] = "Accept-Encoding"
+    encoding = choose_encoding(request.headers.get("accept-encoding")) if len(body) >= settings.COMPRESSION_MIN_SIZE else None
+    if encoding is not None:
+        content = compressed.get(encoding)
+        if content is None:
+            content = compressed[encoding] = compress(body, encoding, CACHED_LEVELS[encoding])
+        body = content
+        headers["Content-Encoding"] = encoding
+        # The bytes differ per encoding, so the shared validator is only weakly valid
+        headers["ETag"] = f"W/{etag}"
+    return Response(content=body, media_type="application/json", headers={**headers, **extra_headers})
+
 @router.get("/", response_model=List[Product])
-async def get_products(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+async def get_products(request: Request, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: AsyncSession = Depends(get_read_db)):
     """
-    Retrieve a list of products with pagination.
+    Retrieve a list of products with pagination, ordered by name.
+
+    Pass the `X-Next-Cursor` response header back as `cursor` to fetch the next page
+    with an index seek; `skip` is ignored when a cursor is given.
+    Responses carry ETag and Last-Modified headers; conditional requests get a 304.
 
     Args:
+        request (Request): The incoming request, used for conditional headers.
         skip (int): The number of records to skip. Defaults to 0.
         limit (int): The maximum number of records to return. Defaults to 100.
+        cursor (Optional[str]): Opaque cursor returned by a previous page.
         db (AsyncSession): The database session dependency.
 
     Returns:
         List[Product]: A list of product objects.
+
+    Raises:
+        HTTPException: 400 error if the cursor is invalid.
     """
-    return await product_service.get_products(db, skip, limit)
+    try:
+        after = decode_cursor(cursor, (str, UUID)) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    async def render(db):
+        # Fast path: projected rows serialized directly (same shape as List[Product])
+        products = await product_service.get_product_rows(db, skip, limit, after=after)
+        body = dumps(products)
+        next_cursor = next_page_cursor(products, limit, lambda p: (p["name"], p["id"]))
+        return body, ({NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {})
+
+    return await cached_catalog_response(request, db, render)
 
 @router.post("/", response_model=Product)
 async def create_product(product: ProductCreate, db: AsyncSession = Depends(get_db)):
@@ -55,12 +169,144 @@ async def create_product(product: ProductCreate, db: AsyncSession = Depends(get_
     """
     return await product_service.create_product(db, product)
 
+@router.get("/batch", response_model=ProductBatch)
+async def get_products_batch(request: Request, ids: str = Query(..., min_length=1), db: AsyncSession = Depends(get_read_db)):
+    """
+    Retrieve many products by ID in one request, e.g. to refresh a cart.
+
+    All products are fetched with one primary-key `IN` query. Duplicate IDs are
+    returned once. Like the other catalog reads, responses carry ETag and
+    Last-Modified headers, but the bodies are not cached: ID sets rarely repeat
+    and would evict the shared catalog pages.
+
+    Declared before `/{product_id}` so "batch" is not parsed as a product ID.
+
+    Args:
+        request (Request): The incoming request, used for conditional headers.
+        ids (str): Comma-separated product IDs, at most PRODUCT_BATCH_MAX_SIZE.
+        db (AsyncSession): The database session dependency.
+
+    Returns:
+        ProductBatch: The products found in request order, and the IDs that do not exist.
+
+    Raises:
+        HTTPException: 413 error if more than PRODUCT_BATCH_MAX_SIZE IDs are requested.
+        HTTPException: 422 error if an ID is not a valid UUID.
+    """
+    product_ids = {}
+    for value in ids.split(","):
+        value = value.strip()
+        if not value:
+            continue
+        try:
+            product_ids[UUID(value)] = None
+        except ValueError:
+            raise HTTPException(status_code=422, detail=f"Invalid product ID: {value[:64]}")
+    if len(product_ids) > settings.PRODUCT_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large, at most {settings.PRODUCT_BATCH_MAX_SIZE} products per request",
+        )
+
+    async def render(db):
+        # Fast path: projected rows serialized directly (same shape as ProductBatch)
+        found = await product_service.get_product_rows_by_ids(db, list(product_ids)) if product_ids else {}
+        return dumps({
+            "products": [found[product_id] for product_id in product_ids if product_id in found],
+            "missing_ids": [product_id for product_id in product_ids if product_id not in found],
+        }), {}
+
+    return await cached_catalog_response(request, db, render, cache_body=False)
+
+@router.get("/events")
+async def product_events(request: Request):
+    """
+    Stream product changes as Server-Sent Events.
+
+    Each create, update and delete is sent as a `product.created`, `product.updated`
+    or `product.deleted` event with the product ID, the new values of the changed
+    fields and the new catalog version (also the event ID). A `resync` event means
+    the client missed events and should refetch the catalog. Reconnecting clients
+    send Last-Event-ID and are sent the events they missed. A keep-alive comment is
+    sent after CATALOG_EVENTS_HEARTBEAT_SECONDS without events.
+
+    Declared before `/{product_id}` so "events" is not parsed as a product ID.
+
+    Args:
+        request (Request): The incoming request, used for Last-Event-ID.
+
+    Returns:
+        StreamingResponse: A text/event-stream response that stays open.
+
+    Raises:
+        HTTPException: 503 error if this worker already serves CATALOG_EVENTS_MAX_SUBSCRIBERS streams.
+    """
+    # A short session: the stream must not hold a pooled connection while it is open
+    async with AsyncSessionLocal() as db:
+        version, _ = await catalog_service.get_catalog_version(db)
+    try:
+        subscriber = events_service.catalog_events.subscribe(request.headers.get("last-event-id"), version)
+    except events_service.SubscriberLimitReached as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
+    async def stream():
+        try:
+            # Tell EventSource how long to wait before reconnecting
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    yield await asyncio.wait_for(
+                        subscriber.queue.get(), settings.CATALOG_EVENTS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+        finally:
+            events_service.catalog_events.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        # X-Accel-Buffering stops nginx from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/search", response_model=List[Product])
+async def search_products(request: Request, q: str = Query(..., min_length=1, max_length=200), skip: int = 0, limit: int = Query(20, ge=1, le=100), db: AsyncSession = Depends(get_read_db)):
+    """
+    Full-text search over product names and descriptions.
+
+    Supports web-search syntax ("quoted phrases", -exclusions, OR). Results are ranked
+    with name matches above description matches. Like the other catalog reads, responses
+    carry ETag and Last-Modified headers and are cached per catalog version.
+
+    Args:
+        request (Request): The incoming request, used for conditional headers.
+        q (str): The search query.
+        skip (int): The number of results to skip. Defaults to 0.
+        limit (int): The maximum number of results to return (1-100). Defaults to 20.
+        db (AsyncSession): The database session dependency.
+
+    Returns:
+        List[Product]: The matching products, best match first.
+    """
+    async def render(db):
+        products = await product_service.search_products(db, q, skip, limit)
+        body = product_list_adapter.dump_json(
+            product_list_adapter.validate_python(products, from_attributes=True)
+        )
+        return body, {}
+
+    return await cached_catalog_response(request, db, render)
+
 @router.get("/{product_id}", response_model=Product)
-async def get_product(product_id: UUID, db: AsyncSession = Depends(get_db)):
+async def get_product(request: Request, product_id: UUID, db: AsyncSession = Depends(get_read_db)):
     """
     Retrieve a specific product by its unique ID.
 
+    Responses carry ETag and Last-Modified headers; conditional requests get a 304.
+
     Args:
+        request (Request): The incoming request, used for conditional headers.
         product_id (UUID): The unique identifier of the product.
         db (AsyncSession): The database session dependency.
 
@@ -70,10 +316,13 @@ async def get_product(product_id: UUID, db: AsyncSession = Depends(get_db)):
     Raises:
         HTTPException: 404 error if the product is not found.
     """
-    product = await product_service.get_product(db, product_id)
-    if product is None:
-        raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    async def render(db):
+        product = await product_service.get_product(db, product_id)
+        if product is None:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return product_adapter.dump_json(product_adapter.validate_python(product, from_attributes=True)), {}
+
+    return await cached_catalog_response(request, db, render)
 
 @router.put("/{product_id}", response_model=Product)
 async def update_product(product_id: UUID, product: ProductCreate, db: AsyncSession = Depends(get_db)):
@@ -97,8 +346,61 @@ async def update_product(product_id: UUID, product: ProductCreate, db: AsyncSess
     return updated_product
 
 @router.delete("/{product_id}")
-async def delete_product(product_id: int, db: AsyncSession = Depends(get_db)):
+async def delete_product(product_id: UUID, db: AsyncSession = Depends(get_db)):
     deleted_product = await product_service.delete_product(db, product_id)
     if deleted_product is None:
         raise HTTPException(status_code=404, detail="Product not found")
     return {"message": "Product deleted successfully"}
+
+@router.get("/{product_id}/stock", response_model=StockLevel)
+async def get_stock(product_id: UUID, db: AsyncSession = Depends(get_db)):
+    """
+    Retrieve the current stock level of a product.
+
+    Stock changes with every checkout, so it is read from the primary and is not part
+    of the cached catalog responses.
+
+    Args:
+        product_id (UUID): The unique identifier of the product.
+        db (AsyncSession): The database session dependency.
+
+    Returns:
+        StockLevel: Units available and the shard count.
+
+    Raises:
+        HTTPException: 404 error if the product is not found.
+    """
+    level = await inventory_service.get_stock(db, product_id)
+    if level is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    stock, shards = level
+    return StockLevel(product_id=product_id, stock=stock, shards=shards)
+
+@router.put("/{product_id}/stock", response_model=StockLevel)
+async def set_stock(product_id: UUID, payload: StockUpdate, db: AsyncSession = Depends(get_db)):
+    """
+    Set the stock level of a product.
+
+    Pass `shards` > 0 for products that take a large share of checkouts (e.g. a flash
+    sale item): their stock is split over that many counter rows so concurrent
+    checkouts do not queue on one row lock.
+
+    Args:
+        product_id (UUID): The unique identifier of the product.
+        payload (StockUpdate): The new stock level and shard count.
+        db (AsyncSession): The database session dependency.
+
+    Returns:
+        StockLevel: The stock level after the update.
+
+    Raises:
+        HTTPException: 404 error if the product is not found.
+        HTTPException: 422 error if shards are requested without a stock level.
+    """
+    try:
+        found = await inventory_service.set_stock(db, product_id, payload.stock, payload.shards)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if not found:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return StockLevel(product_id=product_id, stock=payload.stock, shards=payload.shards)
@@ -2,7 +2,7 @@
 User API Routes
 
 This module defines the API endpoints for user management.
-It handles user registration, retrieval, and profile access.
+It handles user registration, retrieval, profile access and account flags.
 """
 
 # Import FastAPI components
@@ -10,17 +10,23 @@ from fastapi import APIRouter, Depends, HTTPException
 # Import AsyncSession for database interaction
 from sqlalchemy.ext.asyncio import AsyncSession
 # Import List for type hinting
-from typing import List
-# Import database dependency
-from core.database import get_db
-# Import authentication dependency
-from core.deps import get_current_user
+from typing import List, Optional
+# Import database dependencies (read-only endpoints may be served by the replica) and the read-your-writes pin
+from core.database import get_db, get_read_db, mark_written
+# Import authentication dependencies
+from core.deps import get_current_user, get_current_admin
 # Import Pydantic schemas
-from schemas.user import User, UserCreate
+from schemas.user import User, UserCreate, UserFlagsUpdate
 # Import service logic
 from services import user as user_service
 # Import UUID for ID handling
 from uuid import UUID
+# Import the fast JSON response for projected list rows
+from utils.serialization import FastJSONResponse
+# Import the error raised when the password hashing pool is saturated
+from utils.security import PasswordHasherBusy
+# Import cursor helpers for keyset pagination
+from utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, next_page_cursor
 
 # Initialize the API router for users
 router = APIRouter(
@@ -55,6 +61,7 @@ async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
 
     Raises:
         HTTPException: 400 error if the email is already registered.
+        HTTPException: 503 error if the password hashing pool is saturated.
     """
     # Check if a user with the same email already exists
     db_user = await user_service.get_user_by_email(db, user.email)
@@ -62,27 +69,47 @@ async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create the new user
-    return await user_service.create_user(db, user)
+    try:
+        db_user = await user_service.create_user(db, user)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+    # Keep reads of the new user on the primary until the replica has it
+    mark_written(db_user.id)
+    return db_user
 
 @router.get("/", response_model=List[User])
-async def read_users(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+async def read_users(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: AsyncSession = Depends(get_read_db)):
     """
-    Retrieve a list of users with pagination.
+    Retrieve a list of users with pagination, ordered by email.
     
     Note: In a production environment, this endpoint should be restricted to administrators.
 
+    Pass the `X-Next-Cursor` response header back as `cursor` to fetch the next page
+    with an index seek; `skip` is ignored when a cursor is given.
+
     Args:
         skip (int): The number of records to skip. Defaults to 0.
         limit (int): The maximum number of records to return. Defaults to 100.
+        cursor (Optional[str]): Opaque cursor returned by a previous page.
         db (AsyncSession): The database session dependency.
 
     Returns:
         List[User]: A list of user objects.
+
+    Raises:
+        HTTPException: 400 error if the cursor is invalid.
     """
-    return await user_service.get_users(db, skip, limit)
+    try:
+        after = decode_cursor(cursor, (str, UUID)) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Fast path: projected rows serialized directly (same shape as List[User])
+    users = await user_service.get_user_rows(db, skip, limit, after=after)
+    next_cursor = next_page_cursor(users, limit, lambda u: (u["email"], u["id"]))
+    return FastJSONResponse(users, headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
 
 @router.get("/{user_id}", response_model=User)
-async def read_user(user_id: UUID, db: AsyncSession = Depends(get_db)):
+async def read_user(user_id: UUID, db: AsyncSession = Depends(get_read_db)):
     """
     Retrieve a specific user by their unique ID.
 
@@ -100,3 +127,29 @@ async def read_user(user_id: UUID, db: AsyncSession = Depends(get_db)):
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
+
+@router.patch("/{user_id}", response_model=User)
+async def update_user(user_id: UUID, flags: UserFlagsUpdate, current_user: User = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
+    """
+    Activate or deactivate a user, or grant or revoke admin privileges.
+
+    The change applies to the user's next request on every worker.
+
+    Args:
+        user_id (UUID): The unique identifier of the user.
+        flags (UserFlagsUpdate): The flags to change.
+        current_user (User): The authenticated administrator (injected by dependency).
+        db (AsyncSession): The database session dependency.
+
+    Returns:
+        User: The updated user object.
+
+    Raises:
+        HTTPException: 403 error if the current user is not an administrator.
+        HTTPException: 404 error if the user is not found.
+    """
+    db_user = await user_service.update_user_flags(db, user_id, is_active=flags.is_active, is_admin=flags.is_admin)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    mark_written(db_user.id)
+    return db_user
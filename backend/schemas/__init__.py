@@ -1,3 +1,3 @@
 from schemas.product import Product, ProductCreate
 from schemas.user import User, UserCreate
-from schemas.order import Order, OrderCreate, OrderItem, OrderItemCreate
+from schemas.order import Order, OrderCreate, OrderItem, OrderItemCreate, OrderBulkCreate, OrderBulkResult, OrderBulkResponse
@@ -0,0 +1,62 @@
+"""
+Analytics Pydantic Schemas
+
+This module defines the Pydantic models used to serialize sales analytics
+computed from the daily_product_sales rollup.
+"""
+
+# Import Pydantic components
+from pydantic import BaseModel, ConfigDict
+# Import Optional for fields that can be None
+from typing import Optional
+# Import date for day fields
+from datetime import date
+# Import UUID for type hinting
+from uuid import UUID
+
+class DailyRevenue(BaseModel):
+    """
+    Daily Revenue Schema
+
+    Attributes:
+        day (date): The UTC calendar day.
+        revenue (float): Total revenue of the day.
+        units (int): Total units sold on the day.
+    """
+    day: date
+    revenue: float
+    units: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ProductSales(BaseModel):
+    """
+    Product Sales Schema
+
+    Attributes:
+        product_id (UUID): The product.
+        name (Optional[str]): The product name, if the product still exists.
+        units (int): Units sold in the requested range.
+        revenue (float): Revenue in the requested range.
+    """
+    product_id: UUID
+    name: Optional[str] = None
+    units: int
+    revenue: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+class UnitsSold(BaseModel):
+    """
+    Units Sold Schema
+
+    Attributes:
+        start (date): Inclusive start of the range.
+        end (date): Exclusive end of the range.
+        product_id (Optional[UUID]): The product, or None for all products.
+        units (int): Units sold in the range.
+    """
+    start: date
+    end: date
+    product_id: Optional[UUID] = None
+    units: int
@@ -6,9 +6,9 @@ and serializing order responses. It handles nested structures for order items.
 """
 
 # Import Pydantic components
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 # Import List for type hinting lists of objects
-from typing import List
+from typing import List, Optional
 # Import datetime for timestamp fields
 from datetime import datetime
 # Import UUID for unique identifiers
@@ -32,8 +32,9 @@ class OrderItemCreate(OrderItemBase):
     Order Item Creation Schema
     
     Used when a user submits a new order. Inherits from OrderItemBase.
+    The quantity must be positive, otherwise it would add units to stock.
     """
-    pass
+    quantity: int = Field(..., gt=0)
 
 class OrderItem(OrderItemBase):
     """
@@ -86,14 +87,80 @@ class Order(OrderBase):
         user_id (UUID): The ID of the user who placed the order.
         status (str): The current status of the order (e.g., 'pending', 'completed').
         created_at (datetime): The timestamp when the order was created.
+        total_amount (float): The order value (sum of quantity * price_at_purchase).
+        item_count (int): The total number of units in the order.
         items (List[OrderItem]): A list of items contained in this order.
     """
     id: UUID
     user_id: UUID
     status: str
     created_at: datetime
+    total_amount: float = 0
+    item_count: int = 0
     items: List[OrderItem] = []
 
     # Pydantic V2 Configuration
     # Enables ORM mode for compatibility with SQLAlchemy models
     model_config = ConfigDict(from_attributes=True)
+
+class OrderBulkCreate(BaseModel):
+    """
+    Bulk Order Creation Schema
+
+    The payload expected when ingesting many orders in a single request.
+
+    Attributes:
+        orders (List[OrderCreate]): The orders to create, in submission order.
+    """
+    orders: List[OrderCreate]
+
+class OrderBulkResult(BaseModel):
+    """
+    Bulk Order Result Schema
+
+    The outcome of a single order within a bulk ingestion request.
+
+    Attributes:
+        index (int): Position of the order in the submitted batch.
+        status (str): 'created', 'rejected' (unknown products or out of stock) or 'failed' (database error).
+        order_id (Optional[UUID]): The ID of the created order, if it was created.
+        error (Optional[str]): A human readable reason when the order was not created.
+        missing_product_ids (List[UUID]): Unknown products referenced by a rejected order.
+        out_of_stock_product_ids (List[UUID]): Products a rejected order asked more units of than were left.
+    """
+    index: int
+    status: str
+    order_id: Optional[UUID] = None
+    error: Optional[str] = None
+    missing_product_ids: List[UUID] = []
+    out_of_stock_product_ids: List[UUID] = []
+
+class OrderBulkResponse(BaseModel):
+    """
+    Bulk Order Response Schema
+
+    Summary and per-order results of a bulk ingestion request.
+
+    Attributes:
+        created (int): Number of orders written.
+        rejected (int): Number of orders that were not written.
+        results (List[OrderBulkResult]): One result per submitted order, in submission order.
+    """
+    created: int
+    rejected: int
+    results: List[OrderBulkResult]
+
+class OrderStatus(BaseModel):
+    """
+    Order Status Schema
+
+    Returned with 202 Accepted by asynchronous checkout, and by the order status endpoint.
+
+    Attributes:
+        id (UUID): The ID the order is (or will be) stored under.
+        status (str): 'pending' (queued), 'completed', 'rejected' (out of stock) or 'failed' (database error).
+        detail (Optional[dict]): Why the order was rejected or failed.
+    """
+    id: UUID
+    status: str
+    detail: Optional[dict] = None
@@ -6,9 +6,9 @@ during creation and for serializing product data in API responses.
 """
 
 # Import Pydantic components
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 # Import Optional for fields that can be None
-from typing import Optional
+from typing import List, Optional
 # Import UUID for type hinting
 from uuid import UUID
 
@@ -55,3 +55,41 @@ class Product(ProductBase):
     # Pydantic V2 Configuration
     # from_attributes=True enables compatibility with ORM objects (SQLAlchemy models).
     model_config = ConfigDict(from_attributes=True)
+
+class ProductBatch(BaseModel):
+    """
+    Product Batch Response Schema
+
+    Attributes:
+        products (List[Product]): The products found, in the order their IDs were requested.
+        missing_ids (List[UUID]): Requested IDs that do not exist, in request order.
+    """
+    products: List[Product]
+    missing_ids: List[UUID]
+
+class StockUpdate(BaseModel):
+    """
+    Stock Update Schema
+
+    Defines the payload for setting a product's stock level.
+
+    Attributes:
+        stock (Optional[int]): Units available. None stops tracking stock for the product.
+        shards (int): Split the stock over this many counter rows (sharded stock mode, for
+            very hot products). 0 keeps it on the product row.
+    """
+    stock: Optional[int] = Field(None, ge=0)
+    shards: int = Field(0, ge=0, le=256)
+
+class StockLevel(BaseModel):
+    """
+    Stock Level Response Schema
+
+    Attributes:
+        product_id (UUID): The unique identifier of the product.
+        stock (Optional[int]): Units available, summed over shards. None if stock is not tracked.
+        shards (int): Number of counter rows the stock is split into; 0 if not sharded.
+    """
+    product_id: UUID
+    stock: Optional[int]
+    shards: int
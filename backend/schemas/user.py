@@ -7,8 +7,9 @@ related to User operations (registration, response).
 
 # Import Pydantic's BaseModel and ConfigDict for configuration
 from pydantic import BaseModel, ConfigDict
-# Import UUID for type hinting
+# Import UUID and Optional for type hinting
 from uuid import UUID
+from typing import Optional
 
 class UserBase(BaseModel):
     """
@@ -35,6 +36,19 @@ class UserCreate(UserBase):
     password: str
     is_admin: bool = False
 
+class UserFlagsUpdate(BaseModel):
+    """
+    User Flags Update Schema
+
+    Defines the account flags an administrator can change. Omitted flags are left unchanged.
+
+    Attributes:
+        is_active (Optional[bool]): Whether the user account is active.
+        is_admin (Optional[bool]): Whether the user has admin privileges.
+    """
+    is_active: Optional[bool] = None
+    is_admin: Optional[bool] = None
+
 class User(UserBase):
     """
     User Response Schema
@@ -1,137 +1,285 @@
+"""
+Synthetic Data Generator
+
+Fills the database with a reproducible, realistically skewed data set for local
+development and capacity testing:
+
+* products with a long-tail popularity curve (a few best sellers, many rarely bought)
+* users with a long-tail activity curve (a few power users, many one-time buyers)
+* orders spread over the --days days before --end-date, with 1-20 lines each
+
+Rows are generated lazily and written in chunks, through COPY on PostgreSQL
+(asyncpg) and batched INSERTs elsewhere, so memory stays flat at any scale.
+Generated users share one bcrypt hash of GENERATED_PASSWORD, computed once.
+
+The schema is owned by the Alembic migrations: run `alembic upgrade head` first;
+the generator refuses to write to a database that is not at the head revision.
+
+The demo accounts admin@example.com / admin123 and user@example.com / user123 are
+created if missing. By default rows are appended to the existing data; the same
+--seed and --end-date on the same starting data produce the same rows. --reset
+empties every data table first (the schema and catalog version are kept).
+
+Usage:
+    python seed.py [--products 1e6] [--users 1e5] [--orders 1e7] [--seed 42]
+                   [--days 365] [--end-date 2026-01-01] [--chunk-size 50000] [--reset]
+"""
+
+import argparse
 import asyncio
+import random
+import time
+import uuid
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from itertools import islice
+
+from sqlalchemy import delete, func, insert, select, text
+
+from core.config import settings
 from core.database import AsyncSessionLocal, engine
-from models.base import Base
+from core.startup import check_schema
+from models.analytics import DailyProductSales
+from models.idempotency import IdempotencyKey
+from models.inventory import ProductStockShard
+from models.order import Order, OrderItem
 from models.product import Product
 from models.user import User
-from models.order import Order, OrderItem
-from sqlalchemy import select
+from services import analytics as analytics_service
+from services.catalog import bump_catalog_version
 from utils.security import get_password_hash
 
-async def seed_data():
-    # Drop all tables to ensure a clean slate for UUID changes
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
+# Password of every generated user
+GENERATED_PASSWORD = "password123"
+
+# Default --end-date; fixed so the same arguments always generate the same orders
+DEFAULT_END_DATE = "2026-01-01"
+
+# Tables emptied by --reset, children first
+RESET_TABLES = [
+    OrderItem.__table__,
+    Order.__table__,
+    DailyProductSales.__table__,
+    IdempotencyKey.__table__,
+    ProductStockShard.__table__,
+    Product.__table__,
+    User.__table__,
+]
+
+DEMO_USERS = [
+    ("admin@example.com", "admin123", True),
+    ("user@example.com", "user123", False),
+]
+
+ADJECTIVES = ["Minimalist", "Leather", "Wireless", "Ceramic", "Running", "Vintage", "Organic", "Smart",
+              "Portable", "Handmade", "Waterproof", "Classic", "Compact", "Premium", "Eco"]
+NOUNS = ["Watch", "Backpack", "Headphones", "Mug", "Shoes", "Lamp", "Notebook", "Bottle", "Jacket",
+         "Speaker", "Wallet", "Sunglasses", "Keyboard", "Blanket", "Camera"]
+IMAGES = [
+    "https://images.unsplash.com/photo-1523275335684-37898b6baf30?auto=format&fit=crop&w=500&q=60",
+    "https://images.unsplash.com/photo-1553062407-98eeb64c6a62?auto=format&fit=crop&w=500&q=60",
+    "https://images.unsplash.com/photo-1505740420928-5e560c06d30e?auto=format&fit=crop&w=500&q=60",
+    "https://images.unsplash.com/photo-1514228742587-6b1558fcca3d?auto=format&fit=crop&w=500&q=60",
+    "https://images.unsplash.com/photo-1542291026-7eec264c27ff?auto=format&fit=crop&w=500&q=60",
+]
+
+# Popularity skew exponents: index = n * random() ** skew, so the first 1% of products
+# receive ~22% of order lines and the first 1% of users place ~10% of orders
+PRODUCT_SKEW = 3.0
+USER_SKEW = 2.0
+
+def count(value: str) -> int:
+    # Accepts "1000", "1e6", "2.5e5"
+    return int(float(value))
+
+def skewed_index(rng: random.Random, n: int, skew: float) -> int:
+    return min(int(n * rng.random() ** skew), n - 1)
+
+def random_uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+def generate_products(rng, n, offset):
+    for i in range(offset, offset + n):
+        name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}"
+        price = round(rng.lognormvariate(3.5, 0.9), 2)
+        yield (random_uuid(rng), name, f"{name}, generated for capacity testing.", price, rng.choice(IMAGES))
+
+def generate_users(rng, n, offset, hashed_password):
+    for i in range(offset, offset + n):
+        yield (random_uuid(rng), f"user{i}@example.com", hashed_password, True, False)
 
+def generate_orders(rng, n, user_ids, products, days, end_date, items_out):
+    # Yields order rows, created in the `days` days before end_date, and appends their item rows to items_out
+    now = datetime.combine(end_date, dt_time.min, tzinfo=timezone.utc)
+    quantities = [1, 2, 3, 4]
+    quantity_weights = [70, 20, 7, 3]
+    for _ in range(n):
+        order_id = random_uuid(rng)
+        user_id = user_ids[skewed_index(rng, len(user_ids), USER_SKEW)]
+        created_at = now - timedelta(seconds=rng.random() * days * 86400)
+        lines = {}
+        for _ in range(min(1 + int(rng.expovariate(0.7)), 20)):
+            product_id, price = products[skewed_index(rng, len(products), PRODUCT_SKEW)]
+            quantity = rng.choices(quantities, quantity_weights)[0]
+            if product_id in lines:
+                lines[product_id][3] += quantity
+            else:
+                lines[product_id] = [random_uuid(rng), order_id, product_id, quantity, price]
+        items_out.extend(tuple(line) for line in lines.values())
+        total_amount = round(sum(line[3] * line[4] for line in lines.values()), 2)
+        item_count = sum(line[3] for line in lines.values())
+        yield (order_id, user_id, "completed", created_at, total_amount, item_count)
+
+def chunks(rows, size):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+async def write_rows(conn, table, columns, rows):
+    """
+    Writes tuples to `table`: COPY on asyncpg, executemany INSERT otherwise.
+    """
+    if conn.dialect.driver == "asyncpg":
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(table.name, records=rows, columns=columns)
+    else:
+        await conn.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+
+async def copy_table(table, columns, rows, chunk_size, total, on_chunk=None):
+    written = 0
+    start = time.perf_counter()
+    for chunk in chunks(rows, chunk_size):
+        # One transaction per chunk keeps WAL and lock footprints bounded
+        async with engine.begin() as conn:
+            if on_chunk is not None:
+                await on_chunk(conn)
+            await write_rows(conn, table, columns, chunk)
+        written += len(chunk)
+        rate = written / max(time.perf_counter() - start, 1e-9)
+        print(f"\r  {table.name}: {written:,}/{total:,} ({rate:,.0f} rows/s)", end="", flush=True)
+    if total:
+        print()
+
+async def ensure_demo_users():
     async with AsyncSessionLocal() as session:
-        # Check if we already have products
-        result = await session.execute(select(Product))
-        products = result.scalars().all()
-        
-        if not products:
-            print("Seeding products...")
-            
-            # Create some dummy products
-            product_list = [
-                Product(
-                    name="Minimalist Watch",
-                    description="A simple, elegant watch for everyday wear.",
-                    price=120.00,
-                    image_url="https://images.unsplash.com/photo-1523275335684-37898b6baf30?auto=format&fit=crop&w=500&q=60"
-                ),
-                Product(
-                    name="Leather Backpack",
-                    description="Durable leather backpack with plenty of storage.",
-                    price=85.50,
-                    image_url="https://images.unsplash.com/photo-1553062407-98eeb64c6a62?auto=format&fit=crop&w=500&q=60"
-                ),
-                Product(
-                    name="Wireless Headphones",
-                    description="High-quality sound with noise cancellation.",
-                    price=199.99,
-                    image_url="https://images.unsplash.com/photo-1505740420928-5e560c06d30e?auto=format&fit=crop&w=500&q=60"
-                ),
-                Product(
-                    name="Ceramic Coffee Mug",
-                    description="Handcrafted ceramic mug for your morning brew.",
-                    price=25.00,
-                    image_url="https://images.unsplash.com/photo-1514228742587-6b1558fcca3d?auto=format&fit=crop&w=500&q=60"
-                ),
-                 Product(
-                    name="Running Shoes",
-                    description="Lightweight and comfortable shoes for running.",
-                    price=110.00,
-                    image_url="https://images.unsplash.com/photo-1542291026-7eec264c27ff?auto=format&fit=crop&w=500&q=60"
-                ),
-            ]
-
-            session.add_all(product_list)
-            await session.commit()
-            print("Products seeded successfully!")
-            
-            # Refresh products to get IDs
-            result = await session.execute(select(Product))
-            products = result.scalars().all()
-        else:
-            print("Products already exist. Skipping product seed.")
-
-        # Check if we have users
-        result = await session.execute(select(User))
-        users = result.scalars().all()
-        
-        if not users:
-            print("Seeding users...")
-            
-            admin_user = User(
-                email="admin@example.com",
-                hashed_password=get_password_hash("admin123"),
-                is_admin=True
-            )
-            
-            regular_user = User(
-                email="user@example.com",
-                hashed_password=get_password_hash("user123"),
-                is_admin=False
-            )
-            
-            session.add(admin_user)
-            session.add(regular_user)
-            await session.commit()
-            print("Users seeded successfully!")
-            
-            # Create a sample order for the regular user
-            print("Seeding orders...")
-            order = Order(
-                user_id=regular_user.id,
-                status="completed"
-            )
-            session.add(order)
-            await session.flush() # Get order ID
-
-            # Add items to order
-            if products:
-                order_item = OrderItem(
-                    order_id=order.id,
-                    product_id=products[0].id,
-                    quantity=1,
-                    price_at_purchase=products[0].price
-                )
-                session.add(order_item)
-                await session.commit()
-                print("Orders seeded successfully!")
+        existing = set((await session.execute(
+            select(User.email).where(User.email.in_([email for email, _, _ in DEMO_USERS]))
+        )).scalars())
+        for email, password, is_admin in DEMO_USERS:
+            if email not in existing:
+                session.add(User(email=email, hashed_password=get_password_hash(password), is_admin=is_admin))
+                print(f"Created demo account {email} / {password}")
+        await session.commit()
 
+async def require_schema_at_head():
+    # The migrations create the tables; writing to another schema would only fail midway or hide drift
+    settings.SCHEMA_CHECK = "error"
+    try:
+        async with engine.connect() as conn:
+            await check_schema(conn)
+    except RuntimeError as exc:
+        raise SystemExit(str(exc))
+
+async def reset_data():
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text(f"TRUNCATE {', '.join(table.name for table in RESET_TABLES)}"))
+        else:
+            for table in RESET_TABLES:
+                await conn.execute(delete(table))
+        # Cached catalog pages and ETags must not survive the reset
+        async with AsyncSessionLocal(bind=conn) as session:
+            await bump_catalog_version(session)
             await session.flush()
-            
-            # Add items to the order
-            if products:
-                item1 = OrderItem(
-                    order_id=order.id,
-                    product_id=products[0].id,
-                    quantity=1,
-                    price_at_purchase=products[0].price
-                )
-                item2 = OrderItem(
-                    order_id=order.id,
-                    product_id=products[1].id,
-                    quantity=2,
-                    price_at_purchase=products[1].price
+    print("Emptied " + ", ".join(table.name for table in RESET_TABLES))
+
+async def seed_data(args):
+    await require_schema_at_head()
+    if args.reset:
+        await reset_data()
+
+    await ensure_demo_users()
+
+    async with AsyncSessionLocal() as session:
+        existing_products = (await session.execute(select(func.count()).select_from(Product))).scalar_one()
+        existing_users = (await session.execute(select(func.count()).select_from(User))).scalar_one()
+        existing_orders = (await session.execute(select(func.count()).select_from(Order))).scalar_one()
+
+    # Deriving the stream from the starting counts keeps appends reproducible without colliding
+    rng = random.Random(f"{args.seed}:{existing_products}:{existing_users}:{existing_orders}")
+    print(f"Appending to {existing_products:,} products, {existing_users:,} users, {existing_orders:,} orders")
+
+    if args.products:
+        async def bump_version(conn):
+            # Invalidate catalog ETags and caches once, in the first chunk's transaction
+            if not bumped:
+                async with AsyncSessionLocal(bind=conn) as session:
+                    await bump_catalog_version(session)
+                    await session.flush()
+                bumped.append(True)
+        bumped = []
+        await copy_table(
+            Product.__table__, ["id", "name", "description", "price", "image_url"],
+            generate_products(rng, args.products, existing_products), args.chunk_size, args.products, bump_version,
+        )
+
+    if args.users:
+        hashed_password = get_password_hash(GENERATED_PASSWORD)
+        await copy_table(
+            User.__table__, ["id", "email", "hashed_password", "is_active", "is_admin"],
+            generate_users(rng, args.users, existing_users, hashed_password), args.chunk_size, args.users,
+        )
+
+    if args.orders:
+        async with AsyncSessionLocal() as session:
+            products = (await session.execute(select(Product.id, Product.price).order_by(Product.id))).all()
+            user_ids = (await session.execute(select(User.id).order_by(User.id))).scalars().all()
+        if not products or not user_ids:
+            raise SystemExit("Orders need at least one product and one user")
+        # Shuffle deterministically so popularity does not follow UUID order
+        rng.shuffle(products)
+        rng.shuffle(user_ids)
+
+        items = []
+        order_columns = ["id", "user_id", "status", "created_at", "total_amount", "item_count"]
+        item_columns = ["id", "order_id", "product_id", "quantity", "price_at_purchase"]
+        orders = generate_orders(rng, args.orders, user_ids, products, args.days, args.end_date, items)
+        written = 0
+        start = time.perf_counter()
+        for chunk in chunks(orders, args.chunk_size):
+            async with engine.begin() as conn:
+                await write_rows(conn, Order.__table__, order_columns, chunk)
+                await write_rows(conn, OrderItem.__table__, item_columns, items)
+            written += len(chunk)
+            items.clear()
+            rate = written / max(time.perf_counter() - start, 1e-9)
+            print(f"\r  orders: {written:,}/{args.orders:,} ({rate:,.0f} orders/s)", end="", flush=True)
+        print()
+
+        if engine.dialect.name == "postgresql":
+            print("Rebuilding daily sales rollups...")
+            async with AsyncSessionLocal() as session:
+                await analytics_service.backfill(
+                    session, args.end_date - timedelta(days=args.days), args.end_date + timedelta(days=1)
                 )
-                session.add(item1)
-                session.add(item2)
-                await session.commit()
-                print("Orders seeded successfully!")
         else:
-            print("Users already exist. Skipping user seed.")
+            print("Skipping daily sales rollups (backfill requires PostgreSQL)")
+
+    await engine.dispose()
+    print("Done.")
 
 if __name__ == "__main__":
-    asyncio.run(seed_data())
+    parser = argparse.ArgumentParser(description="Generate a reproducible synthetic data set.")
+    parser.add_argument("--products", type=count, default=100, help="Products to add (accepts 1e6).")
+    parser.add_argument("--users", type=count, default=20, help="Users to add (accepts 1e5).")
+    parser.add_argument("--orders", type=count, default=200, help="Orders to add (accepts 1e7).")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed.")
+    parser.add_argument("--days", type=int, default=365, help="Spread order timestamps over this many days.")
+    parser.add_argument(
+        "--end-date", type=date.fromisoformat, default=date.fromisoformat(DEFAULT_END_DATE),
+        help=f"Orders are placed before this UTC date (YYYY-MM-DD, default {DEFAULT_END_DATE}).",
+    )
+    parser.add_argument("--chunk-size", type=count, default=50000, help="Rows per COPY/INSERT transaction.")
+    parser.add_argument("--reset", action="store_true", help="Empty all data tables first.")
+    args = parser.parse_args()
+    engine.echo = False
+    asyncio.run(seed_data(args))
@@ -0,0 +1,141 @@
+"""
+Analytics Service
+
+Maintains the daily_product_sales rollup and answers dashboard queries from it.
+Reads never touch orders or order_items, so their cost is O(days x products) in
+the requested range rather than O(order history).
+
+Checkouts of a product in sharded stock mode book their sales on a random one of
+SALES_ROLLUP_SHARDS rows instead of the product's single row for the day, so the
+rollup upsert does not serialize the checkouts that the stock shards let run in
+parallel. Every read sums over the shards.
+"""
+
+import random
+from datetime import date
+from sqlalchemy import func, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from models.analytics import DailyProductSales
+from models.product import Product
+
+# Rollup rows per day of a product in sharded stock mode
+SALES_ROLLUP_SHARDS = 8
+
+def aggregate_sales(day: date, orders, sharded=()):
+    """
+    Folds order lines into rollup increments.
+
+    Args:
+        day (date): The UTC day the orders were placed.
+        orders (Iterable[dict[UUID, tuple[int, float]]]): Per order, (quantity, price) by product ID.
+        sharded (Collection[UUID]): Products in sharded stock mode; their increment goes to a random shard.
+
+    Returns:
+        list[dict]: One increment row per product, sorted by product ID.
+    """
+    totals = {}
+    for lines in orders:
+        for product_id, (quantity, price) in lines.items():
+            units, revenue, order_count = totals.get(product_id, (0, 0.0, 0))
+            totals[product_id] = (units + quantity, revenue + quantity * price, order_count + 1)
+    # Sorted so concurrent transactions lock rollup rows in the same order (no deadlocks)
+    return [
+        {
+            "day": day,
+            "product_id": product_id,
+            "shard": random.randrange(SALES_ROLLUP_SHARDS) if product_id in sharded else 0,
+            "units": units,
+            "revenue": revenue,
+            "order_count": order_count,
+        }
+        for product_id, (units, revenue, order_count) in sorted(totals.items(), key=lambda item: str(item[0]))
+    ]
+
+async def record_sales(db: AsyncSession, rows):
+    # Upsert increments inside the caller's transaction
+    if not rows:
+        return
+    statement = postgresql.insert(DailyProductSales).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[DailyProductSales.day, DailyProductSales.product_id, DailyProductSales.shard],
+        set_={
+            "units": DailyProductSales.units + statement.excluded.units,
+            "revenue": DailyProductSales.revenue + statement.excluded.revenue,
+            "order_count": DailyProductSales.order_count + statement.excluded.order_count,
+        },
+    )
+    await db.execute(statement)
+
+async def get_daily_revenue(db: AsyncSession, start: date, end: date):
+    result = await db.execute(
+        select(
+            DailyProductSales.day,
+            func.sum(DailyProductSales.revenue).label("revenue"),
+            func.sum(DailyProductSales.units).label("units"),
+        )
+        .where(DailyProductSales.day >= start, DailyProductSales.day < end)
+        .group_by(DailyProductSales.day)
+        .order_by(DailyProductSales.day)
+    )
+    return result.all()
+
+async def get_top_products(db: AsyncSession, start: date, end: date, limit: int = 10, by: str = "revenue"):
+    totals = (
+        select(
+            DailyProductSales.product_id,
+            func.sum(DailyProductSales.units).label("units"),
+            func.sum(DailyProductSales.revenue).label("revenue"),
+        )
+        .where(DailyProductSales.day >= start, DailyProductSales.day < end)
+        .group_by(DailyProductSales.product_id)
+        .subquery()
+    )
+    result = await db.execute(
+        select(totals.c.product_id, Product.name, totals.c.units, totals.c.revenue)
+        .outerjoin(Product, Product.id == totals.c.product_id)
+        .order_by(totals.c[by].desc(), totals.c.product_id)
+        .limit(limit)
+    )
+    return result.all()
+
+async def get_units_sold(db: AsyncSession, start: date, end: date, product_id=None):
+    query = (
+        select(func.coalesce(func.sum(DailyProductSales.units), 0))
+        .where(DailyProductSales.day >= start, DailyProductSales.day < end)
+    )
+    if product_id is not None:
+        query = query.where(DailyProductSales.product_id == product_id)
+    result = await db.execute(query)
+    return result.scalar_one()
+
+async def backfill(db: AsyncSession, start: date, end: date):
+    # Recomputes [start, end) from the completed orders in one transaction; rejected and failed
+    # orders are stored too but were never sold
+    await db.execute(
+        DailyProductSales.__table__.delete()
+        .where(DailyProductSales.day >= start, DailyProductSales.day < end)
+    )
+    result = await db.execute(
+        text(
+            """
+            INSERT INTO daily_product_sales (day, product_id, units, revenue, order_count)
+            SELECT (o.created_at AT TIME ZONE 'UTC')::date AS day,
+                   oi.product_id,
+                   SUM(oi.quantity),
+                   SUM(oi.quantity * oi.price_at_purchase),
+                   COUNT(DISTINCT o.id)
+            FROM orders o
+            JOIN order_items oi ON oi.order_id = o.id
+            WHERE o.created_at >= CAST(:start AS date) AT TIME ZONE 'UTC'
+              AND o.created_at < CAST(:end AS date) AT TIME ZONE 'UTC'
+              AND o.status = 'completed'
+              AND oi.product_id IS NOT NULL
+            GROUP BY 1, 2
+            """
+        ),
+        {"start": start, "end": end},
+    )
+    await db.commit()
+    return result.rowcount
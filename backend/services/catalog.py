@@ -0,0 +1,62 @@
+"""
+Catalog Version Service
+
+Tracks the version of the product catalog. The version is bumped in the same
+transaction as every product write and cached per worker for
+CATALOG_VERSION_TTL_SECONDS, so conditional GETs can usually be answered
+without a database round trip while other workers' changes are still picked up
+within the TTL.
+"""
+
+import time
+from datetime import datetime, timezone
+from sqlalchemy import update, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from core.config import settings
+from models.catalog import CatalogVersion
+
+# Version, last-modified timestamp and monotonic fetch time of this worker's copy
+_version = 0
+_updated_at = None
+_fetched_at = float("-inf")
+
+def _remember(version: int, updated_at: datetime):
+    global _version, _updated_at, _fetched_at
+    if version >= _version:
+        _version = version
+        _updated_at = updated_at
+    _fetched_at = time.monotonic()
+
+async def get_catalog_version(db: AsyncSession):
+    if time.monotonic() - _fetched_at >= settings.CATALOG_VERSION_TTL_SECONDS:
+        result = await db.execute(select(CatalogVersion.version, CatalogVersion.updated_at))
+        row = result.first()
+        if row is not None:
+            _remember(row.version, row.updated_at)
+        else:
+            _remember(0, None)
+    return _version, _updated_at
+
+async def read_catalog_version(db: AsyncSession) -> int:
+    # Uncached read, used to check whether a replica has caught up with a version
+    result = await db.execute(select(CatalogVersion.version))
+    return result.scalar_one_or_none() or 0
+
+async def bump_catalog_version(db: AsyncSession):
+    # Runs inside the caller's transaction; the row lock orders concurrent catalog writes
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        update(CatalogVersion)
+        .values(version=CatalogVersion.version + 1, updated_at=now)
+        .returning(CatalogVersion.version)
+    )
+    version = result.scalar_one_or_none()
+    if version is None:
+        version = 1
+        await db.execute(insert(CatalogVersion).values(id=1, version=version, updated_at=now))
+    return version, now
+
+def catalog_version_committed(version: int, updated_at: datetime):
+    # Called after commit so this worker serves the new version immediately
+    _remember(version, updated_at)
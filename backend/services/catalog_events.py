@@ -0,0 +1,237 @@
+"""
+Catalog Events
+
+Pushes product changes to browsers over Server-Sent Events (GET /products/events),
+so clients can keep their product lists fresh without refetching the catalog.
+Every committed create, update or delete becomes one compact event:
+
+    id: 42
+    event: product.updated
+    data: {"id": "...", "version": 42, "changed": {"price": 9.5}}
+
+The SSE id is the catalog version. `changed` holds the new values of the fields
+that changed (all fields for product.created, none for product.deleted); it is
+null when the values are too large to broadcast, and the client then refetches
+the product.
+
+Fan-out: an event is encoded to bytes once and the same bytes object is queued
+for every subscriber of the worker, so publishing costs one put_nowait per
+subscriber and never waits on a client. Each subscriber has a bounded queue. A
+slow consumer (whose TCP window is full, so its stream stops draining) is not
+allowed to hold up others or grow memory: when its queue overflows, the queued
+events are discarded and replaced by one `resync` event carrying the latest
+version, which tells the client to refetch the catalog once.
+
+Across workers: on PostgreSQL the event is also sent with pg_notify inside the
+writing transaction, so it is delivered only if the write commits. Every worker
+hears it through its LISTEN connection (core.notifications) and republishes the
+events of the other workers to its own subscribers. Elsewhere (e.g. SQLite in
+development) events only reach the subscribers of the worker that made the change.
+
+A short history of recent events lets a reconnecting client (EventSource sends
+Last-Event-ID) catch up on what it missed; if the gap is not covered, or the
+LISTEN connection was lost meanwhile, it gets a resync instead.
+
+Uvicorn waits for open streams before shutting down; run it with
+--timeout-graceful-shutdown so SSE clients do not hold a restart up.
+"""
+
+import asyncio
+import json
+import uuid
+from collections import deque
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from core.notifications import notification_listener, notify as send_notification
+
+# PostgreSQL NOTIFY channel shared by all workers
+CHANNEL = "catalog_events"
+
+# NOTIFY payloads must stay below 8000 bytes
+MAX_PAYLOAD_SIZE = 7000
+
+# Recent events kept per worker for clients that reconnect with Last-Event-ID
+HISTORY_SIZE = 256
+
+# Fields broadcast with product events, in schema order
+PRODUCT_FIELDS = ("name", "description", "price", "image_url")
+
+# Marks notifications sent by this worker, which it has already published locally
+_origin = uuid.uuid4().hex
+
+def product_event(event_type: str, product, version: int, before: Optional[dict] = None) -> dict:
+    """
+    Builds the event for a product write.
+
+    Args:
+        event_type (str): "product.created", "product.updated" or "product.deleted".
+        product (Product): The product after the write.
+        version (int): The catalog version the write produced.
+        before (dict, optional): Field values before an update; only changed fields are sent.
+
+    Returns:
+        dict: The event, ready for notify() and publish().
+    """
+    changed = {}
+    if event_type != "product.deleted":
+        for field in PRODUCT_FIELDS:
+            value = getattr(product, field)
+            if before is None or before.get(field) != value:
+                changed[field] = value
+    data = {"id": str(product.id), "version": version, "changed": changed}
+    if len(json.dumps(data)) > MAX_PAYLOAD_SIZE:
+        data["changed"] = None
+    return {"type": event_type, "data": data}
+
+def encode(event_type: str, data: dict) -> bytes:
+    # One SSE message; the id lets EventSource resume with Last-Event-ID
+    return f"id: {data['version']}\nevent: {event_type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+class SubscriberLimitReached(Exception):
+    """
+    Raised when a worker already streams to CATALOG_EVENTS_MAX_SUBSCRIBERS clients.
+    """
+
+class Subscriber:
+    """
+    One SSE client: a bounded queue of encoded events.
+
+    Attributes:
+        queue (asyncio.Queue): Encoded events waiting to be written to the client.
+        resyncs (int): How often this client fell behind and was told to resync.
+    """
+
+    def __init__(self, max_size: int):
+        self.queue = asyncio.Queue(max_size)
+        self.resyncs = 0
+
+class CatalogEventBroker:
+    """
+    Fans catalog events out to the SSE subscribers of this worker.
+
+    Attributes:
+        queue_size (int): Events buffered per subscriber before it is resynced.
+        max_subscribers (int): Concurrent streams per worker.
+        version (int): The newest catalog version seen in an event.
+        resyncs (int): Resync events sent, mostly to clients that fell behind.
+    """
+
+    def __init__(self, queue_size: int, max_subscribers: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.version = 0
+        self.resyncs = 0
+        self.subscribers = set()
+        self.history = deque(maxlen=HISTORY_SIZE)
+        # Events since this version may have been missed (LISTEN connection lost)
+        self.gap_before = 0
+
+    def subscribe(self, last_event_id: Optional[str] = None, current_version: int = 0) -> Subscriber:
+        """
+        Registers a new client and queues what it missed since `last_event_id`.
+
+        Args:
+            last_event_id (str, optional): The Last-Event-ID header of a reconnecting client.
+            current_version (int): The catalog version as this worker last read it.
+
+        Raises:
+            SubscriberLimitReached: If the worker is already at max_subscribers.
+        """
+        if len(self.subscribers) >= self.max_subscribers:
+            raise SubscriberLimitReached("Too many event stream subscribers")
+        subscriber = Subscriber(self.queue_size)
+        try:
+            last_version = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_version = None
+        latest = max(self.version, current_version)
+        if last_version is not None and last_version < latest:
+            missed = sorted((item for item in self.history if item[0] > last_version), key=lambda item: item[0])
+            # Replayable only if every version since the client's is in the history
+            covered = (
+                last_version >= self.gap_before
+                and [version for version, _ in missed] == list(range(last_version + 1, latest + 1))
+                and len(missed) <= self.queue_size
+            )
+            if covered:
+                for _, chunk in missed:
+                    subscriber.queue.put_nowait(chunk)
+            else:
+                self._resync(subscriber, latest)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers.discard(subscriber)
+
+    def publish(self, event: dict):
+        """
+        Queues an event for every subscriber of this worker. Never blocks.
+        """
+        data = event["data"]
+        chunk = encode(event["type"], data)
+        self.version = max(self.version, data["version"])
+        self.history.append((data["version"], chunk))
+        for subscriber in self.subscribers:
+            try:
+                subscriber.queue.put_nowait(chunk)
+            except asyncio.QueueFull:
+                self._resync(subscriber)
+
+    def resync_all(self):
+        """
+        Tells every subscriber to refetch the catalog, e.g. after events may have been lost.
+        """
+        self.gap_before = self.version
+        for subscriber in self.subscribers:
+            self._resync(subscriber)
+
+    def _resync(self, subscriber: Subscriber, version: Optional[int] = None):
+        # Replace whatever the client has not read yet with one resync marker
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        version = self.version if version is None else max(self.version, version)
+        subscriber.queue.put_nowait(encode("resync", {"version": version}))
+        subscriber.resyncs += 1
+        self.resyncs += 1
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self.subscribers),
+            "queued": sum(subscriber.queue.qsize() for subscriber in self.subscribers),
+            "resyncs": self.resyncs,
+        }
+
+    def on_notification(self, payload: str):
+        """
+        Publishes an event sent by another worker.
+        """
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        if message.pop("origin", None) != _origin:
+            self.publish(message)
+
+async def notify(db: AsyncSession, event: dict):
+    """
+    Sends an event to the other workers when the caller's transaction commits.
+
+    A no-op outside PostgreSQL. Call publish() on this worker's broker after the commit.
+
+    Args:
+        db (AsyncSession): The session of the write; the notification is transactional.
+        event (dict): The event from product_event().
+    """
+    payload = json.dumps({**event, "origin": _origin}, separators=(",", ":"))
+    await send_notification(db, CHANNEL, payload)
+
+# The broker shared by the product service and the events route
+catalog_events = CatalogEventBroker(
+    queue_size=settings.CATALOG_EVENTS_QUEUE_SIZE,
+    max_subscribers=settings.CATALOG_EVENTS_MAX_SUBSCRIBERS,
+)
+
+# Relay other workers' events; a lost LISTEN connection means events were missed
+notification_listener.register(CHANNEL, catalog_events.on_notification, catalog_events.resync_all)
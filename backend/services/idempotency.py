@@ -0,0 +1,227 @@
+"""
+Idempotency Service
+
+Implements Idempotency-Key handling for checkout. The first request with a key
+claims it by inserting a row and committing. It stores its response when done.
+A retry with the same key gets the stored response back. A duplicate that arrives
+while the first is still running polls until that response is stored, so the
+work is never done twice. Keys are scoped per user and expire after
+IDEMPOTENCY_KEY_TTL_SECONDS.
+
+The claim also fixes the ID the order will be written under. The order's own
+commit therefore records that the key was used, atomically, even though the
+response is stored in a later transaction. If the holder dies between the two
+commits, the request that takes the key over finds the order and replays it
+instead of placing a second one.
+"""
+
+import asyncio
+import hashlib
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import case, delete, exists, tuple_, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from core.config import settings
+from models.idempotency import IdempotencyKey
+from models.order import Order
+
+class IdempotencyKeyMismatch(Exception):
+    """
+    Raised when a key is reused with a different request body.
+    """
+
+class IdempotencyKeyInProgress(Exception):
+    """
+    Raised when the request holding a key did not finish within IDEMPOTENCY_WAIT_SECONDS.
+    """
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    body: bytes
+
+@dataclass
+class Claim:
+    """
+    The key is held by this request.
+
+    Attributes:
+        order_id (UUID): The ID to write the order under.
+        placed (bool): True if an earlier holder already committed that order; replay
+            it instead of placing it again.
+    """
+    order_id: uuid.UUID
+    placed: bool = False
+
+def request_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+async def _order_placed(db: AsyncSession, order_id) -> bool:
+    return (await db.execute(select(exists().where(Order.id == order_id)))).scalar()
+
+async def _claim(db: AsyncSession, user_id, key: str, digest: str, now: datetime) -> Optional[uuid.UUID]:
+    # Inserts the key in its own committed transaction; returns its order ID, None if the key exists
+    statement = (
+        postgresql.insert(IdempotencyKey)
+        .values(
+            user_id=user_id,
+            key=key,
+            request_hash=digest,
+            order_id=uuid.uuid4(),
+            locked_at=now,
+            expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS),
+        )
+        .on_conflict_do_nothing(index_elements=[IdempotencyKey.user_id, IdempotencyKey.key])
+        .returning(IdempotencyKey.order_id)
+    )
+    order_id = (await db.execute(statement)).scalar_one_or_none()
+    await db.commit()
+    return order_id
+
+async def _take_over(db: AsyncSession, user_id, key: str, digest: str, now: datetime) -> Optional[uuid.UUID]:
+    # Reclaims an expired key, or an in-flight claim whose holder stopped (crash, cancelled request).
+    # An expired key starts a new order; a stale claim keeps its order ID, which may already be placed,
+    # so it is only taken over by the same request (begin() reports a different body as a mismatch).
+    stale = now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS)
+    result = await db.execute(
+        update(IdempotencyKey)
+        .where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            (IdempotencyKey.expires_at <= now)
+            | (
+                IdempotencyKey.status_code.is_(None)
+                & (IdempotencyKey.locked_at <= stale)
+                & (IdempotencyKey.request_hash == digest)
+            ),
+        )
+        .values(
+            request_hash=digest,
+            status_code=None,
+            response_body=None,
+            order_id=case((IdempotencyKey.expires_at <= now, uuid.uuid4()), else_=IdempotencyKey.order_id),
+            locked_at=now,
+            expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS),
+        )
+        .returning(IdempotencyKey.order_id)
+    )
+    order_id = result.scalar_one_or_none()
+    await db.commit()
+    return order_id
+
+async def begin(db: AsyncSession, user_id, key: str, digest: str):
+    """
+    Claims `key` for this request, or returns the response stored by an earlier one.
+
+    Args:
+        db (AsyncSession): The database session. Commits are issued on it.
+        user_id (UUID): The user sending the request.
+        key (str): The Idempotency-Key header value.
+        digest (str): request_hash() of the request body.
+
+    Returns:
+        StoredResponse: The earlier response, if the key was already completed.
+        Claim: The key is now held by this request; place (or, if `placed`, replay) the
+            order under `order_id`, then call complete() or release().
+
+    Raises:
+        IdempotencyKeyMismatch: If the key was used with a different request body.
+        IdempotencyKeyInProgress: If the holder did not finish within IDEMPOTENCY_WAIT_SECONDS.
+    """
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    delay = 0.05
+    while True:
+        now = datetime.now(timezone.utc)
+        order_id = await _claim(db, user_id, key, digest, now)
+        if order_id is not None:
+            return Claim(order_id)
+        row = (await db.execute(
+            select(
+                IdempotencyKey.request_hash,
+                IdempotencyKey.status_code,
+                IdempotencyKey.response_body,
+                IdempotencyKey.order_id,
+            )
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        )).first()
+        await db.commit()
+        if row is None:
+            # Deleted between our insert attempt and the read; try to claim again
+            continue
+        order_id = await _take_over(db, user_id, key, digest, now)
+        if order_id is not None:
+            return Claim(order_id, placed=await _order_placed(db, order_id))
+        if row.request_hash != digest:
+            raise IdempotencyKeyMismatch()
+        if row.status_code is not None:
+            return StoredResponse(row.status_code, row.response_body)
+        if row.order_id is not None and await _order_placed(db, row.order_id):
+            # The order is committed but its response is not stored yet (or never will be)
+            return Claim(row.order_id, placed=True)
+        if time.monotonic() >= deadline:
+            raise IdempotencyKeyInProgress()
+        # The first request is still running; wait for its response instead of racing it
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+async def complete(db: AsyncSession, user_id, key: str, status_code: int, body: bytes):
+    """
+    Stores the response for a key held by this request.
+    """
+    await db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        .values(status_code=status_code, response_body=body)
+    )
+    await db.commit()
+
+async def release(db: AsyncSession, user_id, key: str):
+    """
+    Drops a key held by this request without storing a response, so a retry can do the work.
+
+    Use it when the request failed in a way that should not be replayed (e.g. a server error).
+    The key is kept if its order was committed anyway (e.g. the request was cancelled
+    after the commit), so a retry replays that order.
+    """
+    await db.rollback()
+    await db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.status_code.is_(None),
+            ~exists().where(Order.id == IdempotencyKey.order_id),
+        )
+    )
+    await db.commit()
+
+async def delete_expired(db: AsyncSession, batch_size: int = 1000) -> int:
+    """
+    Deletes expired keys in batches, one short transaction per batch.
+
+    Returns:
+        int: The number of keys deleted.
+    """
+    deleted = 0
+    while True:
+        now = datetime.now(timezone.utc)
+        expired = (await db.execute(
+            select(IdempotencyKey.user_id, IdempotencyKey.key)
+            .where(IdempotencyKey.expires_at <= now)
+            .limit(batch_size)
+        )).all()
+        if not expired:
+            await db.commit()
+            return deleted
+        await db.execute(
+            delete(IdempotencyKey).where(
+                tuple_(IdempotencyKey.user_id, IdempotencyKey.key).in_([tuple(row) for row in expired]),
+                IdempotencyKey.expires_at <= now,
+            )
+        )
+        await db.commit()
+        deleted += len(expired)
@@ -0,0 +1,218 @@
+"""
+Inventory Service
+
+Reserves stock at checkout without overselling and without a read-then-write race.
+
+All cart lines of normally stocked products are reserved with one conditional UPDATE:
+
+    UPDATE products SET stock = stock - <quantity of this line>
+    WHERE id IN (<cart>) AND stock >= <quantity of this line>
+    RETURNING id
+
+A product without enough stock simply does not match, so the check and the decrement
+are a single atomic step. If fewer rows come back than were requested, the caller
+rolls the whole transaction back. Rows are locked in product ID order through a
+`SELECT ... ORDER BY id FOR NO KEY UPDATE` CTE, and sharded products are reserved
+after all others, so two checkouts with overlapping carts always lock in the same
+order. The lock must not be a plain FOR UPDATE: checkout inserts its order_items
+first, and their foreign keys hold FOR KEY SHARE locks on the same product rows,
+which FOR UPDATE conflicts with (two checkouts would each wait for the other's key
+share lock). FOR NO KEY UPDATE, the lock the UPDATE takes anyway, does not.
+
+Sharded stock mode is for the few products that take most of the traffic (e.g. a
+flash sale). Their stock is split across several rows of product_stock_shards (the
+count is chosen per product with PUT /products/{id}/stock) and each checkout
+decrements one random shard that is not locked by another in-flight checkout
+(`FOR UPDATE SKIP LOCKED`), so checkouts of the same product no longer queue on
+one row lock. Only when no single unlocked shard can cover the line are all shards
+locked, in shard order, and the line taken from several of them.
+"""
+
+from typing import Optional
+from sqlalchemy import case, delete, func, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from models.inventory import ProductStockShard
+from models.product import Product
+
+class OutOfStockError(Exception):
+    """
+    Raised when a checkout asks for more units than are available.
+
+    Attributes:
+        product_ids (list[UUID]): Every product in the cart that could not be reserved.
+    """
+    def __init__(self, product_ids):
+        self.product_ids = product_ids
+        super().__init__(f"Insufficient stock: {', '.join(str(i) for i in product_ids)}")
+
+async def _reserve_products(db: AsyncSession, quantities) -> set:
+    # One statement for every non-sharded line; returns the IDs that were decremented
+    ids = sorted(quantities)
+    wanted = case(quantities, value=Product.id)
+    locked = (
+        select(Product.id)
+        .where(Product.id.in_(ids), Product.stock_sharded.is_(False), Product.stock >= wanted)
+        .order_by(Product.id)
+        .with_for_update(key_share=True)
+        .cte("locked")
+    )
+    result = await db.execute(
+        update(Product)
+        .where(Product.id.in_(select(locked.c.id)), Product.stock >= wanted)
+        .values(stock=Product.stock - wanted)
+        .returning(Product.id)
+        .execution_options(synchronize_session=False)
+    )
+    return set(result.scalars())
+
+async def _reserve_shards(db: AsyncSession, product_id, quantity: int) -> bool:
+    # Fast path: one random shard that has enough units and is not held by another checkout
+    shard = (
+        select(ProductStockShard.shard)
+        .where(ProductStockShard.product_id == product_id, ProductStockShard.stock >= quantity)
+        .order_by(func.random())
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(ProductStockShard)
+        .where(
+            ProductStockShard.product_id == product_id,
+            ProductStockShard.shard == shard,
+            ProductStockShard.stock >= quantity,
+        )
+        .values(stock=ProductStockShard.stock - quantity)
+        .returning(ProductStockShard.shard)
+        .execution_options(synchronize_session=False)
+    )
+    if result.scalar_one_or_none() is not None:
+        return True
+
+    # Slow path: the line needs several shards, or every shard with stock is busy
+    shards = (await db.execute(
+        select(ProductStockShard.shard, ProductStockShard.stock)
+        .where(ProductStockShard.product_id == product_id, ProductStockShard.stock > 0)
+        .order_by(ProductStockShard.shard)
+        .with_for_update()
+    )).all()
+    if sum(row.stock for row in shards) < quantity:
+        return False
+    taken = {}
+    remaining = quantity
+    for row in shards:
+        take = min(row.stock, remaining)
+        taken[row.shard] = take
+        remaining -= take
+        if not remaining:
+            break
+    await db.execute(
+        update(ProductStockShard)
+        .where(ProductStockShard.product_id == product_id, ProductStockShard.shard.in_(list(taken)))
+        .values(stock=ProductStockShard.stock - case(taken, value=ProductStockShard.shard))
+        .execution_options(synchronize_session=False)
+    )
+    return True
+
+async def reserve_stock(db: AsyncSession, quantities, products):
+    """
+    Decrements stock for every cart line inside the caller's transaction.
+
+    Products whose stock is not tracked (NULL and not sharded) are skipped. Call it as
+    late as possible before committing: the reserved rows stay locked until then.
+
+    Args:
+        db (AsyncSession): The database session. Nothing is committed or rolled back here.
+        quantities (dict[UUID, int]): Merged quantity per product ID.
+        products (dict[UUID, Row]): Per product ID, a row with `stock` and `stock_sharded`.
+
+    Raises:
+        OutOfStockError: If any line cannot be reserved. The caller must roll back, since
+            other lines may already have been decremented.
+    """
+    tracked = {}
+    sharded = {}
+    for product_id, quantity in quantities.items():
+        product = products[product_id]
+        if product.stock_sharded:
+            sharded[product_id] = quantity
+        elif product.stock is not None:
+            tracked[product_id] = quantity
+
+    failed = []
+    if tracked:
+        reserved = await _reserve_products(db, tracked)
+        failed.extend(product_id for product_id in tracked if product_id not in reserved)
+    if not failed:
+        for product_id in sorted(sharded):
+            if not await _reserve_shards(db, product_id, sharded[product_id]):
+                failed.append(product_id)
+                break
+    if failed:
+        raise OutOfStockError(sorted(failed))
+
+async def get_stock(db: AsyncSession, product_id):
+    """
+    Returns the stock level of a product.
+
+    Returns:
+        tuple[Optional[int], int]: (units available or None if untracked, shard count),
+        or None if the product does not exist.
+    """
+    product = (await db.execute(
+        select(Product.stock, Product.stock_sharded).where(Product.id == product_id)
+    )).first()
+    if product is None:
+        return None
+    if not product.stock_sharded:
+        return product.stock, 0
+    totals = (await db.execute(
+        select(func.coalesce(func.sum(ProductStockShard.stock), 0), func.count())
+        .where(ProductStockShard.product_id == product_id)
+    )).one()
+    return int(totals[0]), totals[1]
+
+async def set_stock(db: AsyncSession, product_id, stock: Optional[int], shards: int = 0):
+    """
+    Replaces the stock level of a product and switches it in or out of sharded mode.
+
+    The product row and its shards are locked while they are rewritten, so in-flight
+    checkouts either finish before the new level is written or see it.
+
+    Args:
+        db (AsyncSession): The database session. The change is committed.
+        product_id (UUID): The product to restock.
+        stock (int, optional): Units available; None stops tracking stock.
+        shards (int): Split the stock over this many counter rows; 0 keeps it on the product row.
+
+    Returns:
+        bool: False if the product does not exist.
+
+    Raises:
+        ValueError: If sharding is requested for a product whose stock is not tracked.
+    """
+    if shards and stock is None:
+        raise ValueError("Sharded stock mode needs a stock level")
+    locked = (await db.execute(
+        select(Product.id).where(Product.id == product_id).with_for_update()
+    )).scalar_one_or_none()
+    if locked is None:
+        await db.rollback()
+        return False
+    await db.execute(delete(ProductStockShard).where(ProductStockShard.product_id == product_id))
+    await db.execute(
+        update(Product)
+        .where(Product.id == product_id)
+        .values(stock=None if shards else stock, stock_sharded=bool(shards))
+        .execution_options(synchronize_session=False)
+    )
+    if shards:
+        # Spread the units evenly; the first (stock % shards) shards get one extra
+        base, extra = divmod(stock, shards)
+        await db.execute(insert(ProductStockShard), [
+            {"product_id": product_id, "shard": shard, "stock": base + (1 if shard < extra else 0)}
+            for shard in range(shards)
+        ])
+    await db.commit()
+    return True
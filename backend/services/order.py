@@ -10,120 +10,562 @@ It interacts directly with the database using SQLAlchemy's async session.
 from sqlalchemy.ext.asyncio import AsyncSession
 # Import select for constructing SQL queries
 from sqlalchemy.future import select
+# Import insert for bulk multi-row inserts and tuple_ for keyset comparisons
+from sqlalchemy import insert, tuple_
 # Import selectinload for eager loading of related data (relationships)
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, noload
 # Import the SQLAlchemy models for Order and OrderItem
 from models.order import Order, OrderItem
 # Import the Product model to fetch price information
 from models.product import Product
-# Import the Pydantic schema for order creation validation
-from schemas.order import OrderCreate
+# Import the Pydantic schemas for order creation and bulk results
+from schemas.order import OrderCreate, OrderBulkResult
+# Import SQLAlchemyError to isolate failing bulk chunks
+from sqlalchemy.exc import SQLAlchemyError
+# Import List for type hinting
+from typing import List
+# Import datetime for order timestamps and export date-range filters
+from datetime import datetime, timezone
+# Import the analytics service to maintain the sales rollup
+from services import analytics as analytics_service
+# Import the inventory service to reserve stock at checkout
+from services import inventory as inventory_service
 # Import UUID for handling unique identifiers
 from uuid import UUID
+# Import uuid for client-side ID generation
+import uuid
 
-async def create_order(db: AsyncSession, order: OrderCreate, user_id: UUID):
+# Maximum number of product IDs per price lookup query
+PRICE_LOOKUP_CHUNK_SIZE = 10000
+
+class ProductNotFoundError(Exception):
+    """
+    Raised when an order references products that do not exist.
+
+    Attributes:
+        missing_ids (list[UUID]): Every unknown product ID found in the payload.
+    """
+    def __init__(self, missing_ids):
+        self.missing_ids = missing_ids
+        super().__init__(f"Products not found: {', '.join(str(i) for i in missing_ids)}")
+
+def merge_order_items(items):
+    """
+    Collapses duplicate product lines into a single line per product.
+
+    Args:
+        items (List[OrderItemCreate]): The raw cart lines from the request.
+
+    Returns:
+        dict[UUID, int]: Total quantity per product ID, in first-seen order.
+    """
+    quantities = {}
+    for item in items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    return quantities
+
+def order_totals(quantities, prices):
+    """
+    Computes the denormalized value and size of an order.
+
+    Args:
+        quantities (dict[UUID, int]): Merged quantity per product ID.
+        prices (dict[UUID, float]): Price per product ID.
+
+    Returns:
+        tuple[float, int]: (total_amount rounded to cents, item_count in units).
+    """
+    total = sum(quantity * prices[product_id] for product_id, quantity in quantities.items())
+    return round(total, 2), sum(quantities.values())
+
+async def get_checkout_products(db: AsyncSession, product_ids, *columns):
+    """
+    Fetches the given columns of every given product with a single IN query.
+
+    Args:
+        db (AsyncSession): The database session.
+        product_ids (Iterable[UUID]): The products to look up.
+        *columns: The Product columns to fetch besides the ID.
+
+    Returns:
+        dict[UUID, Row]: Row per product ID. Unknown IDs are absent.
+    """
+    product_ids = list(product_ids)
+    products = {}
+    # Very large batches are split so the IN list stays under the driver's bind parameter limit
+    for start in range(0, len(product_ids), PRICE_LOOKUP_CHUNK_SIZE):
+        result = await db.execute(
+            select(Product.id, *columns)
+            .where(Product.id.in_(product_ids[start:start + PRICE_LOOKUP_CHUNK_SIZE]))
+        )
+        products.update({row.id: row for row in result})
+    return products
+
+async def create_order(db: AsyncSession, order: OrderCreate, user_id: UUID, order_id: UUID = None):
     """
     Creates a new order in the database.
 
-    This function performs the following steps:
-    1. Creates a new Order record associated with the user.
-    2. Sets the initial status of the order to 'completed' (assuming immediate payment/fulfillment for this demo).
-    3. Iterates through the items provided in the order payload.
-    4. Fetches the current price of each product from the database to ensure data integrity (snapshotting the price).
-    5. Creates OrderItem records linking the order to the products.
-    6. Commits the transaction to save changes.
-    7. Refreshes and returns the created order with its items loaded.
+    The number of round trips is constant regardless of cart size:
+    1. Duplicate product lines are merged into one line per product.
+    2. All products are priced with a single IN lookup (snapshotting the price and stock mode).
+    3. Unknown product IDs are reported together, before anything is written.
+    4. The Order row, with its total and item count, is inserted, followed by all OrderItems in one bulk INSERT.
+    5. Stock is reserved for every line with one conditional UPDATE (see services/inventory.py).
+    6. The daily sales rollup is incremented with one upsert (sharded for products in sharded stock mode).
+    7. The transaction is committed and the order is re-read with its items.
 
     Args:
         db (AsyncSession): The database session for executing queries.
         order (OrderCreate): The Pydantic model containing order details (list of items).
         user_id (UUID): The unique identifier of the user placing the order.
+        order_id (UUID, optional): The ID to write the order under (e.g. the one bound to its
+            Idempotency-Key). A new one is generated by default.
 
     Returns:
         Order: The newly created order object, including its items.
+
+    Raises:
+        ProductNotFoundError: If any of the requested products does not exist.
+        OutOfStockError: If any line asks for more units than are in stock. Nothing is written.
     """
-    # Create a new Order instance. 
+    quantities = merge_order_items(order.items)
+
+    # Price the whole cart in one query
+    products = await get_checkout_products(db, quantities.keys(), Product.price, Product.stock, Product.stock_sharded)
+    prices = {product_id: row.price for product_id, row in products.items()}
+    missing_ids = [product_id for product_id in quantities if product_id not in prices]
+    if missing_ids:
+        raise ProductNotFoundError(missing_ids)
+
+    # Create a new Order instance.
     # We set status to "completed" immediately as per requirements to avoid "pending" state in this demo.
-    db_order = Order(user_id=user_id, status="completed")
-    
-    # Add the new order to the session. 
-    # This does not yet commit it to the database, but prepares it for insertion.
+    # The ID is generated client-side so items can reference it without waiting for a flush.
+    # created_at is set here so the sales rollup is booked on exactly the order's UTC day.
+    created_at = datetime.now(timezone.utc)
+    total_amount, item_count = order_totals(quantities, prices)
+    db_order = Order(
+        id=order_id or uuid.uuid4(),
+        user_id=user_id,
+        status="completed",
+        created_at=created_at,
+        total_amount=total_amount,
+        item_count=item_count,
+    )
     db.add(db_order)
-    
-    # Flush the session to generate the ID for db_order without committing the transaction.
-    # This allows us to use db_order.id when creating OrderItems.
     await db.flush()
 
-    # Iterate over each item in the order request
-    for item in order.items:
-        # Query the database to find the product by its ID
-        result = await db.execute(select(Product).where(Product.id == item.product_id))
-        product = result.scalar_one_or_none()
-        
-        # If the product exists, create an OrderItem
-        if product:
-            db_item = OrderItem(
-                order_id=db_order.id,       # Link to the newly created order
-                product_id=item.product_id, # Link to the product
-                quantity=item.quantity,     # Set the quantity ordered
-                price_at_purchase=product.price # Snapshot the price at the time of purchase
-            )
-            # Add the order item to the session
-            db.add(db_item)
-    
+    # Write every line in a single multi-row INSERT
+    if quantities:
+        await db.execute(
+            insert(OrderItem),
+            [
+                {
+                    "order_id": db_order.id,
+                    "product_id": product_id,
+                    "quantity": quantity,
+                    "price_at_purchase": prices[product_id],
+                }
+                for product_id, quantity in quantities.items()
+            ],
+        )
+
+    # Reserve stock as late as possible: the decremented product rows stay locked until commit
+    try:
+        await inventory_service.reserve_stock(db, quantities, products)
+    except inventory_service.OutOfStockError:
+        await db.rollback()
+        raise
+
+    # Update the daily sales rollup in the same transaction (on a random shard row for hot products)
+    await analytics_service.record_sales(db, analytics_service.aggregate_sales(
+        created_at.date(),
+        [{product_id: (quantity, prices[product_id]) for product_id, quantity in quantities.items()}],
+        sharded={product_id for product_id, row in products.items() if row.stock_sharded},
+    ))
+
     # Commit the transaction to save the Order and all OrderItems to the database permanently.
     await db.commit()
-    
+
     # Retrieve the newly created order from the database.
-    # We use selectinload(Order.items) to eagerly load the related items, 
+    # We use selectinload(Order.items) to eagerly load the related items,
     # ensuring they are available in the response.
     result = await db.execute(
         select(Order)
         .options(selectinload(Order.items))
         .where(Order.id == db_order.id)
+        .execution_options(populate_existing=True)
     )
-    
+
     # Return the single scalar result (the Order object)
     return result.scalar_one()
 
-async def get_orders(db: AsyncSession, skip: int = 0, limit: int = 100):
+async def insert_orders(db: AsyncSession, orders, status: str = "completed"):
+    """
+    Writes orders and their items, and books completed ones in the daily sales rollup.
+
+    Uses one multi-row INSERT for the orders, one for the items and one rollup upsert
+    per UTC day, whatever the number of orders. Nothing is committed.
+
+    Args:
+        db (AsyncSession): The database session.
+        orders (list[tuple]): Per order, (order ID, user ID, created_at, merged quantity
+            per product ID, price per product ID).
+        status (str): The status to write; orders that were not placed (e.g. 'rejected')
+            are kept for their status but not counted as sales.
+    """
+    if not orders:
+        return
+    order_rows = []
+    item_rows = []
+    days = {}
+    for order_id, user_id, created_at, quantities, prices in orders:
+        total_amount, item_count = order_totals(quantities, prices)
+        order_rows.append({
+            "id": order_id,
+            "user_id": user_id,
+            "status": status,
+            "created_at": created_at,
+            "total_amount": total_amount,
+            "item_count": item_count,
+        })
+        item_rows.extend(
+            {
+                "order_id": order_id,
+                "product_id": product_id,
+                "quantity": quantity,
+                "price_at_purchase": prices[product_id],
+            }
+            for product_id, quantity in quantities.items()
+        )
+        days.setdefault(created_at.date(), []).append(
+            {product_id: (quantity, prices[product_id]) for product_id, quantity in quantities.items()}
+        )
+    await db.execute(insert(Order), order_rows)
+    if item_rows:
+        await db.execute(insert(OrderItem), item_rows)
+    if status != "completed":
+        return
+    for day in sorted(days):
+        await analytics_service.record_sales(db, analytics_service.aggregate_sales(day, days[day]))
+
+async def _reserve_chunk(db: AsyncSession, chunk, products) -> dict:
+    # Reserves stock for a bulk chunk; returns the orders that did not fit as index -> out of stock product IDs
+    totals = {}
+    for _, quantities in chunk:
+        for product_id, quantity in quantities.items():
+            totals[product_id] = totals.get(product_id, 0) + quantity
+    out_of_stock = {}
+    try:
+        async with db.begin_nested():
+            await inventory_service.reserve_stock(db, totals, products)
+    except inventory_service.OutOfStockError:
+        # Serve the orders that still fit, in submission order
+        for result, quantities in chunk:
+            try:
+                async with db.begin_nested():
+                    await inventory_service.reserve_stock(db, quantities, products)
+            except inventory_service.OutOfStockError as exc:
+                out_of_stock[result.index] = exc.product_ids
+    return out_of_stock
+
+async def create_orders_bulk(db: AsyncSession, orders: List[OrderCreate], user_id: UUID, chunk_size: int = 500):
+    """
+    Creates many orders for one user with a constant number of queries per chunk.
+
+    This function performs the following steps:
+    1. Merges duplicate lines within each order.
+    2. Prices every product referenced by the whole batch in one lookup (with its stock mode).
+    3. Rejects orders that reference unknown products, without affecting the others.
+    4. Writes the valid orders in chunks of `chunk_size`, each chunk in its own transaction:
+       stock for the whole chunk is reserved at once, then written with one multi-row INSERT
+       for orders, one for items and one rollup upsert.
+
+    When the chunk does not fit in the remaining stock, each of its orders is reserved in
+    its own savepoint, in submission order; those that do not fit are reported as 'rejected'
+    with their out of stock products and are not written. A chunk that fails to commit is
+    rolled back and its orders are reported as 'failed'; chunks that were already committed
+    are kept.
+
+    Args:
+        db (AsyncSession): The database session.
+        orders (List[OrderCreate]): The orders to create.
+        user_id (UUID): The unique identifier of the user placing the orders.
+        chunk_size (int): The number of orders written per transaction.
+
+    Returns:
+        List[OrderBulkResult]: One result per submitted order, in submission order.
+    """
+    merged = [merge_order_items(order.items) for order in orders]
+    products = await get_checkout_products(
+        db,
+        {pid for quantities in merged for pid in quantities},
+        Product.price,
+        Product.stock,
+        Product.stock_sharded,
+    )
+    prices = {product_id: row.price for product_id, row in products.items()}
+
+    results = []
+    pending = []
+    for index, quantities in enumerate(merged):
+        missing_ids = [product_id for product_id in quantities if product_id not in prices]
+        if missing_ids:
+            results.append(OrderBulkResult(
+                index=index,
+                status="rejected",
+                error="Products not found",
+                missing_product_ids=missing_ids,
+            ))
+            continue
+        result = OrderBulkResult(index=index, status="created", order_id=uuid.uuid4())
+        results.append(result)
+        pending.append((result, quantities))
+
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        created_at = datetime.now(timezone.utc)
+        try:
+            out_of_stock = await _reserve_chunk(db, chunk, products)
+            await insert_orders(db, [
+                (result.order_id, user_id, created_at, quantities, prices)
+                for result, quantities in chunk
+                if result.index not in out_of_stock
+            ])
+            await db.commit()
+        except SQLAlchemyError:
+            await db.rollback()
+            for result, _ in chunk:
+                result.status = "failed"
+                result.order_id = None
+                result.error = "Database error, the chunk containing this order was rolled back"
+            continue
+        for result, _ in chunk:
+            if result.index in out_of_stock:
+                result.status = "rejected"
+                result.order_id = None
+                result.error = "Insufficient stock"
+                result.out_of_stock_product_ids = out_of_stock[result.index]
+
+    return results
+
+async def get_orders(db: AsyncSession, skip: int = 0, limit: int = 100, after: tuple = None):
     """
     Retrieves a list of orders from the database with pagination.
 
+    Orders are sorted by (created_at, id). When `after` is given, the query seeks past
+    that key using the ix_orders_created_at_id index instead of skipping rows, so every
+    page costs the same regardless of its depth. Only completed orders are listed: rejected
+    and failed checkouts are kept for the order status endpoint but were never placed.
+
     Args:
         db (AsyncSession): The database session.
         skip (int): The number of records to skip (for pagination). Default is 0.
         limit (int): The maximum number of records to return. Default is 100.
+        after (tuple): Optional (created_at, id) of the last order of the previous page.
 
     Returns:
         List[Order]: A list of Order objects, with their items eagerly loaded.
     """
-    # Execute a select query on the Order table
-    result = await db.execute(
+    # Select orders in a stable, index-backed order
+    query = (
         select(Order)
         .options(selectinload(Order.items)) # Eagerly load the 'items' relationship
-        .offset(skip)   # Apply offset for pagination
-        .limit(limit)   # Apply limit for pagination
+        .where(Order.status == "completed")  # Skip checkouts that were not placed
+        .order_by(Order.created_at, Order.id)
     )
+    if after is not None:
+        # Keyset pagination: continue right after the previous page's last row
+        query = query.where(tuple_(Order.created_at, Order.id) > tuple_(*after))
+    else:
+        query = query.offset(skip)   # Apply offset for pagination
+    # Execute the query, applying the page size limit
+    result = await db.execute(query.limit(limit))
     # Return all scalar results as a list
     return result.scalars().all()
 
-async def get_user_orders(db: AsyncSession, user_id: UUID):
+async def get_order_rows(db: AsyncSession, skip: int = 0, limit: int = 100, after: tuple = None):
     """
-    Retrieves all orders belonging to a specific user.
+    Retrieves the same page as get_orders as plain dicts shaped like schemas.order.Order.
+
+    Only the response columns are selected and no ORM entities are built, so rows can be
+    serialized directly without Pydantic validation. Items are fetched with one IN query.
+
+    Args:
+        db (AsyncSession): The database session.
+        skip (int): The number of records to skip (for pagination). Default is 0.
+        limit (int): The maximum number of records to return. Default is 100.
+        after (tuple): Optional (created_at, id) of the last order of the previous page.
+
+    Returns:
+        List[dict]: Orders with their items.
+    """
+    query = (
+        select(Order.id, Order.user_id, Order.status, Order.created_at, Order.total_amount, Order.item_count)
+        .where(Order.status == "completed")
+        .order_by(Order.created_at, Order.id)
+    )
+    if after is not None:
+        query = query.where(tuple_(Order.created_at, Order.id) > tuple_(*after))
+    else:
+        query = query.offset(skip)
+    result = await db.execute(query.limit(limit))
+    orders = [dict(row, items=[]) for row in result.mappings()]
+    if not orders:
+        return orders
+
+    # Attach items in schema field order
+    by_id = {order["id"]: order for order in orders}
+    result = await db.execute(
+        select(OrderItem.product_id, OrderItem.quantity, OrderItem.id, OrderItem.order_id, OrderItem.price_at_purchase)
+        .where(OrderItem.order_id.in_(by_id.keys()))
+    )
+    for item in result.mappings():
+        by_id[item["order_id"]]["items"].append(dict(item))
+    return orders
+
+async def get_user_orders(db: AsyncSession, user_id: UUID, limit: int = 50, after: tuple = None, include_items: bool = True):
+    """
+    Retrieves one page of a user's orders, newest first.
+
+    The query walks the ix_orders_user_id_created_at index, so every page costs the same
+    no matter how many orders the user has placed. Rejected and failed checkouts are left out.
 
     Args:
         db (AsyncSession): The database session.
         user_id (UUID): The unique identifier of the user.
+        limit (int): The maximum number of orders to return. Default is 50.
+        after (tuple): Optional (created_at, id) of the last order of the previous page.
+        include_items (bool): Eagerly load items. When False, `items` is left empty and
+            can be fetched per order with get_order_items.
 
     Returns:
         List[Order]: A list of Order objects for the specified user.
     """
-    # Execute a select query filtering by user_id
-    result = await db.execute(
+    # Select the user's orders, newest first
+    query = (
         select(Order)
-        .options(selectinload(Order.items)) # Eagerly load items
         .where(Order.user_id == user_id)    # Filter by the user's ID
+        .where(Order.status == "completed") # Skip checkouts that were not placed
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(limit)
     )
-    # Return all matching orders
+    if after is not None:
+        # Keyset pagination: continue right after the previous page's last (oldest) row
+        query = query.where(tuple_(Order.created_at, Order.id) < tuple_(*after))
+    if include_items:
+        query = query.options(selectinload(Order.items)) # Eagerly load items
+    else:
+        query = query.options(noload(Order.items))        # Headers only
+    result = await db.execute(query)
+    # Return the matching orders
     return result.scalars().all()
+
+async def get_order_items(db: AsyncSession, order_id: UUID):
+    """
+    Retrieves the items of a single order.
+
+    Args:
+        db (AsyncSession): The database session.
+        order_id (UUID): The unique identifier of the order.
+
+    Returns:
+        List[OrderItem]: The items of the order (empty if the order does not exist).
+    """
+    # Uses ix_order_items_order_id
+    result = await db.execute(select(OrderItem).where(OrderItem.order_id == order_id))
+    return result.scalars().all()
+
+async def get_user_order(db: AsyncSession, order_id: UUID, user_id: UUID):
+    """
+    Retrieves one of a user's orders with its items.
+
+    Returns:
+        Order: The order, or None if the user has no such order.
+    """
+    result = await db.execute(
+        select(Order)
+        .options(selectinload(Order.items))
+        .where(Order.id == order_id, Order.user_id == user_id)
+    )
+    return result.scalar_one_or_none()
+
+async def get_order_status(db: AsyncSession, order_id: UUID, user_id: UUID):
+    """
+    Retrieves the status of one of a user's orders.
+
+    Args:
+        db (AsyncSession): The database session.
+        order_id (UUID): The unique identifier of the order.
+        user_id (UUID): The user the order must belong to.
+
+    Returns:
+        str: The order status, or None if the user has no such order.
+    """
+    result = await db.execute(select(Order.status).where(Order.id == order_id, Order.user_id == user_id))
+    return result.scalar_one_or_none()
+
+async def stream_orders_for_export(db: AsyncSession, start: datetime = None, end: datetime = None, batch_size: int = 1000):
+    """
+    Streams orders with their items over a server-side cursor.
+
+    Rows are fetched `batch_size` at a time and grouped into one dict per order as they
+    arrive, so memory use does not depend on how many orders are exported. Only completed
+    orders are exported.
+
+    Args:
+        db (AsyncSession): The database session. It must stay open while the generator is consumed.
+        start (datetime): Optional inclusive lower bound on created_at.
+        end (datetime): Optional exclusive upper bound on created_at.
+        batch_size (int): The number of rows fetched per round trip.
+
+    Yields:
+        dict: An order (id, user_id, status, created_at, total_amount, item_count) with its list of items.
+    """
+    # Flat join ordered by order so each order's items arrive together
+    query = (
+        select(
+            Order.id,
+            Order.user_id,
+            Order.status,
+            Order.created_at,
+            Order.total_amount,
+            Order.item_count,
+            OrderItem.id.label("item_id"),
+            OrderItem.product_id,
+            OrderItem.quantity,
+            OrderItem.price_at_purchase,
+        )
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .where(Order.status == "completed")
+        .order_by(Order.created_at, Order.id, OrderItem.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if start is not None:
+        query = query.where(Order.created_at >= start)
+    if end is not None:
+        query = query.where(Order.created_at < end)
+
+    current = None
+    result = await db.stream(query)
+    async for row in result:
+        if current is None or current["id"] != row.id:
+            if current is not None:
+                yield current
+            current = {
+                "id": row.id,
+                "user_id": row.user_id,
+                "status": row.status,
+                "created_at": row.created_at,
+                "total_amount": row.total_amount,
+                "item_count": row.item_count,
+                "items": [],
+            }
+        if row.item_id is not None:
+            current["items"].append({
+                "id": row.item_id,
+                "product_id": row.product_id,
+                "quantity": row.quantity,
+                "price_at_purchase": row.price_at_purchase,
+            })
+    if current is not None:
+        yield current
@@ -0,0 +1,304 @@
+"""
+Order Writer
+
+Asynchronous checkout with group commit. In CHECKOUT_MODE=async, POST /orders/
+validates and prices the cart, queues it and answers 202 Accepted with the order
+ID straight away. One writer task per worker drains the queue and commits up to
+ORDER_BATCH_MAX_SIZE orders per transaction, waiting at most
+ORDER_BATCH_MAX_DELAY_SECONDS for a batch to fill. Under load many orders share
+one commit (one WAL flush and one round trip), and a checkout holds a pooled
+connection only for its validation query.
+
+Stock for the whole batch is reserved with one conditional UPDATE. If a product
+runs out, the batch falls back to reserving order by order, each in a savepoint,
+in the order the checkouts arrived, and the orders that cannot be served are
+rejected. A batch that fails on a database error (including a deadlock in that
+fallback) is retried a few times before its orders are marked failed.
+
+Rejected and failed orders are written too, with status 'rejected' or 'failed'
+(and their items, but no stock reservation and no sales), so that every worker
+can report how an order ended, not only the one that accepted it.
+
+The queue is bounded; when it is full checkout answers 503 so clients back off.
+On shutdown the writer stops accepting orders and commits everything it already
+accepted before the worker exits.
+
+A queued order is known only to the worker that accepted it until its batch is
+written; with several workers a poll served by another worker returns 404 until
+then.
+"""
+
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from core.cache import TTLCache
+from core.config import settings
+from core.database import AsyncSessionLocal
+from models.order import Order
+from models.product import Product
+from schemas.order import OrderCreate
+from services import inventory as inventory_service
+from services import order as order_service
+
+logger = logging.getLogger("uvicorn.error")
+
+# Attempts at committing a batch before its orders are marked failed
+WRITE_ATTEMPTS = 3
+
+# How long this worker remembers the outcome of an order it wrote
+OUTCOME_TTL_SECONDS = 3600
+
+# Reasons reported with the statuses of orders that were not placed
+OUTCOME_DETAILS = {
+    "rejected": {"message": "Insufficient stock"},
+    "failed": {"message": "Database error, the order was not placed"},
+}
+
+class CheckoutUnavailable(Exception):
+    """
+    Raised when an order cannot be queued: the queue is full or the writer is not running.
+    """
+
+@dataclass
+class PendingOrder:
+    id: uuid.UUID
+    user_id: uuid.UUID
+    created_at: datetime
+    quantities: dict
+    products: dict
+
+class OrderWriter:
+    """
+    Queues validated orders and commits them in batches from a background task.
+
+    Attributes:
+        max_batch_size (int): The maximum number of orders per transaction.
+        max_delay (float): Seconds to wait for a batch to fill after its first order.
+        max_queue_size (int): Orders that may wait to be written before checkout is refused.
+    """
+
+    def __init__(self, max_batch_size: int, max_delay: float, max_queue_size: int):
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_queue_size = max_queue_size
+        self.queue = None
+        self.task = None
+        # Order ID -> user ID of every accepted, not yet written order
+        self.pending = {}
+        # Order ID -> (user ID, status, detail) of written orders
+        self.outcomes = TTLCache(maxsize=max(max_queue_size, 1000), ttl=OUTCOME_TTL_SECONDS)
+
+    def start(self):
+        """
+        Starts the writer task on the running event loop.
+        """
+        self.queue = asyncio.Queue(self.max_queue_size)
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stops accepting orders and waits until every accepted order has been written.
+        """
+        if self.task is None:
+            return
+        task, self.task = self.task, None
+        # The sentinel is queued behind every accepted order, so they are all written first
+        await self.queue.put(None)
+        await task
+
+    async def submit(self, db: AsyncSession, order: OrderCreate, user_id, order_id=None) -> uuid.UUID:
+        """
+        Validates and prices an order and queues it for writing.
+
+        Args:
+            db (AsyncSession): The request's database session, used for the product lookup.
+            order (OrderCreate): The order payload.
+            user_id (UUID): The user placing the order.
+            order_id (UUID, optional): The ID to write the order under; generated by default.
+
+        Returns:
+            UUID: The ID the order will be written under.
+
+        Raises:
+            ProductNotFoundError: If any of the requested products does not exist.
+            OutOfStockError: If a product is already known to have too little stock.
+            CheckoutUnavailable: If the queue is full or the writer is not running.
+        """
+        if self.task is None:
+            raise CheckoutUnavailable("Checkout is not accepting orders")
+        quantities = order_service.merge_order_items(order.items)
+        products = await order_service.get_checkout_products(
+            db, quantities.keys(), Product.price, Product.stock, Product.stock_sharded
+        )
+        missing_ids = [product_id for product_id in quantities if product_id not in products]
+        if missing_ids:
+            raise order_service.ProductNotFoundError(missing_ids)
+        # Fail fast on stock that was already too low; the writer makes the binding reservation
+        short = sorted(
+            product_id for product_id, quantity in quantities.items()
+            if products[product_id].stock is not None and products[product_id].stock < quantity
+        )
+        if short:
+            raise inventory_service.OutOfStockError(short)
+
+        pending = PendingOrder(order_id or uuid.uuid4(), user_id, datetime.now(timezone.utc), quantities, products)
+        try:
+            self.queue.put_nowait(pending)
+        except asyncio.QueueFull:
+            raise CheckoutUnavailable("Checkout queue is full")
+        self.pending[pending.id] = user_id
+        return pending.id
+
+    def status(self, order_id, user_id) -> Optional[tuple]:
+        """
+        Returns what this worker knows about an order of the given user.
+
+        Returns:
+            tuple[str, Optional[dict]]: (status, detail); status is "pending", "completed",
+            "rejected" or "failed". None if this worker does not know the order.
+        """
+        if self.pending.get(order_id) == user_id:
+            return "pending", None
+        outcome = self.outcomes.get(order_id)
+        if outcome is not None and outcome[0] == user_id:
+            return outcome[1], outcome[2]
+        return None
+
+    async def _next_batch(self):
+        # Returns (batch, stop): up to max_batch_size orders, collected for at most max_delay
+        first = await self.queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            try:
+                pending = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if pending is None:
+                return batch, True
+            batch.append(pending)
+        return batch, False
+
+    async def _run(self):
+        stop = False
+        while not stop:
+            batch, stop = await self._next_batch()
+            if batch:
+                await self._commit(batch)
+
+    async def _commit(self, batch):
+        rejected = None
+        for attempt in range(WRITE_ATTEMPTS):
+            try:
+                async with AsyncSessionLocal() as db:
+                    rejected = await self._write(db, batch, retry=attempt > 0)
+                break
+            except (DBAPIError, OSError, asyncio.TimeoutError) as exc:
+                logger.warning(
+                    f"Writing {len(batch)} orders failed ({exc.__class__.__name__}), "
+                    f"attempt {attempt + 1} of {WRITE_ATTEMPTS}"
+                )
+                await asyncio.sleep(0.1 * 2 ** attempt)
+            except Exception:
+                logger.exception(f"Writing {len(batch)} orders failed")
+                break
+        if rejected is None:
+            await self._write_failed(batch)
+
+        for pending in batch:
+            self.pending.pop(pending.id, None)
+            if rejected is None:
+                outcome = ("failed", OUTCOME_DETAILS["failed"])
+            elif pending.id in rejected:
+                outcome = ("rejected", {
+                    **OUTCOME_DETAILS["rejected"],
+                    "out_of_stock_product_ids": [str(product_id) for product_id in rejected[pending.id]],
+                })
+            else:
+                outcome = ("completed", None)
+            self.outcomes.set(pending.id, (pending.user_id, *outcome))
+
+    async def _write_failed(self, batch):
+        # Records the batch as failed so other workers can answer; best effort, the database may be down
+        try:
+            async with AsyncSessionLocal() as db:
+                written = set((await db.execute(
+                    select(Order.id).where(Order.id.in_([pending.id for pending in batch]))
+                )).scalars())
+                await order_service.insert_orders(db, [
+                    _order_row(pending) for pending in batch if pending.id not in written
+                ], status="failed")
+                await db.commit()
+        except Exception as exc:
+            logger.warning(f"Recording {len(batch)} failed orders failed ({exc.__class__.__name__})")
+
+    async def _write(self, db: AsyncSession, batch, retry: bool) -> dict:
+        # Returns the rejected orders as order ID -> out of stock product IDs
+        if retry:
+            # The previous attempt may have committed before its connection failed
+            written = dict((await db.execute(
+                select(Order.id, Order.status).where(Order.id.in_([pending.id for pending in batch]))
+            )).all())
+            if written:
+                return {order_id: [] for order_id, status in written.items() if status == "rejected"}
+
+        totals = {}
+        products = {}
+        for pending in batch:
+            products.update(pending.products)
+            for product_id, quantity in pending.quantities.items():
+                totals[product_id] = totals.get(product_id, 0) + quantity
+
+        rejected = {}
+        try:
+            async with db.begin_nested():
+                await inventory_service.reserve_stock(db, totals, products)
+        except inventory_service.OutOfStockError:
+            # Serve the orders that still fit, first come first served
+            for pending in batch:
+                try:
+                    async with db.begin_nested():
+                        await inventory_service.reserve_stock(db, pending.quantities, pending.products)
+                except inventory_service.OutOfStockError as exc:
+                    rejected[pending.id] = exc.product_ids
+
+        await order_service.insert_orders(db, [
+            _order_row(pending) for pending in batch if pending.id not in rejected
+        ])
+        await order_service.insert_orders(db, [
+            _order_row(pending) for pending in batch if pending.id in rejected
+        ], status="rejected")
+        await db.commit()
+        return rejected
+
+def _order_row(pending: PendingOrder) -> tuple:
+    # The order as order_service.insert_orders() takes it
+    return (
+        pending.id,
+        pending.user_id,
+        pending.created_at,
+        pending.quantities,
+        {product_id: row.price for product_id, row in pending.products.items()},
+    )
+
+# The writer shared by the checkout route and the application lifespan
+order_writer = OrderWriter(
+    max_batch_size=settings.ORDER_BATCH_MAX_SIZE,
+    max_delay=settings.ORDER_BATCH_MAX_DELAY_SECONDS,
+    max_queue_size=settings.ORDER_QUEUE_MAX_SIZE,
+)
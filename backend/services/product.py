@@ -1,30 +1,79 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from models.product import Product
+from sqlalchemy import tuple_, func
+from models.product import Product, product_search_vector
 from schemas.product import ProductCreate
+from services.catalog import bump_catalog_version, catalog_version_committed
+from services import catalog_events as events_service
 from uuid import UUID
 
-async def get_products(db: AsyncSession, skip: int = 0, limit: int = 100):
-    result = await db.execute(select(Product).offset(skip).limit(limit))
+# Columns of the schemas.product.Product response, in schema order
+PRODUCT_COLUMNS = (Product.name, Product.description, Product.price, Product.image_url, Product.id)
+
+def _products_page(query, skip: int, limit: int, after: tuple):
+    # Ordered by (name, id) so pages are stable; `after` seeks past that key on ix_products_name_id
+    query = query.order_by(Product.name, Product.id)
+    if after is not None:
+        query = query.where(tuple_(Product.name, Product.id) > tuple_(*after))
+    else:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+async def get_products(db: AsyncSession, skip: int = 0, limit: int = 100, after: tuple = None):
+    result = await db.execute(_products_page(select(Product), skip, limit, after))
     return result.scalars().all()
 
+async def get_product_rows(db: AsyncSession, skip: int = 0, limit: int = 100, after: tuple = None):
+    # Same page as get_products, as plain dicts: no ORM identity map or Pydantic validation
+    result = await db.execute(_products_page(select(*PRODUCT_COLUMNS), skip, limit, after))
+    return [dict(row) for row in result.mappings()]
+
+async def get_product_rows_by_ids(db: AsyncSession, product_ids):
+    # One IN query on the primary key index, as plain dicts keyed by ID; unknown IDs are absent
+    result = await db.execute(select(*PRODUCT_COLUMNS).where(Product.id.in_(product_ids)))
+    return {row["id"]: dict(row) for row in result.mappings()}
+
 async def get_product(db: AsyncSession, product_id: UUID):
     result = await db.execute(select(Product).where(Product.id == product_id))
     return result.scalar_one_or_none()
 
+async def search_products(db: AsyncSession, q: str, skip: int = 0, limit: int = 20):
+    # Matches through the ix_products_search_vector GIN index, best ranked first
+    vector = product_search_vector()
+    ts_query = func.websearch_to_tsquery("english", q)
+    result = await db.execute(
+        select(Product)
+        .where(vector.op("@@")(ts_query))
+        .order_by(func.ts_rank(vector, ts_query).desc(), Product.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
 async def create_product(db: AsyncSession, product: ProductCreate):
     db_product = Product(**product.model_dump())
     db.add(db_product)
+    version = await bump_catalog_version(db)
+    event = events_service.product_event("product.created", db_product, version[0])
+    await events_service.notify(db, event)
     await db.commit()
+    catalog_version_committed(*version)
+    events_service.catalog_events.publish(event)
     await db.refresh(db_product)
     return db_product
 
 async def update_product(db: AsyncSession, product_id: UUID, product: ProductCreate):
     db_product = await get_product(db, product_id)
     if db_product:
+        before = {field: getattr(db_product, field) for field in events_service.PRODUCT_FIELDS}
         for key, value in product.model_dump().items():
             setattr(db_product, key, value)
+        version = await bump_catalog_version(db)
+        event = events_service.product_event("product.updated", db_product, version[0], before)
+        await events_service.notify(db, event)
         await db.commit()
+        catalog_version_committed(*version)
+        events_service.catalog_events.publish(event)
         await db.refresh(db_product)
     return db_product
 
@@ -32,5 +81,10 @@ async def delete_product(db: AsyncSession, product_id: UUID):
     db_product = await get_product(db, product_id)
     if db_product:
         await db.delete(db_product)
+        version = await bump_catalog_version(db)
+        event = events_service.product_event("product.deleted", db_product, version[0])
+        await events_service.notify(db, event)
         await db.commit()
+        catalog_version_committed(*version)
+        events_service.catalog_events.publish(event)
     return db_product
@@ -1,26 +1,67 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import tuple_
 from models.user import User
 from schemas.user import UserCreate
-from utils.security import get_password_hash
+from utils.security import get_password_hash_async
+from core.cache import principal_cache
+from core.notifications import notification_listener, notify
 from uuid import UUID
 
+# NOTIFY channel on which workers drop a user's cached principal (payload: the email)
+PRINCIPAL_CHANNEL = "principal_invalidations"
+
 async def get_user_by_email(db: AsyncSession, email: str):
     result = await db.execute(select(User).where(User.email == email))
     return result.scalar_one_or_none()
 
 async def create_user(db: AsyncSession, user: UserCreate):
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     db_user = User(email=user.email, hashed_password=hashed_password, is_admin=user.is_admin)
     db.add(db_user)
     await db.commit()
     await db.refresh(db_user)
     return db_user
 
-async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100):
-    result = await db.execute(select(User).offset(skip).limit(limit))
+# Columns of the schemas.user.User response, in schema order (never the password hash)
+USER_COLUMNS = (User.email, User.id, User.is_active, User.is_admin)
+
+def _users_page(query, skip: int, limit: int, after: tuple):
+    # Ordered by (email, id) so pages are stable; `after` seeks past that key on ix_users_email_id
+    query = query.order_by(User.email, User.id)
+    if after is not None:
+        query = query.where(tuple_(User.email, User.id) > tuple_(*after))
+    else:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100, after: tuple = None):
+    result = await db.execute(_users_page(select(User), skip, limit, after))
     return result.scalars().all()
 
+async def get_user_rows(db: AsyncSession, skip: int = 0, limit: int = 100, after: tuple = None):
+    # Same page as get_users, as plain dicts: no ORM identity map or Pydantic validation
+    result = await db.execute(_users_page(select(*USER_COLUMNS), skip, limit, after))
+    return [dict(row) for row in result.mappings()]
+
 async def get_user(db: AsyncSession, user_id: UUID):
     result = await db.execute(select(User).where(User.id == user_id))
     return result.scalar_one_or_none()
+
+async def update_user_flags(db: AsyncSession, user_id: UUID, is_active: bool = None, is_admin: bool = None):
+    db_user = await get_user(db, user_id)
+    if db_user:
+        if is_active is not None:
+            db_user.is_active = is_active
+        if is_admin is not None:
+            db_user.is_admin = is_admin
+        # Every worker drops the cached principal once the change commits
+        await notify(db, PRINCIPAL_CHANNEL, db_user.email)
+        await db.commit()
+        await db.refresh(db_user)
+        # The notification covers this worker too, but may arrive after the user's next request
+        principal_cache.invalidate(db_user.email)
+    return db_user
+
+# Drop principals other workers changed; a lost LISTEN connection may have missed some
+notification_listener.register(PRINCIPAL_CHANNEL, principal_cache.invalidate, principal_cache.clear)
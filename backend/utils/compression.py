@@ -0,0 +1,219 @@
+"""
+Response Compression Utilities
+
+This module negotiates a content coding from the client's Accept-Encoding header
+and compresses response bodies with it: gzip always, and Brotli (br) or Zstandard
+(zstd) when the `brotli` / `zstandard` packages are installed. Brotli is preferred,
+then zstd, then gzip, unless the client ranks them differently with q-values.
+
+CompressionMiddleware compresses API responses on the fly. Catalog responses are
+compressed once per catalog version instead, at a higher level, and cached next to
+the uncompressed body (see routes/product.py); the middleware leaves responses
+that already carry a Content-Encoding alone.
+"""
+
+import zlib
+from importlib.util import find_spec
+from typing import Optional
+from core.config import settings
+
+# Modules of the optional codings; they are imported on first use (or preloaded by
+# core.startup during the database warm-up), not when the application is imported
+CODEC_MODULES = {"br": "brotli", "zstd": "zstandard"}
+
+# Supported codings, most preferred first; installed packages are found without importing them
+ENCODINGS = tuple(
+    name for name in ("br", "zstd", "gzip")
+    if name not in CODEC_MODULES or find_spec(CODEC_MODULES[name]) is not None
+)
+
+# Levels for responses compressed on every request: fast, most of the gain
+DYNAMIC_LEVELS = {"br": 4, "zstd": 3, "gzip": 6}
+
+# Levels for bodies compressed once and cached: slower, smaller
+CACHED_LEVELS = {"br": 9, "zstd": 12, "gzip": 9}
+
+# Media types worth compressing (images and archives are already compressed)
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# Streams that must reach the client event by event are never buffered by a compressor
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Picks the content coding to use for a client.
+
+    Args:
+        accept_encoding (Optional[str]): The Accept-Encoding request header.
+
+    Returns:
+        str: "br", "zstd" or "gzip"; None if the client accepts none of them.
+    """
+    if not accept_encoding:
+        return None
+    ranked = {}
+    wildcard = None
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name == "*":
+            wildcard = q
+        elif name:
+            ranked[name] = q
+    best = None
+    best_q = 0.0
+    for name in ENCODINGS:
+        q = ranked.get(name, wildcard if wildcard is not None else 0.0)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+class Compressor:
+    """
+    Incremental compressor for one response body.
+    """
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            import brotli
+            self._compressor = brotli.Compressor(quality=level)
+        elif encoding == "zstd":
+            import zstandard
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            # wbits=31 selects the gzip container
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """
+    Compresses a complete body.
+
+    Args:
+        body (bytes): The uncompressed body.
+        encoding (str): "br", "zstd" or "gzip".
+        level (int, optional): Compression level; defaults to DYNAMIC_LEVELS.
+
+    Returns:
+        bytes: The compressed body.
+    """
+    compressor = Compressor(encoding, DYNAMIC_LEVELS[encoding] if level is None else level)
+    return compressor.compress(body) + compressor.finish()
+
+def _is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    if content_type.startswith(UNCOMPRESSED_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+def _add_vary(headers: list) -> list:
+    for i, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            if b"accept-encoding" not in value.lower():
+                headers[i] = (name, value + b", Accept-Encoding")
+            return headers
+    headers.append((b"vary", b"Accept-Encoding"))
+    return headers
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that compresses compressible responses of at least COMPRESSION_MIN_SIZE bytes.
+
+    Single-message bodies are compressed in one go, with an exact Content-Length. Streamed
+    bodies (e.g. exports) are compressed chunk by chunk and sent without a Content-Length.
+    Strong ETags are weakened on compressed responses, since the bytes differ per coding.
+    """
+
+    def __init__(self, app, min_size: Optional[int] = None):
+        self.app = app
+        self.min_size = settings.COMPRESSION_MIN_SIZE if min_size is None else min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        held = None
+        passthrough = False
+        compressor = None
+
+        async def send_compressed(message):
+            nonlocal held, passthrough, compressor
+            if message["type"] == "http.response.start":
+                headers = {name.lower(): value for name, value in message.get("headers", [])}
+                if (
+                    b"content-encoding" in headers
+                    or message["status"] in (204, 304)
+                    or not _is_compressible(headers.get(b"content-type", b"").decode("latin-1"))
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Hold the headers until the first body chunk shows the response size
+                    held = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if held is not None:
+                start, held = held, None
+                headers = _add_vary([
+                    (name, value) for name, value in start.get("headers", [])
+                    if name.lower() != b"content-length"
+                ])
+                if not more_body and len(body) < self.min_size:
+                    passthrough = True
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send({**start, "headers": headers})
+                    await send(message)
+                    return
+                compressor = Compressor(encoding, DYNAMIC_LEVELS[encoding])
+                headers = [
+                    (name, b"W/" + value if name.lower() == b"etag" and not value.startswith(b"W/") else value)
+                    for name, value in headers
+                ]
+                headers.append((b"content-encoding", encoding.encode()))
+                if not more_body:
+                    body = compressor.compress(body) + compressor.finish()
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send({**start, "headers": headers})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send({**start, "headers": headers})
+
+            chunk = compressor.compress(body)
+            if not more_body:
+                chunk += compressor.finish()
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,70 @@
+"""
+HTTP Caching Utilities
+
+This module builds validators (ETag, Last-Modified) for versioned resources and
+evaluates conditional request headers (If-None-Match, If-Modified-Since).
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request
+
+def make_etag(version: int, key) -> str:
+    """
+    Builds a strong ETag for a resource representation at a given version.
+
+    Args:
+        version (int): The version of the underlying data.
+        key: Anything identifying the representation (path, query parameters...).
+
+    Returns:
+        str: A quoted ETag value.
+    """
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+def format_http_date(value: datetime) -> str:
+    """
+    Formats a datetime as an HTTP-date (RFC 9110), treating naive values as UTC.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime], exists: bool = True) -> bool:
+    """
+    Evaluates the conditional headers of a GET request.
+
+    If-None-Match takes precedence; If-Modified-Since is only used when it is absent.
+
+    Args:
+        request (Request): The incoming request.
+        etag (str): The current ETag of the resource.
+        last_modified (Optional[datetime]): The last modification time of the resource.
+        exists (bool): Whether the resource is known to exist. `If-None-Match: *` only
+            matches an existing resource, so pass False before it has been looked up.
+
+    Returns:
+        bool: True if the client's copy is current and a 304 should be sent.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        # Weak comparison is used for If-None-Match, so a W/ prefix is ignored
+        return (exists and "*" in candidates) or etag in (tag.removeprefix("W/") for tag in candidates)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
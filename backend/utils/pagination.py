@@ -0,0 +1,87 @@
+"""
+Pagination Utilities
+
+This module implements opaque cursors for keyset (seek) pagination.
+A cursor encodes the sort key of the last row of a page, so the next page can be
+fetched with a `WHERE (key) > (cursor)` predicate on an index instead of an OFFSET.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(*values) -> str:
+    """
+    Encodes sort key values into an opaque, URL-safe cursor string.
+
+    Args:
+        *values: The sort key of the last row of a page (UUIDs and datetimes are supported).
+
+    Returns:
+        str: The encoded cursor.
+    """
+    def default(value):
+        if isinstance(value, UUID):
+            return str(value)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+    raw = json.dumps(list(values), default=default, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, types) -> tuple:
+    """
+    Decodes a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The opaque cursor string.
+        types (Sequence[type]): The expected type of each key value (str, UUID or datetime).
+
+    Returns:
+        tuple: The decoded sort key values.
+
+    Raises:
+        ValueError: If the cursor is malformed or does not match the expected key.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Invalid cursor")
+
+    decoded = []
+    for value, type_ in zip(values, types):
+        try:
+            if value is None:
+                decoded.append(None)
+            elif type_ is datetime:
+                decoded.append(datetime.fromisoformat(value))
+            else:
+                decoded.append(type_(value))
+        except (ValueError, TypeError) as exc:
+            raise ValueError("Invalid cursor") from exc
+    return tuple(decoded)
+
+def next_page_cursor(rows, limit: int, key) -> Optional[str]:
+    """
+    Builds the cursor of the page following `rows`.
+
+    Args:
+        rows (Sequence): The rows of the current page, in sort order.
+        limit (int): The requested page size.
+        key (Callable): Returns the sort key tuple of a row.
+
+    Returns:
+        Optional[str]: The next cursor, or None when this was the last page.
+    """
+    if not rows or len(rows) < limit:
+        return None
+    return encode_cursor(*key(rows[-1]))
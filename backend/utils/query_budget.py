@@ -0,0 +1,126 @@
+"""
+Query Budget Utilities
+
+This module provides a context manager that counts the SQL statements issued by
+the code it wraps and enforces a statement budget. It also flags N+1 patterns:
+the same SQL text executed repeatedly with different parameters, which is what a
+lazy-loaded relationship or a per-item query loop looks like on the wire.
+
+Usage:
+    with QueryCounter(engine, max_statements=3) as queries:
+        await client.get("/orders/")
+    queries.report()
+
+Only statements issued from the current task (and tasks it spawns) are counted,
+so concurrent traffic on the same engine does not leak into the count.
+"""
+
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional
+from sqlalchemy import event
+
+# Counters active in the current task context (nested counters all see a statement)
+_active_counters: ContextVar[tuple] = ContextVar("active_query_counters", default=())
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when the wrapped code exceeds its statement budget or repeats a statement too often.
+    """
+
+class QueryCounter:
+    """
+    Context manager that records the SQL statements executed while it is active.
+
+    Attributes:
+        statements (list[tuple[str, object]]): (SQL text, parameters) for every statement executed.
+        duration (float): Seconds spent executing those statements.
+        max_statements (int, optional): Budget enforced on exit.
+        max_repeats (int, optional): How often one SQL text may run with differing parameters
+            before it is reported as an N+1 pattern on exit.
+    """
+
+    def __init__(self, engine, max_statements: Optional[int] = None, max_repeats: Optional[int] = None):
+        self.engine = getattr(engine, "sync_engine", engine)
+        self.max_statements = max_statements
+        self.max_repeats = max_repeats
+        self.statements = []
+        self.duration = 0.0
+        self._token = None
+        self._start_key = f"query_counter_start_{id(self)}"
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int = 2) -> List[tuple]:
+        """
+        Returns the SQL texts executed at least `threshold` times with differing parameters.
+
+        Args:
+            threshold (int): Minimum number of distinct parameter sets.
+
+        Returns:
+            list[tuple[str, int]]: (SQL text, execution count), most frequent first.
+        """
+        distinct_params = {}
+        for sql, params in self.statements:
+            distinct_params.setdefault(sql, set()).add(repr(params))
+        counts = Counter(sql for sql, _ in self.statements)
+        return [
+            (sql, count) for sql, count in counts.most_common()
+            if len(distinct_params[sql]) >= threshold
+        ]
+
+    def report(self) -> str:
+        """
+        Returns a human-readable summary: total count, time and suspected N+1 statements.
+        """
+        lines = [f"{self.count} statements in {self.duration * 1000:.2f} ms"]
+        for sql, count in self.repeated(self.max_repeats + 1 if self.max_repeats is not None else 2):
+            lines.append(f"  repeated x{count}: {' '.join(sql.split())[:160]}")
+        return "\n".join(lines)
+
+    def check(self):
+        """
+        Raises QueryBudgetExceeded if the budget or repeat limit has been exceeded.
+        """
+        if self.max_statements is not None and self.count > self.max_statements:
+            raise QueryBudgetExceeded(f"Query budget of {self.max_statements} exceeded: {self.report()}")
+        if self.max_repeats is not None and self.repeated(self.max_repeats + 1):
+            raise QueryBudgetExceeded(f"Possible N+1 (statement repeated more than {self.max_repeats}x): {self.report()}")
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(self._start_key, []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get(self._start_key)
+        if not starts:
+            # The statement started before this counter was entered
+            return
+        start = starts.pop()
+        if self in _active_counters.get():
+            self.statements.append((statement, parameters))
+            self.duration += time.perf_counter() - start
+
+    def _error(self, context):
+        # Failed statements never reach after_cursor_execute
+        if context.connection is not None and context.connection.info.get(self._start_key):
+            context.connection.info[self._start_key].pop()
+
+    def __enter__(self):
+        self._token = _active_counters.set(_active_counters.get() + (self,))
+        event.listen(self.engine, "before_cursor_execute", self._before)
+        event.listen(self.engine, "after_cursor_execute", self._after)
+        event.listen(self.engine, "handle_error", self._error)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, "before_cursor_execute", self._before)
+        event.remove(self.engine, "after_cursor_execute", self._after)
+        event.remove(self.engine, "handle_error", self._error)
+        _active_counters.reset(self._token)
+        if exc_type is None:
+            self.check()
+        return False
@@ -1,18 +1,69 @@
-from passlib.context import CryptContext
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import jwt
 from core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib and python-jose (with its cryptography backend) take tens of milliseconds to
+# import, so they are loaded on first use or preloaded by core.startup during the
+# database warm-up, not when the application is imported
+_pwd_context = None
+
+def _get_pwd_context():
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hashing jobs are already queued."""
+
+# bcrypt is CPU bound and would block the event loop, so async callers run it on a worker pool
+_executor: Optional[Executor] = None
+_pending = 0
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return _get_pwd_context().hash(password)
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return _get_pwd_context().verify(plain_password, hashed_password)
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+            )
+    return _executor
+
+async def _run_in_pool(func, *args):
+    global _pending
+    if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise PasswordHasherBusy("Password hashing queue is full")
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), func, *args)
+    finally:
+        _pending -= 1
+
+async def get_password_hash_async(password):
+    return await _run_in_pool(get_password_hash, password)
+
+async def verify_password_async(plain_password, hashed_password):
+    return await _run_in_pool(verify_password, plain_password, hashed_password)
+
+def shutdown_password_hasher():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
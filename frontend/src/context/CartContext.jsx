@@ -7,6 +7,8 @@
  */
 
 import React, { createContext, useState, useContext, useEffect } from 'react';
+// Import the product service to refresh the saved cart
+import { productService } from '../services/product';
 
 // Create the cart context
 const CartContext = createContext();
@@ -27,6 +29,27 @@ export const CartProvider = ({ children }) => {
     return savedCart ? JSON.parse(savedCart) : [];
   });
 
+  /**
+   * Effect to refresh the saved cart once on load.
+   * 
+   * The saved items are snapshots from when they were added, so their details are
+   * replaced with the current ones in one batch request, and products that no longer
+   * exist are dropped.
+   */
+  useEffect(() => {
+    const ids = cart.map((item) => item.id);
+    if (ids.length === 0) return;
+    productService.getProductsBatch(ids)
+      .then(({ products, missingIds }) => {
+        const current = new Map(products.map((product) => [product.id, product]));
+        const missing = new Set(missingIds);
+        setCart((prevCart) => prevCart
+          .filter((item) => !missing.has(item.id))
+          .map((item) => (current.has(item.id) ? { ...current.get(item.id), quantity: item.quantity } : item)));
+      })
+      .catch((error) => console.error("Failed to refresh cart", error));
+  }, []); // eslint-disable-line react-hooks/exhaustive-deps
+
   /**
    * Effect to persist cart state to localStorage whenever it changes.
    */
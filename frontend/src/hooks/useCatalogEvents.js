@@ -0,0 +1,63 @@
+/**
+ * useCatalogEvents Hook
+ *
+ * This custom hook subscribes to the backend's product change stream (Server-Sent Events)
+ * and applies each change to the cached product list, so the list stays fresh without
+ * refetching it.
+ */
+
+import { useEffect, useState } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+// Import the API instance for the backend base URL
+import api from '../services/api';
+
+/**
+ * Custom hook to keep the cached product list in sync with the catalog.
+ *
+ * Updates and deletes are applied to the cached list directly. New products and
+ * `resync` events (the stream missed changes) refetch the list instead, since a new
+ * product may belong anywhere in the name order.
+ *
+ * @returns {boolean} Whether the stream is connected; while it is not, callers should
+ *   fall back to refetching
+ */
+export const useCatalogEvents = () => {
+  const queryClient = useQueryClient();
+  const [connected, setConnected] = useState(false);
+
+  useEffect(() => {
+    // EventSource reconnects by itself and resumes with Last-Event-ID
+    const source = new EventSource(`${api.defaults.baseURL}/products/events`);
+
+    const refetch = () => queryClient.invalidateQueries({ queryKey: ['products'] });
+
+    const updateList = (update) => {
+      queryClient.setQueryData(['products'], (products) => (products ? update(products) : products));
+    };
+
+    source.onopen = () => setConnected(true);
+    source.onerror = () => setConnected(false);
+
+    source.addEventListener('product.updated', (event) => {
+      const { id, changed } = JSON.parse(event.data);
+      // changed is null when the new values were too large to send
+      if (changed === null) {
+        refetch();
+        return;
+      }
+      updateList((products) => products.map((product) => (
+        product.id === id ? { ...product, ...changed } : product
+      )));
+    });
+    source.addEventListener('product.deleted', (event) => {
+      const { id } = JSON.parse(event.data);
+      updateList((products) => products.filter((product) => product.id !== id));
+    });
+    source.addEventListener('product.created', refetch);
+    source.addEventListener('resync', refetch);
+
+    return () => source.close();
+  }, [queryClient]);
+
+  return connected;
+};
@@ -3,11 +3,15 @@
  * 
  * This custom hook fetches the list of products from the backend using React Query.
  * It handles caching, loading states, and error states automatically.
+ * While the product change stream is connected, the list is kept fresh by its events
+ * instead of being refetched.
  */
 
 import { useQuery } from '@tanstack/react-query';
 // Import the product service to make the API call
 import { productService } from '../services/product';
+// Import the hook that applies live catalog changes
+import { useCatalogEvents } from './useCatalogEvents';
 
 /**
  * Custom hook to fetch products.
@@ -15,10 +19,13 @@ import { productService } from '../services/product';
  * @returns {Object} The query result object containing data, isLoading, error, etc.
  */
 export const useProducts = () => {
+  const live = useCatalogEvents();
   return useQuery({
     // Unique key for caching the product list
     queryKey: ['products'],
     // Function to fetch the data
     queryFn: () => productService.getProducts(),
+    // Events keep the list current while connected; otherwise refetch as usual
+    staleTime: live ? Infinity : 0,
   });
 };
@@ -5,7 +5,7 @@
  * It allows users to view items, update quantities, remove items, and proceed to checkout.
  */
 
-import React from 'react';
+import React, { useEffect, useRef } from 'react';
 // Import the cart context to access cart state and actions
 import { useCart } from '../context/CartContext';
 // Import the auth context to check if the user is logged in
@@ -22,6 +22,14 @@ const CartPage = () => {
   const { user } = useAuth();
   // Initialize the navigation hook
   const navigate = useNavigate();
+  // Idempotency key for the current checkout attempt; reused when "Checkout" is retried
+  // after a failure so a request that did reach the server is not placed twice
+  const checkoutKey = useRef(null);
+
+  // A changed cart is a different order, so it needs a fresh key
+  useEffect(() => {
+    checkoutKey.current = null;
+  }, [cart]);
 
   /**
    * Handles the checkout process.
@@ -51,7 +59,11 @@ const CartPage = () => {
       // Call the createOrder service method.
       // The backend now extracts the user ID from the authentication token,
       // so we don't need to pass it explicitly.
-      await orderService.createOrder(orderData);
+      if (!checkoutKey.current) {
+        checkoutKey.current = crypto.randomUUID();
+      }
+      await orderService.createOrder(orderData, checkoutKey.current);
+      checkoutKey.current = null;
       
       // Clear the local cart state
       clearCart();
@@ -64,6 +76,12 @@ const CartPage = () => {
     } catch (error) {
       // Log error and notify user if checkout fails
       console.error("Checkout failed", error);
+      const outOfStock = error.response?.data?.detail?.out_of_stock_product_ids;
+      if (outOfStock) {
+        const names = cart.filter((item) => outOfStock.includes(item.id)).map((item) => item.name);
+        alert(`Not enough stock for: ${names.join(', ')}. Please adjust your cart.`);
+        return;
+      }
       alert('Checkout failed. Please try again.');
     }
   };
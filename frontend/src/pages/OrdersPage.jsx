@@ -8,29 +8,56 @@
 import React, { useEffect, useState } from 'react';
 // Import the order service to make API calls related to orders
 import { orderService } from '../services/order';
+// Import the product service to look up product names
+import { productService } from '../services/product';
 // Import the auth context to get the current user's information
 import { useAuth } from '../context/AuthContext';
 
 const OrdersPage = () => {
   // State to store the list of orders
   const [orders, setOrders] = useState([]);
+  // State to store product names by product ID
+  const [productNames, setProductNames] = useState({});
+  // State to store the cursor of the next page of orders (null when there are no more)
+  const [nextCursor, setNextCursor] = useState(null);
   // State to handle the loading status of the data fetch
   const [loading, setLoading] = useState(true);
+  // State to track whether a further page is being fetched
+  const [loadingMore, setLoadingMore] = useState(false);
   // Get the authenticated user object from the AuthContext
   const { user } = useAuth();
 
   /**
-   * useEffect hook to fetch orders when the component mounts or when the user changes.
+   * Fetches one page of orders and the names of the products in it.
+   * 
+   * @param {string|null} cursor - The cursor returned with the previous page, or null for the first page
+   */
+  const loadPage = async (cursor) => {
+    // Call the service to get one page of orders for the specific user ID
+    const { orders: page, nextCursor: next } = await orderService.getUserOrdersPage(user.id, { cursor });
+    // Append the page to the orders already shown
+    setOrders((current) => (cursor ? [...current, ...page] : page));
+    setNextCursor(next);
+    // Look up the names of the products of this page in one batch request
+    const ids = page.flatMap((order) => (order.items || []).map((item) => item.product_id));
+    if (ids.length > 0) {
+      const { products } = await productService.getProductsBatch(ids);
+      setProductNames((current) => ({
+        ...current,
+        ...Object.fromEntries(products.map((product) => [product.id, product.name])),
+      }));
+    }
+  };
+
+  /**
+   * useEffect hook to fetch the first page of orders when the component mounts or when the user changes.
    */
   useEffect(() => {
     const fetchOrders = async () => {
       // Only attempt to fetch if a user is logged in and has an ID
       if (user && user.id) {
         try {
-          // Call the service to get orders for the specific user ID
-          const data = await orderService.getUserOrders(user.id);
-          // Update the state with the fetched orders
-          setOrders(data);
+          await loadPage(null);
         } catch (error) {
           // Log any errors that occur during the fetch
           console.error("Failed to fetch orders", error);
@@ -44,6 +71,20 @@ const OrdersPage = () => {
     fetchOrders();
   }, [user]); // Dependency array: re-run if 'user' changes
 
+  /**
+   * Fetches the next page of orders when the user clicks "Load more".
+   */
+  const handleLoadMore = async () => {
+    setLoadingMore(true);
+    try {
+      await loadPage(nextCursor);
+    } catch (error) {
+      console.error("Failed to fetch more orders", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Render a loading message while data is being fetched
   if (loading) return <div className="text-center p-4">Loading orders...</div>;
 
@@ -90,8 +131,10 @@ const OrdersPage = () => {
                 {order.items && order.items.map((item) => (
                   <li key={item.id} className="py-3 flex justify-between">
                     <div className="flex items-center">
-                      {/* Display Product ID (In a real app, we'd fetch the product name) */}
-                      <span className="font-medium text-gray-800">Product ID: {item.product_id}</span>
+                      {/* Display the product name, or its ID if the product no longer exists */}
+                      <span className="font-medium text-gray-800">
+                        {productNames[item.product_id] || `Product ID: ${item.product_id}`}
+                      </span>
                       <span className="ml-4 text-gray-600">x {item.quantity}</span>
                     </div>
                     <span className="font-medium text-gray-800">${item.price_at_purchase}</span>
@@ -102,6 +145,18 @@ const OrdersPage = () => {
           </div>
         ))}
       </div>
+      {/* Offer the next page while the backend reports more orders */}
+      {nextCursor && (
+        <div className="text-center mt-6">
+          <button
+            onClick={handleLoadMore}
+            disabled={loadingMore}
+            className="bg-blue-600 hover:bg-blue-700 text-white px-4 py-2 rounded transition duration-200 disabled:opacity-50"
+          >
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
@@ -28,8 +28,8 @@ const ProfilePage = () => {
       // Only fetch if user is logged in and has an ID
       if (user && user.id) {
         try {
-          // Fetch orders for the current user
-          const data = await orderService.getUserOrders(user.id);
+          // Fetch the most recent order headers for the current user (items are not shown here)
+          const data = await orderService.getUserOrders(user.id, { limit: 20, includeItems: false });
           setOrders(data);
         } catch (error) {
           console.error("Failed to fetch orders", error);
@@ -126,8 +126,9 @@ const ProfilePage = () => {
                 </div>
               </div>
               <div className="p-6">
-                {/* We would list items here if the API returned them in the list view */}
-                <p className="text-gray-600">Items details would appear here.</p>
+                <p className="text-gray-600">
+                  {order.item_count} {order.item_count === 1 ? 'item' : 'items'} · ${order.total_amount.toFixed(2)}
+                </p>
               </div>
             </div>
           ))}
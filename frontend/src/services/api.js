@@ -2,7 +2,8 @@
  * API Service Configuration
  * 
  * This module configures the Axios instance used for making HTTP requests to the backend.
- * It sets the base URL and default headers.
+ * It sets the base URL and default headers, and carries the read-your-writes pin
+ * between requests.
  */
 
 import axios from 'axios';
@@ -17,4 +18,24 @@ const api = axios.create({
   },
 });
 
+// Header the backend sets after a write; sending it back keeps our next reads on the primary
+// database until it expires, so we read our own writes even when a replica serves reads
+const READ_PIN_HEADER = 'X-Read-Primary-Until';
+let readPin = null;
+
+// Remember the most recent read pin
+api.interceptors.response.use((response) => {
+  const pin = response.headers[READ_PIN_HEADER.toLowerCase()];
+  if (pin) readPin = pin;
+  return response;
+});
+
+// Send the read pin back until it expires
+api.interceptors.request.use((config) => {
+  if (readPin && Number(readPin) * 1000 > Date.now()) {
+    config.headers[READ_PIN_HEADER] = readPin;
+  }
+  return config;
+});
+
 export default api;
@@ -13,13 +13,47 @@ export const orderService = {
    * 
    * @param {Object} orderData - The data for the new order
    * @param {Array} orderData.items - List of items in the order
-   * @returns {Promise<Object>} The created order object
+   * @param {string} [idempotencyKey] - Key identifying this checkout; resend the same key when retrying
+   * @returns {Promise<Object>} The created order object, or its final status if the server queued it
    */
-  createOrder: async (orderData) => {
-    const response = await api.post('/orders/', orderData);
+  createOrder: async (orderData, idempotencyKey) => {
+    const headers = idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {};
+    const response = await api.post('/orders/', orderData, { headers });
+    if (response.status === 202) {
+      // Asynchronous checkout: the order was queued, wait until it has been written
+      return orderService.waitForOrder(response.data.id);
+    }
     return response.data;
   },
 
+  /**
+   * Polls the status of a queued order until it has been written or rejected.
+   *
+   * @param {string} orderId - The ID returned by createOrder
+   * @param {number} [timeoutMs=30000] - How long to wait before giving up
+   * @returns {Promise<Object>} The order status once it is 'completed'
+   * @throws The status as `error.response.data` if the order was rejected or failed
+   */
+  waitForOrder: async (orderId, timeoutMs = 30000) => {
+    const deadline = Date.now() + timeoutMs;
+    let delay = 100;
+    while (Date.now() < deadline) {
+      try {
+        const { data } = await api.get(`/orders/${orderId}/status`);
+        if (data.status === 'completed') return data;
+        if (data.status !== 'pending') {
+          throw Object.assign(new Error(`Order ${data.status}`), { response: { data } });
+        }
+      } catch (error) {
+        // Another server may not know the order until it is written
+        if (error.response?.status !== 404) throw error;
+      }
+      await new Promise((resolve) => setTimeout(resolve, delay));
+      delay = Math.min(delay * 2, 1000);
+    }
+    throw new Error('Timed out waiting for the order to be placed');
+  },
+
   /**
    * Retrieves a list of orders with pagination.
    * 
@@ -33,13 +67,42 @@ export const orderService = {
   },
 
   /**
-   * Retrieves orders for a specific user.
+   * Retrieves a page of orders for a specific user, newest first.
    * 
    * @param {string} userId - The ID of the user
+   * @param {Object} [options] - Pagination options
+   * @param {number} [options.limit=50] - Maximum number of orders to return
+   * @param {string} [options.cursor] - Cursor of the page to fetch (from a previous page)
+   * @param {boolean} [options.includeItems=true] - Whether to include the items of each order
+   * @returns {Promise<Object>} The orders and the cursor of the next page (null on the last page)
+   */
+  getUserOrdersPage: async (userId, { limit = 50, cursor, includeItems = true } = {}) => {
+    const params = { limit, include_items: includeItems };
+    if (cursor) params.cursor = cursor;
+    const response = await api.get(`/users/${userId}/orders`, { params });
+    return { orders: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+  },
+
+  /**
+   * Retrieves the most recent orders for a specific user.
+   * 
+   * @param {string} userId - The ID of the user
+   * @param {Object} [options] - Same options as getUserOrdersPage
    * @returns {Promise<Array>} List of orders for the user
    */
-  getUserOrders: async (userId) => {
-    const response = await api.get(`/users/${userId}/orders`);
+  getUserOrders: async (userId, options) => {
+    const { orders } = await orderService.getUserOrdersPage(userId, options);
+    return orders;
+  },
+
+  /**
+   * Retrieves the items of a single order.
+   * 
+   * @param {string} orderId - The ID of the order
+   * @returns {Promise<Array>} List of order items
+   */
+  getOrderItems: async (orderId) => {
+    const response = await api.get(`/orders/${orderId}/items`);
     return response.data;
   },
 };
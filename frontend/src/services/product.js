@@ -7,6 +7,9 @@
 
 import api from './api';
 
+// IDs per batch request (the backend's PRODUCT_BATCH_MAX_SIZE)
+const BATCH_SIZE = 100;
+
 export const productService = {
   /**
    * Retrieves a list of products with pagination.
@@ -31,6 +34,27 @@ export const productService = {
     return response.data;
   },
 
+  /**
+   * Retrieves many products by ID, one request per BATCH_SIZE IDs.
+   * 
+   * @param {Array<string>} ids - The IDs of the products
+   * @returns {Promise<Object>} { products, missingIds }: the products found, in the order
+   *   requested, and the IDs that no longer exist
+   */
+  getProductsBatch: async (ids) => {
+    const unique = [...new Set(ids)];
+    const requests = [];
+    for (let i = 0; i < unique.length; i += BATCH_SIZE) {
+      const chunk = unique.slice(i, i + BATCH_SIZE);
+      requests.push(api.get('/products/batch', { params: { ids: chunk.join(',') } }));
+    }
+    const responses = await Promise.all(requests);
+    return {
+      products: responses.flatMap((response) => response.data.products),
+      missingIds: responses.flatMap((response) => response.data.missing_ids),
+    };
+  },
+
   /**
    * Creates a new product.
    * 